@@ -4,8 +4,9 @@
 TestPage.tsx에서 버튼 클릭 시 호출되는 통합 파이프라인 인터페이스입니다.
 """
 
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, BackgroundTasks
-from fastapi.responses import JSONResponse
+import json
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, BackgroundTasks, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from typing import Optional, Dict, Any
 from datetime import datetime
@@ -15,6 +16,8 @@ from ..database import get_db
 from ..models.user import UserInformation
 from .auth import get_current_user
 from ..services.analysis_service import AnalysisService, get_analysis_service
+from ..services.analysis_queue import get_queue_stats
+from ..config import settings
 
 router = APIRouter()
 
@@ -27,6 +30,7 @@ async def analyze_drawing_image(
     file: Optional[UploadFile] = File(None),
     image: Optional[UploadFile] = File(None),
     description: Optional[str] = Form(None),
+    reuse_duplicate: Optional[bool] = Form(None),
     db: Session = Depends(get_db),
     current_user: dict = Depends(get_current_user),
     service: AnalysisService = Depends(get_analysis_service)
@@ -36,6 +40,9 @@ async def analyze_drawing_image(
     
     TestPage.tsx의 '분석 시작하기' 버튼에서 호출됩니다.
     업로드된 이미지를 HTP 심리검사 파이프라인으로 처리합니다.
+    이전에 올린 그림과 근접 중복이면 응답에 duplicate_of 가 포함되며,
+    reuse_duplicate=true 로 다시 요청하면 기존 결과를 바로 사용합니다.
+    진행 중인 분석이 상한을 넘으면 429 와 Retry-After 헤더로 거절합니다.
     """
     # file 또는 image 중 하나를 사용 (프론트엔드 호환성)
     upload_file = file or image
@@ -52,9 +59,11 @@ async def analyze_drawing_image(
             user_id=current_user["user_id"],
             file=upload_file,
             description=description,
-            background_tasks=background_tasks
+            background_tasks=background_tasks,
+            reuse_duplicate=reuse_duplicate
         )
-        return JSONResponse(status_code=202, content=result)
+        status_code = 200 if result["status"] == "completed" else 202
+        return JSONResponse(status_code=status_code, content=result)
         
     except HTTPException:
         raise
@@ -97,8 +106,62 @@ async def get_analysis_status(
         )
 
 
+@router.get("/analysis-events/{test_id}")
+async def stream_analysis_events(
+    test_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+    service: AnalysisService = Depends(get_analysis_service)
+):
+    """
+    분석 진행 상태 스트림 API (Server-Sent Events)
+    
+    단계 전이(stage)와 최종 결과(completed/failed)를 발생 즉시 전달합니다.
+    이벤트 데이터는 analysis-status 응답과 같은 형식이며, 스트림을 사용할 수 없는 경우
+    기존 analysis-status 폴링을 사용합니다.
+    """
+    try:
+        initial_status, unique_id = service.open_status_stream(
+            db=db,
+            test_id=test_id,
+            user_id=current_user["user_id"]
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"분석 상태 조회 중 오류가 발생했습니다: {str(e)}"
+        )
+
+    async def event_stream():
+        events = service.iter_status_events(
+            test_id=test_id,
+            user_id=current_user["user_id"],
+            unique_id=unique_id,
+            initial_status=initial_status,
+            is_disconnected=request.is_disconnected
+        )
+        async for event, data in events:
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # nginx 버퍼링 비활성화
+        }
+    )
+
+
 @router.get("/pipeline-health")
 async def check_pipeline_health(
+    db: Session = Depends(get_db),
     service: AnalysisService = Depends(get_analysis_service)
 ):
     """
@@ -111,15 +174,29 @@ async def check_pipeline_health(
         status = {
             "pipeline_status": "unknown",
             "timestamp": datetime.now().isoformat(),
+            "queue_backend": settings.ANALYSIS_QUEUE_BACKEND,
+            "admission": service.admission.stats(),
         }
         
-        pipeline = service.get_pipeline()
+        # 작업 큐 사용 시 분석은 워커 프로세스에서 실행되므로 큐 상태만 보고
+        # (API 프로세스에 모델을 로드하지 않도록 파이프라인을 만들지 않음)
+        if settings.ANALYSIS_QUEUE_BACKEND == "database":
+            status["queue"] = get_queue_stats(db)
+            status["pipeline_status"] = "worker"
+            return JSONResponse(content=status)
+        
+        # 상태 확인이 모델 로드를 일으키지 않도록 이미 생성된 파이프라인만 보고
+        pipeline = service.peek_pipeline()
         if pipeline:
             status["pipeline_status"] = "active"
             status["config"] = {
                 "model_dir": str(pipeline.config.model_dir),
                 "yolo_model": pipeline.config.yolo_model_path
             }
+            status["models"] = pipeline.get_model_stats()
+            status["status_store"] = pipeline.status_store.stats()
+            status["stage_cache"] = pipeline.get_cache_stats()
+            status["stage_timings"] = pipeline.get_stage_timings()
         else:
             status["pipeline_status"] = "inactive"
             
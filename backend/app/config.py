@@ -40,6 +40,111 @@ class Settings(BaseSettings):
     RESULT_DIR: str = os.path.join(BASE_DIR, "result")
     
     YOLO_MODEL_PATH: str = "best.pt"
+    # 시작 시 모든 모델 로드 및 더미 추론 실행 여부 (/ready 는 완료 후 200 응답)
+    MODEL_WARMUP: bool = os.getenv("MODEL_WARMUP", "False").lower() == "true"
+    
+    # 분석 작업 실행 방식: "background" (API 프로세스 BackgroundTasks) / "database" (analysis_jobs 큐 + 워커 프로세스)
+    ANALYSIS_QUEUE_BACKEND: str = os.getenv("ANALYSIS_QUEUE_BACKEND", "background")
+    ANALYSIS_WORKER_CONCURRENCY: int = int(os.getenv("ANALYSIS_WORKER_CONCURRENCY", "2"))
+    ANALYSIS_WORKER_POLL_INTERVAL: float = float(os.getenv("ANALYSIS_WORKER_POLL_INTERVAL", "1.0"))
+    ANALYSIS_JOB_MAX_ATTEMPTS: int = int(os.getenv("ANALYSIS_JOB_MAX_ATTEMPTS", "3"))
+    # 이 시간(초) 이상 running 상태인 작업은 워커가 죽은 것으로 보고 복구
+    ANALYSIS_JOB_STUCK_TIMEOUT: int = int(os.getenv("ANALYSIS_JOB_STUCK_TIMEOUT", "900"))
+    
+    # 분석 요청 수락 제어: 대기+실행 중 분석 수 / 사용자별 분석 수 상한 (0 이면 제한 없음, 넘으면 429 + Retry-After)
+    ANALYSIS_MAX_PENDING: int = int(os.getenv("ANALYSIS_MAX_PENDING", "50"))
+    ANALYSIS_MAX_PENDING_PER_USER: int = int(os.getenv("ANALYSIS_MAX_PENDING_PER_USER", "3"))
+    # 예상 대기 시간 계산용 동시 처리 수와 처리 기록이 없을 때 분석 1건 예상 시간 (초)
+    ANALYSIS_ADMISSION_CONCURRENCY: int = int(os.getenv("ANALYSIS_ADMISSION_CONCURRENCY", os.getenv("ANALYSIS_WORKER_CONCURRENCY", "2")))
+    ANALYSIS_DEFAULT_DURATION: float = float(os.getenv("ANALYSIS_DEFAULT_DURATION", "150"))
+    
+    # 분석 진행 상태 저장소: "memory" (단일 프로세스) / "postgres" (uvicorn 워커·분석 워커 간 공유)
+    # 분석 워커를 별도 프로세스로 실행하거나 uvicorn --workers 2 이상이면 "postgres" 사용
+    ANALYSIS_STATUS_BACKEND: str = os.getenv("ANALYSIS_STATUS_BACKEND", "memory")
+    ANALYSIS_STATUS_TTL: int = int(os.getenv("ANALYSIS_STATUS_TTL", "3600"))
+    ANALYSIS_STATUS_MAX_ENTRIES: int = int(os.getenv("ANALYSIS_STATUS_MAX_ENTRIES", "10000"))
+    
+    # 단계 결과 캐시 (같은 이미지 재제출 시 YOLO/GPT/분류 결과 재사용, false 로 끄기)
+    ANALYSIS_CACHE_ENABLED: bool = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() == "true"
+    ANALYSIS_CACHE_TTL: int = int(os.getenv("ANALYSIS_CACHE_TTL", "86400"))
+    ANALYSIS_CACHE_MAX_ENTRIES: int = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "1000"))
+    
+    # YOLO 탐지기 백엔드: "pytorch" / "onnx" / "onnx-int8" (check_detector_backends.py 로 비교 후 선택)
+    YOLO_BACKEND: str = os.getenv("YOLO_BACKEND", "pytorch")
+    
+    # YOLO 마이크로 배치: 동시 업로드를 최대 대기시간(ms) 동안 모아 한 번에 추론 (1이면 사용 안 함)
+    YOLO_BATCH_SIZE: int = int(os.getenv("YOLO_BATCH_SIZE", "1"))
+    YOLO_BATCH_WAIT_MS: float = float(os.getenv("YOLO_BATCH_WAIT_MS", "5"))
+    # YOLO 모델 풀 크기: 동시에 추론할 수 있는 모델 인스턴스 수 (인스턴스마다 메모리 사용, 코어 수 이하 권장)
+    YOLO_POOL_SIZE: int = int(os.getenv("YOLO_POOL_SIZE", "2"))
+    
+    # 모델 추론 CPU 예산: 동시에 실행할 무거운 추론 수와 전체 스레드 수 (0 이면 코어 수)
+    # 추론당 스레드 = INFERENCE_THREADS / INFERENCE_MAX_CONCURRENT (benchmark_inference_concurrency.py 로 조정)
+    INFERENCE_THREADS: int = int(os.getenv("INFERENCE_THREADS", "0"))
+    INFERENCE_MAX_CONCURRENT: int = int(os.getenv("INFERENCE_MAX_CONCURRENT", "2"))
+    
+    # 추론 사이드카 Unix 소켓 (run_inference_sidecar.py 로 실행, 비우면 워커마다 모델을 직접 로드)
+    INFERENCE_SIDECAR_SOCKET: str = os.getenv("INFERENCE_SIDECAR_SOCKET", "")
+    
+    # OpenAI 호출 한도 (분석/채팅/인사가 프로세스 내에서 공유)
+    # 분당 요청/토큰 한도는 기본값 0 (제한 없음), 조직의 실제 한도를 프로세스 수로 나눈 값으로 설정
+    OPENAI_MAX_CONCURRENT: int = int(os.getenv("OPENAI_MAX_CONCURRENT", "8"))
+    OPENAI_RPM_LIMIT: int = int(os.getenv("OPENAI_RPM_LIMIT", "0"))
+    OPENAI_TPM_LIMIT: int = int(os.getenv("OPENAI_TPM_LIMIT", "0"))
+    OPENAI_MAX_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+    OPENAI_TIMEOUT: float = float(os.getenv("OPENAI_TIMEOUT", "120"))
+    
+    # GPT 재시도 정책 (그림 1장당 전체 GPT 호출 예산, 429/5xx/타임아웃만 지수 백오프 + 지터로 재시도)
+    GPT_CALL_MAX_ATTEMPTS: int = int(os.getenv("GPT_CALL_MAX_ATTEMPTS", "3"))
+    GPT_STAGE_MAX_ATTEMPTS: int = int(os.getenv("GPT_STAGE_MAX_ATTEMPTS", "2"))
+    GPT_JOB_BUDGET: int = int(os.getenv("GPT_JOB_BUDGET", "8"))
+    GPT_BACKOFF_BASE: float = float(os.getenv("GPT_BACKOFF_BASE", "1.0"))
+    GPT_BACKOFF_MAX: float = float(os.getenv("GPT_BACKOFF_MAX", "20.0"))
+    
+    # 파이프라인 단계 간 이미지를 메모리로 전달 (detection_result 중간 파일 생략, 분석 이미지는 완료 시 저장, 기본값: 사용 안 함)
+    ANALYSIS_IN_MEMORY_HANDOFF: bool = os.getenv("ANALYSIS_IN_MEMORY_HANDOFF", "false").lower() == "true"
+    
+    # GPT 에 보낼 이미지 ("annotated": 바운딩 박스 이미지 / "original": YOLO 입력 이미지)
+    # 기본값 "annotated" 는 GPT 입력으로 매 분석마다 그리고 인코딩하므로, 분석 중 그리기/인코딩은
+    # "original" + ANALYSIS_RENDER_ANALYZED_IMAGE=false 일 때만 생략됨
+    ANALYSIS_GPT_IMAGE_SOURCE: str = os.getenv("ANALYSIS_GPT_IMAGE_SOURCE", "annotated")
+    # 분석 완료 시 바운딩 박스 이미지를 항상 그릴지 여부 (false 면 결과를 처음 조회할 때 그림)
+    ANALYSIS_RENDER_ANALYZED_IMAGE: bool = os.getenv("ANALYSIS_RENDER_ANALYZED_IMAGE", "false").lower() == "true"
+    # 심리 분석 모드 ("two_call": 초기 분석 + RAG 보강 최종 분석 / "single_call": 참고 자료를 넣은 GPT 호출 1회, 빠른 결과용)
+    ANALYSIS_MODE: str = os.getenv("ANALYSIS_MODE", "two_call")
+    # 부하에 따른 품질 단계 조정 (진행 중 분석 수 + 대기열 길이 기준, 쉼표로 구분한 단계별 기준 3개)
+    ANALYSIS_ADAPTIVE_DEGRADATION: bool = os.getenv("ANALYSIS_ADAPTIVE_DEGRADATION", "false").lower() == "true"
+    ANALYSIS_DEGRADE_THRESHOLDS: str = os.getenv("ANALYSIS_DEGRADE_THRESHOLDS", "4,8,16")
+    ANALYSIS_DEGRADE_COOLDOWN: float = float(os.getenv("ANALYSIS_DEGRADE_COOLDOWN", "30"))
+    # 탐지 라벨로 RAG 검색을 1차 GPT 호출과 동시에 실행 (GPT 요소 기반 결과와 병합)
+    ANALYSIS_RAG_FROM_LABELS: bool = os.getenv("ANALYSIS_RAG_FROM_LABELS", "false").lower() == "true"
+    # 탐지된 세부 요소(문/창문/뿌리 등) 상위 N개 크롭을 low detail 로 동시에 분석하여 RAG 검색 요소에 추가 (0 이면 사용 안 함, two_call 모드, 사용 시 1단계는 메모리 전달 경로로 실행)
+    ANALYSIS_CROP_TOP_N: int = int(os.getenv("ANALYSIS_CROP_TOP_N", "0"))
+    # 최종 GPT 분석을 스트리밍하여 요약이 완성되는 즉시 성격 분류 시작
+    # (JSON 필드 순서를 바꾸도록 프롬프트를 수정하므로 출력 품질 영향을 확인하기 전까지 기본값: 사용 안 함)
+    ANALYSIS_STREAM_FINAL: bool = os.getenv("ANALYSIS_STREAM_FINAL", "false").lower() == "true"
+    
+    # 근접 중복 그림 검색 (지각 해시): "off" / "offer" (응답에 기존 결과 안내) / "reuse" (기존 결과 재사용)
+    ANALYSIS_DUPLICATE_MODE: str = os.getenv("ANALYSIS_DUPLICATE_MODE", "offer")
+    ANALYSIS_DUPLICATE_MAX_DISTANCE: int = int(os.getenv("ANALYSIS_DUPLICATE_MAX_DISTANCE", "4"))
+    IMAGE_HASH_INDEX_PATH: str = os.getenv("IMAGE_HASH_INDEX_PATH", os.path.join(BASE_DIR, "result", "image_hashes.tsv"))
+    
+    # 분석 진행 이벤트 스트림 (SSE) 설정
+    ANALYSIS_EVENTS_POLL_INTERVAL: float = float(os.getenv("ANALYSIS_EVENTS_POLL_INTERVAL", "0.5"))
+    ANALYSIS_EVENTS_DB_CHECK_INTERVAL: float = float(os.getenv("ANALYSIS_EVENTS_DB_CHECK_INTERVAL", "10"))
+    ANALYSIS_EVENTS_MAX_DURATION: float = float(os.getenv("ANALYSIS_EVENTS_MAX_DURATION", "600"))
     SUPPORTED_IMAGE_FORMATS: list = ['.jpg', '.jpeg', '.png', '.bmp', '.gif']
 
+    @property
+    def degrade_thresholds(self) -> tuple:
+        """ANALYSIS_DEGRADE_THRESHOLDS 파싱 (양의 정수 3개 오름차순이 아니면 경고 후 기본값 4,8,16 사용)"""
+        try:
+            values = tuple(int(v) for v in self.ANALYSIS_DEGRADE_THRESHOLDS.split(","))
+            if len(values) == 3 and values[0] > 0 and list(values) == sorted(values):
+                return values
+        except ValueError:
+            pass
+        print(f"⚠️ ANALYSIS_DEGRADE_THRESHOLDS 값이 올바르지 않아 기본값 4,8,16 사용: {self.ANALYSIS_DEGRADE_THRESHOLDS!r}")
+        return (4, 8, 16)
+
 settings = Settings()
\ No newline at end of file
@@ -83,6 +83,20 @@ app.include_router(pipeline_router, prefix="/api/v1/pipeline", tags=["pipeline"]
 async def startup_event():
     """애플리케이션 시작 시 실행"""
     try:
+        # 0. 공유 OpenAI 게이트웨이 구성 (채팅/인사/분석 파이프라인이 같은 동시성/분당 한도 사용)
+        import sys
+        if settings.MODEL_DIR not in sys.path:
+            sys.path.insert(0, settings.MODEL_DIR)
+        from openai_gateway import configure_openai_gateway
+        configure_openai_gateway(
+            max_concurrent=settings.OPENAI_MAX_CONCURRENT,
+            requests_per_minute=settings.OPENAI_RPM_LIMIT,
+            tokens_per_minute=settings.OPENAI_TPM_LIMIT,
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            timeout=settings.OPENAI_TIMEOUT,
+            api_key=settings.OPENAI_API_KEY or None
+        )
+        
         # 1. 데이터베이스 테이블 생성
         create_tables()
         print("Database tables created successfully")
@@ -101,6 +115,18 @@ async def startup_event():
         finally:
             db.close()
         
+        # 3. 모델 워밍업 (선택, 완료 전까지 /ready 는 503)
+        if settings.MODEL_WARMUP:
+            from .services.analysis_service import analysis_service
+            analysis_service.start_warmup()
+            print("Model warmup started in background")
+        
+        # 4. 근접 중복 검색용 이미지 해시 인덱스 로드 (첫 업로드 지연 방지)
+        if settings.ANALYSIS_DUPLICATE_MODE != "off":
+            import threading
+            from .services.analysis_service import analysis_service
+            threading.Thread(target=analysis_service.get_image_hash_index, name="image-hash-index", daemon=True).start()
+        
         print("Care Chat API is starting...")
     except Exception as e:
         print(f"Application initialization failed: {e}")
@@ -108,6 +134,18 @@ async def startup_event():
         traceback.print_exc()
         raise
 
+# 준비 상태 확인 (로드밸런서용)
+@app.get("/ready")
+async def readiness_check():
+    """모델 워밍업이 모두 성공한 워커만 200을 반환 (실패하면 503)"""
+    from .services.analysis_service import analysis_service
+    
+    readiness = analysis_service.get_readiness()
+    return JSONResponse(
+        status_code=200 if readiness["ready"] else 503,
+        content=readiness
+    )
+
 # 422 오류 전용 핸들러 추가
 from fastapi.exceptions import RequestValidationError
 from starlette.exceptions import HTTPException
@@ -1,7 +1,7 @@
 from .user import Base, SocialUser, User, UserInformation
 from .chat import ChatSession, ChatMessage
 from .persona import Persona
-from .test import DrawingTest, DrawingTestResult
+from .test import DrawingTest, DrawingTestResult, AnalysisJob
 from .rating import Rating
 
 __all__ = [
@@ -14,5 +14,6 @@ __all__ = [
     'Persona',
     'DrawingTest',
     'DrawingTestResult',
+    'AnalysisJob',
     'Rating'
 ]
\ No newline at end of file
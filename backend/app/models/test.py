@@ -31,8 +31,26 @@ class DrawingTestResult(Base):
     turtle_scores = Column(DECIMAL(5,2))
     thumbs_up = Column(Integer)
     thumbs_down = Column(Integer)
+    quality_tier = Column(String(20))  # 부하에 따라 적용된 분석 품질 단계 (full / no_rerank / reduced / minimal)
     created_at = Column(DateTime, nullable=False)
     
     # 관계 정의
     test = relationship("DrawingTest", back_populates="result")
-    persona = relationship("Persona", back_populates="drawing_test_results")
\ No newline at end of file
+    persona = relationship("Persona", back_populates="drawing_test_results")
+
+class AnalysisJob(Base):
+    """그림 분석 작업 큐 모델 (워커 프로세스가 SKIP LOCKED 로 가져감)"""
+    __tablename__ = "analysis_jobs"
+    
+    job_id = Column(Integer, primary_key=True, autoincrement=True)
+    test_id = Column(Integer, ForeignKey('drawing_tests.test_id', ondelete='CASCADE'), nullable=False)
+    task_id = Column(String(64), unique=True, nullable=False)
+    description = Column(Text)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, completed, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    worker_id = Column(String(128))
+    error_message = Column(Text)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
@@ -0,0 +1,114 @@
+"""
+그림 분석 요청 수락 제어 (백프레셔)
+
+분석 대기열이 가득 차도 모든 업로드를 받으면 과부하가 몇 분짜리 대기와 클라이언트 타임아웃으로 나타납니다.
+수락 전에 대기+실행 중인 분석 수와 사용자별 분석 수를 확인하여, 상한을 넘으면
+429 + Retry-After 로 거절하고 수락한 요청에는 최근 처리 시간으로 계산한 예상 대기 시간을 돌려줍니다.
+
+- background 큐: 이 프로세스가 수락한 분석을 직접 집계 (API 프로세스별 상한)
+- database 큐: analysis_jobs 의 queued/running 작업 수로 판단 (모든 API 프로세스 공유)
+"""
+
+import math
+import threading
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+
+@dataclass
+class AdmissionDecision:
+    """수락 판단 결과"""
+    admitted: bool
+    pending: int  # 이 요청 앞에 있는 (대기 + 실행 중) 분석 수
+    user_pending: int
+    service_time_sec: float  # 분석 1건 예상 처리 시간
+    estimated_wait_sec: float = 0.0  # 수락 시: 분석 시작까지 예상 대기
+    retry_after_sec: int = 0  # 거절 시: 다시 시도할 때까지 권장 대기
+    reason: Optional[str] = None  # 거절 사유: "capacity" / "user_limit"
+
+    @property
+    def estimated_total_sec(self) -> float:
+        return self.estimated_wait_sec + self.service_time_sec
+
+
+class AdmissionController:
+    """대기+실행 중 분석 수 / 사용자별 분석 수 상한으로 요청 수락 여부 결정 (0 이면 제한 없음)"""
+
+    def __init__(self, max_pending: int = 50, max_per_user: int = 3, concurrency: int = 2,
+                 max_retry_after_sec: int = 600):
+        self.max_pending = max_pending
+        self.max_per_user = max_per_user
+        self.concurrency = max(1, concurrency)
+        self.max_retry_after_sec = max_retry_after_sec
+
+        self._lock = threading.Lock()
+        self._local: Dict[str, int] = {}  # task_id → user_id (background 큐에서 수락한 분석)
+        self._stats = {"admitted": 0, "rejected_capacity": 0, "rejected_user_limit": 0}
+
+    def _retry_after(self, seconds: float) -> int:
+        return int(min(self.max_retry_after_sec, max(1, math.ceil(seconds))))
+
+    def evaluate(self, pending: int, user_pending: int, service_time_sec: float) -> AdmissionDecision:
+        """현재 부하로 수락 여부와 예상 대기 시간 계산 (집계는 하지 않음)"""
+        decision = AdmissionDecision(admitted=False, pending=pending, user_pending=user_pending,
+                                     service_time_sec=service_time_sec)
+        if self.max_per_user and user_pending >= self.max_per_user:
+            # 이 사용자의 가장 먼저 시작된 분석이 끝날 즈음 다시 시도
+            decision.reason = "user_limit"
+            decision.retry_after_sec = self._retry_after(service_time_sec)
+        elif self.max_pending and pending >= self.max_pending:
+            # 상한 아래로 내려갈 때까지 처리되어야 하는 분석 수만큼 대기
+            rounds = math.ceil((pending - self.max_pending + 1) / self.concurrency)
+            decision.reason = "capacity"
+            decision.retry_after_sec = self._retry_after(rounds * service_time_sec)
+        else:
+            decision.admitted = True
+            decision.estimated_wait_sec = (pending // self.concurrency) * service_time_sec
+        return decision
+
+    def try_admit_local(self, user_id: int, task_id: str, service_time_sec: float) -> AdmissionDecision:
+        """background 큐: 이 프로세스의 집계로 판단하고 수락하면 바로 등록"""
+        with self._lock:
+            user_pending = sum(1 for owner in self._local.values() if owner == user_id)
+            decision = self.evaluate(len(self._local), user_pending, service_time_sec)
+            if decision.admitted:
+                self._local[task_id] = user_id
+            self._count(decision)
+        return decision
+
+    def try_admit(self, pending: int, user_pending: int, service_time_sec: float) -> AdmissionDecision:
+        """database 큐: 조회한 작업 수로 판단 (등록은 작업 큐가 담당)
+
+        호출자는 작업 수 조회와 작업 등록을 같은 트랜잭션에서 잠금(lock_admission)으로 직렬화해야 합니다.
+        """
+        decision = self.evaluate(pending, user_pending, service_time_sec)
+        self.record(decision)
+        return decision
+
+    def record(self, decision: AdmissionDecision) -> None:
+        """evaluate() 로 미리 판단한 결과를 통계에 반영"""
+        with self._lock:
+            self._count(decision)
+
+    def _count(self, decision: AdmissionDecision) -> None:
+        if decision.admitted:
+            self._stats["admitted"] += 1
+        else:
+            self._stats[f"rejected_{decision.reason}"] += 1
+
+    def release(self, task_id: str) -> None:
+        """분석 종료 (background 큐에서 수락한 분석만 집계에서 제거)"""
+        with self._lock:
+            self._local.pop(task_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(
+                self._stats,
+                local_pending=len(self._local),
+                limits={
+                    "max_pending": self.max_pending,
+                    "max_per_user": self.max_per_user,
+                    "concurrency": self.concurrency,
+                }
+            )
@@ -6,7 +6,6 @@ import pytz
 from sqlalchemy.orm import Session
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
-from langchain_openai import ChatOpenAI
 from ..models.chat import ChatSession, ChatMessage
 from .prompt_manager import PersonaPromptManager
 from pydantic import SecretStr
@@ -14,7 +13,9 @@ from dotenv import load_dotenv
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'llm', 'model'))
 from prompt_chaining import ChainedPromptManager
+from openai_gateway import get_openai_gateway
 
 load_dotenv()
 # OPENAPIKEY 생성 
@@ -29,8 +30,9 @@ class AIService:
         
         # OpenAI API 키가 있으면 
         if OPENAI_API_KEY and str(OPENAI_API_KEY) != "None":
-            self.llm = ChatOpenAI(model="gpt-4o", api_key=OPENAI_API_KEY, 
-                                    temperature=0.9, max_tokens=1000)
+            self.model = "gpt-4o"
+            self.temperature = 0.9
+            self.max_tokens = 1000
         else: # OpenAI API키가 없을 경우 에러 발생 
             raise ValueError("OpenAI API 키가 없습니다. 환경 변수(OPENAI_API_KEY)를 설정해주세요.")
         
@@ -38,6 +40,19 @@ class AIService:
         self.prompt_manager = PersonaPromptManager()
         self.chained_prompt_manager = ChainedPromptManager()
     
+    async def _ainvoke(self, llm_messages: list) -> AIMessage:
+        """공유 OpenAI 게이트웨이로 호출 (동시 호출 수/분당 한도 공유, 대기 중 이벤트 루프를 막지 않음)"""
+        roles = {"system": "system", "human": "user", "ai": "assistant"}
+        response = await get_openai_gateway().acreate_chat_completion(
+            model=self.model,
+            messages=[{"role": roles.get(msg.type, "user"), "content": msg.content} for msg in llm_messages],
+            temperature=self.temperature,
+            max_tokens=self.max_tokens
+        )
+        usage = response.usage
+        token_usage = {"prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens} if usage else {}
+        return AIMessage(content=response.choices[0].message.content or "", response_metadata={"token_usage": token_usage})
+    
     def get_persona_prompt(self, persona_type: str = "내면형", **context) -> str:
         """페르소나별 시스템 프롬프트 생성"""
         return self.prompt_manager.get_persona_prompt(persona_type, **context)
@@ -148,7 +163,7 @@ class AIService:
 """
         return ""
     
-    def process_message(self, session_id: UUID, user_message: str, persona_type: str = "내면형", **context) -> str:
+    async def process_message(self, session_id: UUID, user_message: str, persona_type: str = "내면형", **context) -> str:
         """2단계 체이닝으로 페르소나 챗봇 메시지 처리"""
         try:
             # 세션 정보 가져오기
@@ -166,7 +181,7 @@ class AIService:
             
             # 히스토리 관리: 메시지가 10개 이상이면 요약 업데이트
             if len(messages) >= 10:
-                session = self._manage_conversation_history(session, messages)
+                session = await self._manage_conversation_history(session, messages)
             
             # 컨텍스트에 user_nickname 추가 (context에서 가져오거나 기본값 사용)
             user_nickname = context.get('user_nickname', 'user')
@@ -179,10 +194,10 @@ class AIService:
                 context_with_nickname['character_interaction'] = character_context
             
             # 1단계: 공통 답변 생성 (세션 정보 포함)
-            common_response, tokens_step1 = self._generate_common_response(session, messages, user_message, **context_with_nickname)
+            common_response, tokens_step1 = await self._generate_common_response(session, messages, user_message, **context_with_nickname)
             
             # 2단계: 페르소나별 변환 (컨텍스트 전달)
-            persona_response, tokens_step2 = self._transform_to_persona(common_response, persona_type, user_message, **context_with_nickname)
+            persona_response, tokens_step2 = await self._transform_to_persona(common_response, persona_type, user_message, **context_with_nickname)
             
             # 총 토큰 사용량 출력
             total_tokens = {
@@ -252,7 +267,7 @@ class AIService:
             
             return error_response
     
-    def _generate_common_response(self, session: ChatSession, messages: list, user_message: str, **context) -> Tuple[str, Dict[str, int]]:
+    async def _generate_common_response(self, session: ChatSession, messages: list, user_message: str, **context) -> Tuple[str, Dict[str, int]]:
         """1단계: 공통 규칙으로 기본 답변 생성"""
         try:
             # 공통 규칙 프롬프트 로드
@@ -325,7 +340,7 @@ class AIService:
             llm_messages.append(HumanMessage(content=user_message))
             
             # OpenAI API 호출
-            response = self.llm.invoke(llm_messages)
+            response = await self._ainvoke(llm_messages)
             common_response = response.content
             
             # 토큰 사용량 계산
@@ -338,7 +353,7 @@ class AIService:
             fallback_response = "죄송합니다. 지금 답변을 생성하는데 어려움이 있어요. 조금 더 구체적으로 말씀해주시겠어요?"
             return fallback_response, {'input': 0, 'output': 0}
     
-    def _transform_to_persona(self, common_response: str, persona_type: str, user_message: str, **context) -> Tuple[str, Dict[str, int]]:
+    async def _transform_to_persona(self, common_response: str, persona_type: str, user_message: str, **context) -> Tuple[str, Dict[str, int]]:
         """2단계: 공통 답변을 페르소나 특성에 맞게 변환"""
         try:
             # 페르소나 매핑
@@ -396,7 +411,7 @@ class AIService:
             ]
             
             # OpenAI API 호출
-            response = self.llm.invoke(llm_messages)
+            response = await self._ainvoke(llm_messages)
             persona_response = response.content
             
             # 토큰 사용량 계산
@@ -427,20 +442,20 @@ class AIService:
                 'output': estimated_output
             }
 
-    def get_initial_greeting(self, persona_type: str = "내면형", user_analysis_result: dict = None) -> str:
+    async def get_initial_greeting(self, persona_type: str = "내면형", user_analysis_result: dict = None) -> str:
         """페르소나별 초기 인사 메시지 반환 (그림 분석 결과 반영)"""
         
         # 그림 분석 결과가 있으면 GPT-4o로 개인화된 인사 생성
         if user_analysis_result:
             try:
-                return self._generate_personalized_greeting(persona_type, user_analysis_result)
+                return await self._generate_personalized_greeting(persona_type, user_analysis_result)
             except Exception as e:
                 print(f"개인화된 인사 생성 실패: {e}")
         
         # 기본 인사는 프론트엔드에서 처리하므로 빈 문자열 반환
         return ""
 
-    def _generate_personalized_greeting(self, persona_type: str, user_analysis_result, user_nickname: str = "사용자") -> str:
+    async def _generate_personalized_greeting(self, persona_type: str, user_analysis_result, user_nickname: str = "사용자") -> str:
         """DB에서 가져온 그림 분석 결과를 바탕으로 GPT-4o가 개인화된 첫 인사 생성"""
         
         # DB 결과를 텍스트로 변환
@@ -513,15 +528,13 @@ class AIService:
 - 위에 명시된 모든 페르소나 특성, 말투 규칙, 어조 규칙을 정확히 준수"""
 
         # GPT-4o 호출
-        from langchain.schema import HumanMessage
-        
-        response = self.llm.invoke([HumanMessage(content=prompt)])
+        response = await self._ainvoke([HumanMessage(content=prompt)])
         greeting = response.content.strip()
         
         print(f"[AI] DB 기반 개인화된 인사 생성: {greeting}")
         return greeting
     
-    def _manage_conversation_history(self, session: ChatSession, messages: list) -> ChatSession:
+    async def _manage_conversation_history(self, session: ChatSession, messages: list) -> ChatSession:
         """대화 히스토리 관리: 슬라이딩 윈도우 + 요약 방식"""
         try:
             # 최근 8개 메시지는 유지하고, 나머지는 요약에 포함
@@ -531,7 +544,7 @@ class AIService:
             if old_messages:
                 # 기존 요약과 오래된 메시지들을 합쳐서 새로운 요약 생성
                 old_summary = session.conversation_summary or ""
-                new_summary = self._generate_conversation_summary(old_summary, old_messages)
+                new_summary = await self._generate_conversation_summary(old_summary, old_messages)
                 
                 # 세션에 요약 업데이트
                 session.conversation_summary = new_summary
@@ -546,7 +559,7 @@ class AIService:
             
         return session
     
-    def _generate_conversation_summary(self, existing_summary: str, messages: list) -> str:
+    async def _generate_conversation_summary(self, existing_summary: str, messages: list) -> str:
         """과거 대화 내용을 요약 생성"""
         try:
             # 메시지들을 텍스트로 변환
@@ -576,8 +589,7 @@ class AIService:
 요약:"""
 
             # GPT로 요약 생성
-            from langchain.schema import HumanMessage
-            response = self.llm.invoke([HumanMessage(content=summary_prompt)])
+            response = await self._ainvoke([HumanMessage(content=summary_prompt)])
             summary = response.content.strip()
             
             print(f"[요약] 생성된 대화 요약: {summary}")
@@ -0,0 +1,168 @@
+"""
+그림 분석 작업 큐 (PostgreSQL analysis_jobs 테이블 기반)
+
+API 프로세스는 작업을 등록만 하고, 별도 워커 프로세스(app.worker)가
+SELECT ... FOR UPDATE SKIP LOCKED 로 작업을 하나씩 가져가 실행합니다.
+프로세스가 재시작되어도 작업이 테이블에 남아 있으므로 유실되지 않습니다.
+"""
+
+from datetime import timedelta
+from typing import Optional, Dict, Any, List
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from ..config import settings
+from ..models.test import AnalysisJob, DrawingTest
+
+
+def enqueue_analysis_job(db: Session, test_id: int, task_id: str, description: Optional[str]) -> AnalysisJob:
+    """분석 작업 등록 (커밋은 호출자가 수행)"""
+    job = AnalysisJob(
+        test_id=test_id,
+        task_id=task_id,
+        description=description,
+        status="queued",
+        attempts=0,
+        max_attempts=settings.ANALYSIS_JOB_MAX_ATTEMPTS
+    )
+    db.add(job)
+    return job
+
+
+def claim_next_job(db: Session, worker_id: str) -> Optional[AnalysisJob]:
+    """대기 중인 가장 오래된 작업을 가져와 running 으로 전환
+
+    다른 워커가 잠근 행은 SKIP LOCKED 로 건너뛰므로 워커끼리 대기하지 않습니다.
+    """
+    job = (
+        db.query(AnalysisJob)
+        .filter(AnalysisJob.status == "queued")
+        .order_by(AnalysisJob.created_at, AnalysisJob.job_id)
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+    if job is None:
+        db.rollback()
+        return None
+
+    job.status = "running"
+    job.attempts += 1
+    job.worker_id = worker_id
+    job.started_at = func.now()
+    job.finished_at = None
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def complete_job(db: Session, job_id: int) -> None:
+    """작업 완료 처리"""
+    db.query(AnalysisJob).filter(AnalysisJob.job_id == job_id).update(
+        {"status": "completed", "finished_at": func.now(), "error_message": None},
+        synchronize_session=False
+    )
+    db.commit()
+
+
+def fail_job(db: Session, job_id: int, error_message: str) -> bool:
+    """작업 실패 처리 (재시도 횟수가 남아 있으면 다시 대기열로)
+
+    Returns:
+        bool: 재시도를 위해 다시 대기열에 넣었으면 True, 최종 실패면 False
+    """
+    job = db.query(AnalysisJob).filter(AnalysisJob.job_id == job_id).with_for_update().first()
+    if job is None:
+        db.rollback()
+        return False
+
+    job.error_message = error_message[:2000]
+    if job.attempts < job.max_attempts:
+        job.status = "queued"
+        job.worker_id = None
+        requeued = True
+    else:
+        job.status = "failed"
+        job.finished_at = func.now()
+        requeued = False
+    db.commit()
+    return requeued
+
+
+def recover_stuck_jobs(db: Session, timeout_seconds: Optional[int] = None) -> Dict[str, List[int]]:
+    """오래 running 상태로 남은 작업(죽은 워커의 작업) 복구
+
+    재시도 횟수가 남은 작업은 다시 대기열로, 소진된 작업은 failed 로 전환합니다.
+
+    Returns:
+        Dict: {"requeued": [test_id...], "failed": [test_id...]}
+    """
+    if timeout_seconds is None:
+        timeout_seconds = settings.ANALYSIS_JOB_STUCK_TIMEOUT
+
+    stuck_jobs = (
+        db.query(AnalysisJob)
+        .filter(
+            AnalysisJob.status == "running",
+            AnalysisJob.started_at < func.now() - timedelta(seconds=timeout_seconds)
+        )
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+    recovered = {"requeued": [], "failed": []}
+    for job in stuck_jobs:
+        if job.attempts < job.max_attempts:
+            job.status = "queued"
+            job.worker_id = None
+            job.error_message = "워커 응답 없음 - 재시도 대기"
+            recovered["requeued"].append(job.test_id)
+        else:
+            job.status = "failed"
+            job.finished_at = func.now()
+            job.error_message = "워커 응답 없음 - 재시도 횟수 초과"
+            recovered["failed"].append(job.test_id)
+    db.commit()
+    return recovered
+
+
+def get_queue_stats(db: Session) -> Dict[str, Any]:
+    """상태별 작업 수 조회"""
+    rows = db.query(AnalysisJob.status, func.count(AnalysisJob.job_id)).group_by(AnalysisJob.status).all()
+    counts = {status: count for status, count in rows}
+    return {
+        "queued": counts.get("queued", 0),
+        "running": counts.get("running", 0),
+        "completed": counts.get("completed", 0),
+        "failed": counts.get("failed", 0)
+    }
+
+
+# 수락 판단(작업 수 조회)과 작업 등록을 직렬화하는 트랜잭션 단위 advisory lock 키
+ADMISSION_LOCK_KEY = 0x48545041  # "HTPA"
+
+
+def lock_admission(db: Session) -> None:
+    """현재 트랜잭션이 끝날 때까지 수락 판단 잠금 (커밋/롤백 시 자동 해제)"""
+    db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ADMISSION_LOCK_KEY})
+
+
+def count_pending_jobs(db: Session, user_id: Optional[int] = None) -> int:
+    """대기 + 실행 중인 작업 수 (user_id 를 주면 해당 사용자 작업만)"""
+    query = db.query(func.count(AnalysisJob.job_id)).filter(AnalysisJob.status.in_(("queued", "running")))
+    if user_id is not None:
+        query = query.join(DrawingTest, DrawingTest.test_id == AnalysisJob.test_id).filter(DrawingTest.user_id == user_id)
+    return query.scalar() or 0
+
+
+def get_recent_job_duration(db: Session, limit: int = 20) -> Optional[float]:
+    """최근 완료된 작업의 평균 처리 시간 (초, 기록이 없으면 None)"""
+    rows = (
+        db.query(AnalysisJob.started_at, AnalysisJob.finished_at)
+        .filter(AnalysisJob.status == "completed", AnalysisJob.started_at.isnot(None), AnalysisJob.finished_at.isnot(None))
+        .order_by(AnalysisJob.finished_at.desc())
+        .limit(limit)
+        .all()
+    )
+    durations = [(finished - started).total_seconds() for started, finished in rows]
+    return sum(durations) / len(durations) if durations else None
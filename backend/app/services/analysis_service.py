@@ -1,13 +1,17 @@
 import os
+import math
 import uuid
 import json
 import time
+import asyncio
 import pytz
 import shutil
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple, Callable, Awaitable, AsyncIterator
 from fastapi import UploadFile, HTTPException, BackgroundTasks
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 import PIL.Image as PILImage
 from PIL import ImageOps
@@ -16,6 +20,9 @@ import io
 from ..config import settings
 from ..models.test import DrawingTest, DrawingTestResult
 from ..database import SessionLocal
+from .analysis_queue import enqueue_analysis_job, get_queue_stats, count_pending_jobs, get_recent_job_duration, lock_admission
+from .admission_control import AdmissionController, AdmissionDecision
+from .image_hash_index import get_image_hash_index, get_loaded_image_hash_index, dhash
 
 # HTP 파이프라인 모듈
 import sys
@@ -31,9 +38,29 @@ except Exception as e:
     PipelineConfig = None
     PIPELINE_IMPORT_ERROR = str(e)
 
+try:
+    from crop_by_labels import render_saved_detection
+except Exception:
+    render_saved_detection = None
+
+from status_store import get_status_store
+
 class AnalysisService:
     _instance = None
     _pipeline_instance = None
+    _pipeline_lock = threading.Lock()
+    admission = AdmissionController(
+        max_pending=settings.ANALYSIS_MAX_PENDING,
+        max_per_user=settings.ANALYSIS_MAX_PENDING_PER_USER,
+        concurrency=settings.ANALYSIS_ADMISSION_CONCURRENCY
+    )
+    _warmup_state = {
+        "status": "pending",  # pending, running, completed
+        "started_at": None,
+        "finished_at": None,
+        "models": {},
+        "error": None
+    }
 
     def __new__(cls):
         if cls._instance is None:
@@ -42,7 +69,13 @@ class AnalysisService:
 
     def get_pipeline(self):
         """파이프라인 인스턴스 가져오기 (싱글톤 패턴)"""
-        if self._pipeline_instance is None:
+        if self._pipeline_instance is not None:
+            return self._pipeline_instance
+        
+        with self._pipeline_lock:
+            if self._pipeline_instance is not None:
+                return self._pipeline_instance
+            
             if HTPAnalysisPipeline is None:
                 missing_packages = ["pandas", "transformers", "ultralytics", "torch", "opencv-python", "scikit-learn"]
                 raise HTTPException(
@@ -64,20 +97,229 @@ class AnalysisService:
                 rag_dir=Path(settings.BASE_DIR) / "llm" / "rag",
                 log_dir=Path(settings.BASE_DIR) / "llm" / "logs",
                 yolo_model_path=settings.YOLO_MODEL_PATH,
-                supported_image_formats=tuple(settings.SUPPORTED_IMAGE_FORMATS)
+                yolo_backend=settings.YOLO_BACKEND,
+                supported_image_formats=tuple(settings.SUPPORTED_IMAGE_FORMATS),
+                status_backend=settings.ANALYSIS_STATUS_BACKEND,
+                status_database_url=settings.DATABASE_URL,
+                status_ttl_seconds=settings.ANALYSIS_STATUS_TTL,
+                status_max_entries=settings.ANALYSIS_STATUS_MAX_ENTRIES,
+                stage_cache_enabled=settings.ANALYSIS_CACHE_ENABLED,
+                stage_cache_ttl_seconds=settings.ANALYSIS_CACHE_TTL,
+                stage_cache_max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+                in_memory_handoff=settings.ANALYSIS_IN_MEMORY_HANDOFF,
+                gpt_image_source=settings.ANALYSIS_GPT_IMAGE_SOURCE,
+                render_analyzed_image=settings.ANALYSIS_RENDER_ANALYZED_IMAGE,
+                analysis_mode=settings.ANALYSIS_MODE,
+                adaptive_degradation=settings.ANALYSIS_ADAPTIVE_DEGRADATION,
+                degradation_thresholds=settings.degrade_thresholds,
+                degradation_cooldown_sec=settings.ANALYSIS_DEGRADE_COOLDOWN,
+                rag_from_detection_labels=settings.ANALYSIS_RAG_FROM_LABELS,
+                stream_final_analysis=settings.ANALYSIS_STREAM_FINAL,
+                crop_analysis_top_n=settings.ANALYSIS_CROP_TOP_N,
+                yolo_batch_size=settings.YOLO_BATCH_SIZE,
+                yolo_batch_wait_ms=settings.YOLO_BATCH_WAIT_MS,
+                yolo_pool_size=settings.YOLO_POOL_SIZE,
+                inference_threads=settings.INFERENCE_THREADS,
+                inference_max_concurrent=settings.INFERENCE_MAX_CONCURRENT,
+                inference_sidecar_socket=settings.INFERENCE_SIDECAR_SOCKET or None,
+                gpt_call_max_attempts=settings.GPT_CALL_MAX_ATTEMPTS,
+                gpt_stage_max_attempts=settings.GPT_STAGE_MAX_ATTEMPTS,
+                gpt_job_budget=settings.GPT_JOB_BUDGET,
+                gpt_backoff_base=settings.GPT_BACKOFF_BASE,
+                gpt_backoff_max=settings.GPT_BACKOFF_MAX
             )
             self._pipeline_instance = HTPAnalysisPipeline(config=config)
+            if settings.ANALYSIS_QUEUE_BACKEND == "database":
+                # 워커 프로세스: 대기 중인 작업 수를 품질 단계 조정 부하에 포함
+                self._pipeline_instance.set_load_probe(self._queued_job_count)
         return self._pipeline_instance
 
+    def peek_pipeline(self):
+        """이미 생성된 파이프라인 인스턴스 반환 (없으면 None, 모델을 로드하지 않음)"""
+        return self._pipeline_instance
+
+    def _queued_job_count(self) -> int:
+        """analysis_jobs 의 대기 작업 수"""
+        db = SessionLocal()
+        try:
+            return get_queue_stats(db)["queued"]
+        finally:
+            db.close()
+
+    def get_status_store(self):
+        """분석 진행 상태 저장소 (파이프라인과 같은 인스턴스, 파이프라인 생성 불필요)"""
+        return get_status_store(
+            backend=settings.ANALYSIS_STATUS_BACKEND,
+            database_url=settings.DATABASE_URL,
+            ttl_seconds=settings.ANALYSIS_STATUS_TTL,
+            max_entries=settings.ANALYSIS_STATUS_MAX_ENTRIES
+        )
+
+    def start_warmup(self) -> None:
+        """모델 워밍업을 백그라운드 스레드에서 시작 (시작 이벤트를 막지 않음)"""
+        if self._warmup_state["status"] != "pending":
+            return
+        self._warmup_state["status"] = "running"
+        self._warmup_state["started_at"] = datetime.now().isoformat()
+        threading.Thread(target=self._run_warmup, name="model-warmup", daemon=True).start()
+
+    def _run_warmup(self) -> None:
+        """파이프라인 생성 후 각 모델의 더미 추론 실행"""
+        try:
+            pipeline = self.get_pipeline()
+            self._warmup_state["models"] = pipeline.warmup()
+        except HTTPException as e:
+            self._warmup_state["error"] = str(e.detail)
+        except Exception as e:
+            self._warmup_state["error"] = str(e)
+        finally:
+            self._warmup_state["finished_at"] = datetime.now().isoformat()
+            self._warmup_state["status"] = "completed"
+            print(f"모델 워밍업 종료: {self._warmup_state}")
+
+    def get_readiness(self) -> Dict[str, Any]:
+        """워커 준비 상태 조회 (워밍업 비활성화 시 항상 준비 완료)"""
+        if not settings.MODEL_WARMUP:
+            return {"ready": True, "warmup": "disabled"}
+        
+        state = dict(self._warmup_state)
+        # 파이프라인 생성 실패나 모델 1개라도 워밍업에 실패하면 분석할 수 없으므로 준비되지 않은 것으로 응답
+        models = state.get("models") or {}
+        ready = (
+            state["status"] == "completed"
+            and state.get("error") is None
+            and bool(models)
+            and all(model.get("success") for model in models.values())
+        )
+        return {
+            "ready": ready,
+            "warmup": state
+        }
+
+    def _estimate_analysis_duration(self, db: Session) -> float:
+        """분석 1건 예상 처리 시간 (초): 최근 단계별 처리 시간 또는 최근 작업 처리 시간"""
+        try:
+            if settings.ANALYSIS_QUEUE_BACKEND == "database":
+                duration = get_recent_job_duration(db)
+                if duration:
+                    return duration
+            elif self._pipeline_instance is not None:
+                timings = self._pipeline_instance.get_stage_timings()
+                if all(stage["samples"] for stage in timings.values()):
+                    return sum(stage["avg_sec"] for stage in timings.values())
+        except Exception as e:
+            print(f"분석 처리 시간 조회 실패: {e}")
+        return settings.ANALYSIS_DEFAULT_DURATION
+
+    def _admit_analysis(self, db: Session, user_id: int, task_id: str) -> AdmissionDecision:
+        """수락 제어: 상한을 넘으면 429 + Retry-After
+        
+        database 큐는 여기서 이미지 처리 전에 빠르게 거절만 하고, 최종 판단은 작업 등록 트랜잭션 안에서
+        _admit_queued_job() 이 잠금을 잡고 다시 수행합니다.
+        """
+        service_time = self._estimate_analysis_duration(db)
+        if settings.ANALYSIS_QUEUE_BACKEND == "database":
+            decision = self.admission.evaluate(
+                pending=count_pending_jobs(db),
+                user_pending=count_pending_jobs(db, user_id),
+                service_time_sec=service_time
+            )
+            if not decision.admitted:
+                self.admission.record(decision)
+        else:
+            decision = self.admission.try_admit_local(user_id, task_id, service_time)
+        
+        if not decision.admitted:
+            self._reject_analysis(decision)
+        return decision
+
+    def _admit_queued_job(self, db: Session, user_id: int, service_time_sec: float) -> AdmissionDecision:
+        """database 큐: 작업 등록 트랜잭션 안에서 잠금 후 수락 판단 (동시 업로드가 모두 상한 검사를 통과하지 않도록)
+        
+        잠금은 트랜잭션 커밋/롤백 시 해제되므로 호출자는 판단 직후 작업을 등록하고 커밋해야 합니다.
+        """
+        lock_admission(db)
+        decision = self.admission.try_admit(
+            pending=count_pending_jobs(db),
+            user_pending=count_pending_jobs(db, user_id),
+            service_time_sec=service_time_sec
+        )
+        if not decision.admitted:
+            self._reject_analysis(decision)
+        return decision
+
+    def _reject_analysis(self, decision: AdmissionDecision) -> None:
+        """거절 응답 (429 + Retry-After)"""
+        message = (
+            "진행 중인 분석이 너무 많습니다. 이전 분석이 끝난 뒤 다시 시도해 주세요."
+            if decision.reason == "user_limit" else
+            "현재 분석 요청이 많아 잠시 후 다시 시도해 주세요."
+        )
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "error": message,
+                "reason": decision.reason,
+                "pending": decision.pending,
+                "user_pending": decision.user_pending,
+                "retry_after_seconds": decision.retry_after_sec
+            },
+            headers={"Retry-After": str(decision.retry_after_sec)}
+        )
+
     async def start_analysis(
         self, 
         db: Session, 
         user_id: int, 
         file: UploadFile, 
         description: Optional[str], 
-        background_tasks: BackgroundTasks
+        background_tasks: BackgroundTasks,
+        reuse_duplicate: Optional[bool] = None
     ) -> Dict[str, Any]:
-        """분석 시작: 이미지 저장 및 백그라운드 태스크 등록"""
+        """분석 시작: 수락 제어 후 이미지 저장 및 백그라운드 태스크 등록
+        
+        대기+실행 중 분석 수나 사용자별 분석 수가 상한을 넘으면 429 (Retry-After 헤더 포함)로 거절하고,
+        수락하면 최근 처리 시간으로 계산한 예상 대기/완료 시간을 응답에 포함합니다.
+        
+        같은 사용자가 이전에 올린 그림과 근접 중복이면 설정(ANALYSIS_DUPLICATE_MODE)에 따라
+        기존 결과를 안내(duplicate_of)하거나 분석 없이 재사용합니다.
+        reuse_duplicate 가 True 이면 "offer" 모드에서도 재사용합니다.
+        """
+        unique_id = str(uuid.uuid4())
+        decision = self._admit_analysis(db, user_id, unique_id)
+        try:
+            response, decision = await self._start_analysis(db, user_id, file, description, background_tasks,
+                                                            reuse_duplicate, unique_id, decision)
+        except BaseException:
+            self.admission.release(unique_id)
+            raise
+        
+        if response["status"] != "processing":
+            # 기존 결과 재사용: 실행할 분석 없음
+            self.admission.release(unique_id)
+            return response
+        
+        response["estimated_wait_seconds"] = round(decision.estimated_wait_sec)
+        response["estimated_time_seconds"] = round(decision.estimated_total_sec)
+        response["estimated_time"] = f"약 {max(1, math.ceil(decision.estimated_total_sec / 60))}분 소요 예상"
+        return response
+
+    async def _start_analysis(
+        self, 
+        db: Session, 
+        user_id: int, 
+        file: UploadFile, 
+        description: Optional[str], 
+        background_tasks: BackgroundTasks,
+        reuse_duplicate: Optional[bool],
+        unique_id: str,
+        decision: AdmissionDecision
+    ) -> Tuple[Dict[str, Any], AdmissionDecision]:
+        """이미지 저장 및 분석 작업 등록 (수락 제어 통과 후)
+        
+        Returns:
+            (응답, 수락 판단) — database 큐는 작업 등록 시 잠금 안에서 다시 판단한 결과
+        """
         
         # 1. 파일 검증
         if not file.filename:
@@ -93,9 +335,7 @@ class AnalysisService:
                 detail=f"지원하지 않는 이미지 형식입니다. ({', '.join(settings.SUPPORTED_IMAGE_FORMATS)} 지원)"
             )
 
-        # 2. 고유 ID 및 경로 설정
-        unique_id = str(uuid.uuid4())
-        
+        # 2. 경로 설정
         base_dir = Path(settings.RESULT_DIR) / "images"
         original_dir = base_dir / "original"
         yolo_dir = base_dir / "yolo"
@@ -108,9 +348,9 @@ class AnalysisService:
         yolo_path = yolo_dir / f"{unique_id}.jpg"
         web_path = web_dir / f"{unique_id}.jpg"
         
-        # 파이프라인용 디렉토리 (호환성)
-        pipeline = self.get_pipeline()
-        pipeline_upload_dir = pipeline.config.test_img_dir
+        # 파이프라인용 디렉토리 (호환성, PipelineConfig.test_img_dir 와 동일)
+        # 워커 프로세스가 분석하는 경우 API 프로세스에서 파이프라인을 만들 필요가 없음
+        pipeline_upload_dir = Path(settings.TEST_IMG_DIR)
         pipeline_upload_dir.mkdir(parents=True, exist_ok=True)
         pipeline_image_path = pipeline_upload_dir / f"{unique_id}.jpg"
 
@@ -131,20 +371,34 @@ class AnalysisService:
             # 저장
             pil_image.save(original_path, 'JPEG', quality=95, optimize=True)
             
+            # YOLO 입력 이미지는 1회만 인코딩하여 yolo/파이프라인 경로에 같은 바이트로 저장
             yolo_image = pil_image.copy()
             yolo_image.thumbnail((320, 320), PILImage.Resampling.LANCZOS)
-            yolo_image.save(yolo_path, 'JPEG', quality=10, optimize=True)
+            yolo_buffer = io.BytesIO()
+            yolo_image.save(yolo_buffer, 'JPEG', quality=10, optimize=True)
+            yolo_bytes = yolo_buffer.getvalue()
+            yolo_path.write_bytes(yolo_bytes)
             
             web_image = pil_image.copy()
             web_image.thumbnail((640, 640), PILImage.Resampling.LANCZOS)
             web_image.save(web_path, 'JPEG', quality=85, optimize=True)
             
             # 파이프라인용 복사
-            yolo_image.save(pipeline_image_path, 'JPEG', quality=10, optimize=True)
+            pipeline_image_path.write_bytes(yolo_bytes)
             
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"이미지 처리 중 오류 발생: {str(e)}")
 
+        # 근접 중복 검색 (실패해도 분석은 진행)
+        image_hash = None
+        duplicate = None
+        if settings.ANALYSIS_DUPLICATE_MODE != "off":
+            try:
+                image_hash = dhash(pil_image)
+                duplicate = self._find_duplicate_result(db, user_id, image_hash)
+            except Exception as e:
+                print(f"근접 중복 검색 실패: {e}")
+
         # 4. DB 레코드 생성
         seoul_tz = pytz.timezone('Asia/Seoul')
         utc_now = datetime.utcnow().replace(tzinfo=pytz.UTC)
@@ -157,57 +411,212 @@ class AnalysisService:
         )
         
         db.add(drawing_test)
-        db.commit()
-        db.refresh(drawing_test)
-
-        # 5. 백그라운드 태스크 등록
-        background_tasks.add_task(
-            self.run_background_analysis,
-            unique_id,
-            drawing_test.test_id,
-            description
-        )
+        
+        reuse = duplicate is not None and (
+            settings.ANALYSIS_DUPLICATE_MODE == "reuse" or reuse_duplicate is True
+        ) and reuse_duplicate is not False
+        
+        if reuse:
+            # 5-0. 근접 중복: 기존 결과를 복사하고 분석 생략
+            db.flush()
+            self._copy_result(duplicate["test_result"], drawing_test.test_id, duplicate["unique_id"], unique_id, db)
+            db.commit()
+            db.refresh(drawing_test)
+        elif settings.ANALYSIS_QUEUE_BACKEND == "database":
+            # 5-a. 작업 큐 등록 (테스트 레코드와 같은 트랜잭션, 워커 프로세스가 실행)
+            db.flush()
+            try:
+                decision = self._admit_queued_job(db, user_id, decision.service_time_sec)
+            except HTTPException:
+                db.rollback()
+                for path in (original_path, yolo_path, web_path, pipeline_image_path):
+                    path.unlink(missing_ok=True)
+                raise
+            enqueue_analysis_job(db, drawing_test.test_id, unique_id, description)
+            db.commit()
+            db.refresh(drawing_test)
+        else:
+            db.commit()
+            db.refresh(drawing_test)
+            
+            # 5-b. 백그라운드 태스크 등록 (API 프로세스 내 실행)
+            background_tasks.add_task(
+                self.run_background_analysis,
+                unique_id,
+                drawing_test.test_id,
+                description
+            )
 
-        return {
+        if image_hash is not None:
+            self._add_image_hash(unique_id, image_hash)
+
+        if reuse:
+            return {
+                "message": "이전에 분석한 그림과 같은 그림으로 확인되어 기존 결과를 사용합니다.",
+                "test_id": drawing_test.test_id,
+                "task_id": unique_id,
+                "status": "completed",
+                "duplicate_of": self._duplicate_info(duplicate)
+            }, decision
+
+        response = {
             "message": "이미지 분석이 시작되었습니다.",
             "test_id": drawing_test.test_id,
             "task_id": unique_id,
-            "status": "processing",
-            "estimated_time": "2-3분 소요 예상"
+            "status": "processing"
+        }
+        if duplicate is not None:
+            response["duplicate_of"] = self._duplicate_info(duplicate)
+        return response, decision
+
+    def get_image_hash_index(self):
+        """근접 중복 검색용 이미지 해시 인덱스 (첫 사용 시 로드/재구축)"""
+        return get_image_hash_index(
+            index_path=settings.IMAGE_HASH_INDEX_PATH,
+            original_dir=str(Path(settings.RESULT_DIR) / "images" / "original"),
+            max_distance=settings.ANALYSIS_DUPLICATE_MAX_DISTANCE
+        )
+
+    def _add_image_hash(self, unique_id: str, image_hash: int) -> None:
+        """인덱스에 추가 (로드 중이면 이벤트 루프를 막지 않도록 로드를 기다리는 스레드에서 추가)"""
+        index = get_loaded_image_hash_index()
+        if index is None:
+            threading.Thread(target=self._add_image_hash_when_loaded, args=(unique_id, image_hash),
+                             name="image-hash-add", daemon=True).start()
+            return
+        try:
+            index.add(unique_id, image_hash)
+        except Exception as e:
+            print(f"이미지 해시 인덱스 추가 실패: {e}")
+
+    def _add_image_hash_when_loaded(self, unique_id: str, image_hash: int) -> None:
+        try:
+            self.get_image_hash_index().add(unique_id, image_hash)
+        except Exception as e:
+            print(f"이미지 해시 인덱스 추가 실패: {e}")
+
+    def _find_duplicate_result(self, db: Session, user_id: int, image_hash: int) -> Optional[Dict[str, Any]]:
+        """같은 사용자의 완료된 테스트 중 가장 가까운 근접 중복 조회
+        
+        Returns:
+            Dict: {"drawing_test", "test_result", "unique_id", "distance"} 또는 None
+        """
+        # 시작 시 인덱스 로드/재구축이 끝나지 않았으면 기다리지 않고 중복 검색 생략
+        index = get_loaded_image_hash_index()
+        if index is None:
+            print("이미지 해시 인덱스 로드 중, 근접 중복 검색 생략")
+            return None
+        matches = index.search(image_hash)
+        if not matches:
+            return None
+        
+        distances = {f"result/images/original/{key}.jpg": distance for key, distance in matches}
+        rows = (
+            db.query(DrawingTest, DrawingTestResult)
+            .join(DrawingTestResult, DrawingTestResult.test_id == DrawingTest.test_id)
+            .filter(DrawingTest.user_id == user_id, DrawingTest.image_url.in_(list(distances)))
+            .all()
+        )
+        
+        candidates = [
+            (distances[drawing_test.image_url], drawing_test, test_result)
+            for drawing_test, test_result in rows
+            if self._is_reusable_result(test_result)
+        ]
+        if not candidates:
+            return None
+        
+        distance, drawing_test, test_result = min(candidates, key=lambda x: (x[0], -x[1].test_id))
+        return {
+            "drawing_test": drawing_test,
+            "test_result": test_result,
+            "unique_id": Path(drawing_test.image_url).stem,
+            "distance": distance
         }
 
+    def _is_reusable_result(self, test_result: DrawingTestResult) -> bool:
+        """오류로 저장된 결과는 재사용하지 않음"""
+        summary = test_result.summary_text or ""
+        return not (summary.startswith("분석 중 오류가 발생했습니다") or summary == "분석을 완료할 수 없습니다.")
+
+    def _duplicate_info(self, duplicate: Dict[str, Any]) -> Dict[str, Any]:
+        drawing_test = duplicate["drawing_test"]
+        return {
+            "test_id": drawing_test.test_id,
+            "distance": duplicate["distance"],
+            "submitted_at": drawing_test.submitted_at.isoformat() if drawing_test.submitted_at else None
+        }
+
+    def _copy_result(self, source: DrawingTestResult, test_id: int, source_unique_id: str, unique_id: str, db: Session) -> None:
+        """기존 결과를 새 테스트의 결과로 복사 (커밋은 호출자가 수행)"""
+        seoul_tz = pytz.timezone('Asia/Seoul')
+        utc_now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+        seoul_time = utc_now.astimezone(seoul_tz).replace(tzinfo=None)
+        
+        db.add(DrawingTestResult(
+            test_id=test_id,
+            persona_type=source.persona_type,
+            summary_text=source.summary_text,
+            dog_scores=source.dog_scores,
+            cat_scores=source.cat_scores,
+            rabbit_scores=source.rabbit_scores,
+            bear_scores=source.bear_scores,
+            turtle_scores=source.turtle_scores,
+            quality_tier=source.quality_tier,
+            created_at=seoul_time
+        ))
+        
+        # YOLO 탐지 결과(이미지/JSON)도 새 테스트 이름으로 복사
+        analyzed_dir = Path("result/images/analyzed")
+        for suffix in (".jpg", ".json"):
+            source_file = analyzed_dir / f"{source_unique_id}{suffix}"
+            if source_file.exists():
+                try:
+                    shutil.copy2(source_file, analyzed_dir / f"{unique_id}{suffix}")
+                except Exception as e:
+                    print(f"분석 결과 파일 복사 실패: {e}")
+
     def run_background_analysis(self, unique_id: str, test_id: int, description: Optional[str]):
         """백그라운드 분석 실행"""
         db = SessionLocal()
         try:
-            pipeline = self.get_pipeline()
-            
-            # 분석 실행 (ui_wait=False)
-            result = pipeline.analyze_image(unique_id, ui_wait=False)
-            
-            # 결과 저장
-            self._save_result(result, test_id, description, db)
-            
+            self.process_analysis(unique_id, test_id, description, db)
         except Exception as e:
             print(f"백그라운드 분석 오류: {str(e)}")
-            # 에러 상태 저장 로직
-            try:
-                seoul_tz = pytz.timezone('Asia/Seoul')
-                utc_now = datetime.utcnow().replace(tzinfo=pytz.UTC)
-                seoul_time = utc_now.astimezone(seoul_tz).replace(tzinfo=None)
-                
-                error_result = DrawingTestResult(
-                    test_id=test_id,
-                    persona_type=None,
-                    summary_text=f"분석 중 오류가 발생했습니다: {str(e)}",
-                    created_at=seoul_time
-                )
-                db.add(error_result)
-                db.commit()
-            except Exception as db_error:
-                print(f"오류 상태 저장 실패: {db_error}")
+            self.save_error_result(test_id, str(e), db)
         finally:
             db.close()
+            self.admission.release(unique_id)
+
+    def process_analysis(self, unique_id: str, test_id: int, description: Optional[str], db: Session):
+        """파이프라인 실행 및 결과 저장 (오류는 호출자에게 전달)"""
+        pipeline = self.get_pipeline()
+        
+        # 분석 실행 (ui_wait=False)
+        result = pipeline.analyze_image(unique_id, ui_wait=False)
+        
+        # 결과 저장
+        self._save_result(result, test_id, description, db)
+
+    def save_error_result(self, test_id: int, error_message: str, db: Session):
+        """오류 상태 저장 (상태 조회 시 실패로 표시되도록 결과 레코드 생성)"""
+        try:
+            db.rollback()
+            seoul_tz = pytz.timezone('Asia/Seoul')
+            utc_now = datetime.utcnow().replace(tzinfo=pytz.UTC)
+            seoul_time = utc_now.astimezone(seoul_tz).replace(tzinfo=None)
+            
+            error_result = DrawingTestResult(
+                test_id=test_id,
+                persona_type=None,
+                summary_text=f"분석 중 오류가 발생했습니다: {error_message}",
+                created_at=seoul_time
+            )
+            db.add(error_result)
+            db.commit()
+        except Exception as db_error:
+            db.rollback()
+            print(f"오류 상태 저장 실패: {db_error}")
 
     def _save_result(self, result: Any, test_id: int, description: Optional[str], db: Session):
         """분석 결과 DB 저장"""
@@ -219,6 +628,7 @@ class AnalysisService:
         
         persona_type_id = 2
         summary_text = "분석을 완료할 수 없습니다."
+        quality_tier = getattr(result, 'quality_tier', None)
         persona_scores = {
             'dog_scores': 0.0, 'cat_scores': 0.0, 'rabbit_scores': 0.0, 
             'bear_scores': 0.0, 'turtle_scores': 0.0
@@ -275,11 +685,13 @@ class AnalysisService:
             existing_result.rabbit_scores = persona_scores['rabbit_scores']
             existing_result.bear_scores = persona_scores['bear_scores']
             existing_result.turtle_scores = persona_scores['turtle_scores']
+            existing_result.quality_tier = quality_tier
         else:
             test_result = DrawingTestResult(
                 test_id=test_id,
                 persona_type=persona_type_id,
                 summary_text=summary_text,
+                quality_tier=quality_tier,
                 created_at=seoul_time,
                 **persona_scores
             )
@@ -296,68 +708,77 @@ class AnalysisService:
             db.rollback()
             raise e
 
-    def get_status(self, db: Session, test_id: int, user_id: int) -> Dict[str, Any]:
-        """분석 상태 조회"""
-        drawing_test = db.query(DrawingTest).filter(
-            DrawingTest.test_id == test_id,
-            DrawingTest.user_id == user_id
-        ).first()
+    def _get_test_row(self, db: Session, test_id: int, user_id: int):
+        """테스트와 결과를 1회 조회 (없거나 다른 사용자의 테스트면 404)
+        
+        Returns:
+            tuple: (drawing_test, test_result 또는 None, unique_id 또는 None)
+        """
+        row = (
+            db.query(DrawingTest, DrawingTestResult)
+            .outerjoin(DrawingTestResult, DrawingTestResult.test_id == DrawingTest.test_id)
+            .filter(DrawingTest.test_id == test_id, DrawingTest.user_id == user_id)
+            .first()
+        )
         
-        if not drawing_test:
+        if not row:
             raise HTTPException(status_code=404, detail="해당 테스트를 찾을 수 없습니다.")
+        drawing_test, test_result = row
 
-        # unique_id 추출
+        # unique_id 추출 (result/images/original/{unique_id}.jpg)
         unique_id = None
-        if drawing_test.image_url:
-            import re
-            match = re.search(r'result/images/original/(.+?)\.jpg', drawing_test.image_url)
-            if match:
-                unique_id = match.group(1)
+        if drawing_test.image_url and drawing_test.image_url.startswith("result/images/original/"):
+            unique_id = Path(drawing_test.image_url).stem or None
+        
+        return drawing_test, test_result, unique_id
 
-        # 결과 조회
-        test_result = db.query(DrawingTestResult).filter(DrawingTestResult.test_id == test_id).first()
+    def _build_progress_status(self, test_id: int, status_info: Dict[str, Any]) -> Dict[str, Any]:
+        """상태 저장소 정보를 진행 중 응답으로 변환"""
+        detection_completed = status_info.get("detection_completed", False)
+        analysis_completed = status_info.get("analysis_completed", False)
+        classification_completed = status_info.get("classification_completed", False)
+        
+        steps = [
+            {"name": "객체 탐지", "description": "YOLO를 사용한 그림 요소 검출", "completed": detection_completed, "current": not detection_completed},
+            {"name": "심리 분석", "description": "GPT-4를 사용한 심리상태 분석", "completed": analysis_completed, "current": detection_completed and not analysis_completed},
+            {"name": "성격 분류", "description": "키워드 분류기를 사용한 성격유형 분류", "completed": classification_completed, "current": analysis_completed and not classification_completed}
+        ]
+        
+        current_step = next((i+1 for i, step in enumerate(steps) if step["current"]), 1)
+        completed_steps = sum(1 for step in steps if step["completed"])
+        
+        if classification_completed:
+            return {
+                "test_id": test_id,
+                "status": "processing",
+                "message": "최종 결과 생성 중...",
+                "steps": steps,
+                "current_step": 3,
+                "completed_steps": 3,
+                "total_steps": 3,
+                "estimated_remaining": "잠시만 기다려주세요"
+            }
+        
+        return {
+            "test_id": test_id,
+            "status": "processing",
+            "message": f"단계 {current_step}/3 진행 중...",
+            "steps": steps,
+            "current_step": current_step,
+            "completed_steps": completed_steps,
+            "total_steps": 3,
+            "estimated_remaining": f"{4-completed_steps}분 소요 예상"
+        }
+
+    def get_status(self, db: Session, test_id: int, user_id: int) -> Dict[str, Any]:
+        """분석 상태 조회 (테스트+결과 1회 조회, 진행 중이면 상태 저장소 1회 조회)"""
+        drawing_test, test_result, unique_id = self._get_test_row(db, test_id, user_id)
         
         if not test_result:
             # 진행 중 상태 확인
-            pipeline = self.get_pipeline()
             if unique_id:
-                status_info = pipeline.get_analysis_status(unique_id)
-                
-                detection_completed = status_info.get("detection_completed", False)
-                analysis_completed = status_info.get("analysis_completed", False)
-                classification_completed = status_info.get("classification_completed", False)
-                
-                steps = [
-                    {"name": "객체 탐지", "description": "YOLO를 사용한 그림 요소 검출", "completed": detection_completed, "current": not detection_completed},
-                    {"name": "심리 분석", "description": "GPT-4를 사용한 심리상태 분석", "completed": analysis_completed, "current": detection_completed and not analysis_completed},
-                    {"name": "성격 분류", "description": "키워드 분류기를 사용한 성격유형 분류", "completed": classification_completed, "current": analysis_completed and not classification_completed}
-                ]
-                
-                current_step = next((i+1 for i, step in enumerate(steps) if step["current"]), 1)
-                completed_steps = sum(1 for step in steps if step["completed"])
-                
-                if classification_completed:
-                    return {
-                        "test_id": test_id,
-                        "status": "processing",
-                        "message": "최종 결과 생성 중...",
-                        "steps": steps,
-                        "current_step": 3,
-                        "completed_steps": 3,
-                        "total_steps": 3,
-                        "estimated_remaining": "잠시만 기다려주세요"
-                    }
-                
-                return {
-                    "test_id": test_id,
-                    "status": "processing",
-                    "message": f"단계 {current_step}/3 진행 중...",
-                    "steps": steps,
-                    "current_step": current_step,
-                    "completed_steps": completed_steps,
-                    "total_steps": 3,
-                    "estimated_remaining": f"{4-completed_steps}분 소요 예상"
-                }
+                status_info = self.get_status_store().get(unique_id) or {}
+                return self._build_progress_status(test_id, status_info)
             
             return {
                 "test_id": test_id,
@@ -370,6 +791,8 @@ class AnalysisService:
             }
 
         # 완료된 결과 반환
+        if unique_id:
+            self._ensure_analyzed_image(unique_id)
         personality_mapping = {1: "추진형", 2: "내면형", 3: "관계형", 4: "쾌락형", 5: "안정형"}
         
         probabilities = {
@@ -411,11 +834,102 @@ class AnalysisService:
                     "confidence": max(probabilities.values()) / 100.0 if probabilities else 0.0
                 },
                 "created_at": test_result.created_at.isoformat() if test_result.created_at else None,
+                "quality_tier": test_result.quality_tier,
                 "image_url": drawing_test.image_url,
                 "analyzed_image_url": unique_id and f"result/images/analyzed/{unique_id}.jpg" or None
             }
         }
 
+    def _ensure_analyzed_image(self, unique_id: str) -> None:
+        """바운딩 박스 이미지가 아직 없으면 저장된 탐지 결과로 그려서 저장 (결과를 처음 조회할 때 1회)"""
+        analyzed_dir = Path("result/images/analyzed")
+        image_path = analyzed_dir / f"{unique_id}.jpg"
+        detection_path = analyzed_dir / f"{unique_id}.json"
+        if image_path.exists() or not detection_path.exists() or render_saved_detection is None:
+            return
+        try:
+            source_path = Path(settings.RESULT_DIR) / "images" / "yolo" / f"{unique_id}.jpg"
+            render_saved_detection(detection_path, source_path, image_path)
+        except Exception as e:
+            print(f"분석 이미지 생성 실패 ({unique_id}): {e}")
+
+    def open_status_stream(self, db: Session, test_id: int, user_id: int):
+        """상태 스트림 시작 전 권한 확인 및 현재 상태 조회 (스트림 시작 전에 404 반환)
+        
+        Returns:
+            tuple: (현재 상태 응답, unique_id)
+        """
+        _, _, unique_id = self._get_test_row(db, test_id, user_id)
+        return self.get_status(db, test_id, user_id), unique_id
+
+    def _load_status(self, test_id: int, user_id: int) -> Dict[str, Any]:
+        """별도 세션으로 상태 조회 (스트리밍 중 사용)"""
+        db = SessionLocal()
+        try:
+            return self.get_status(db, test_id, user_id)
+        finally:
+            db.close()
+
+    async def iter_status_events(
+        self,
+        test_id: int,
+        user_id: int,
+        unique_id: Optional[str],
+        initial_status: Dict[str, Any],
+        is_disconnected: Callable[[], Awaitable[bool]]
+    ) -> AsyncIterator[Tuple[Optional[str], Optional[Dict[str, Any]]]]:
+        """단계 전이(detection, analysis, classification, done)를 이벤트로 전달
+        
+        진행 중에는 상태 저장소만 감시하고, DB는 완료 확인 시에만 조회합니다.
+        (이벤트명, 데이터) 를 반환하며 (None, None) 은 연결 유지용 keepalive 입니다.
+        """
+        yield "status", initial_status
+        if initial_status.get("status") in ("completed", "failed"):
+            return
+        
+        store = self.get_status_store()
+        store_is_local = settings.ANALYSIS_STATUS_BACKEND == "memory"
+        poll_interval = settings.ANALYSIS_EVENTS_POLL_INTERVAL
+        
+        started = time.monotonic()
+        last_sent = started
+        last_db_check = started
+        last_stage = None
+        
+        while time.monotonic() - started < settings.ANALYSIS_EVENTS_MAX_DURATION:
+            if await is_disconnected():
+                return
+            
+            now = time.monotonic()
+            status_info = {}
+            if unique_id:
+                status_info = store.get(unique_id) if store_is_local else await run_in_threadpool(store.get, unique_id)
+                status_info = status_info or {}
+            stage = status_info.get("stage")
+            
+            if stage and stage != last_stage:
+                last_stage = stage
+                event = self._build_progress_status(test_id, status_info)
+                event["stage"] = stage
+                yield "stage", event
+                last_sent = now
+            
+            # 파이프라인 종료 후 결과 저장 확인, 그 외에는 워커 실패 등에 대비해 가끔만 DB 확인
+            if stage in ("done", "error") or now - last_db_check >= settings.ANALYSIS_EVENTS_DB_CHECK_INTERVAL:
+                last_db_check = now
+                current = await run_in_threadpool(self._load_status, test_id, user_id)
+                if current.get("status") in ("completed", "failed"):
+                    yield current["status"], current
+                    return
+            
+            if now - last_sent >= 15:
+                yield None, None
+                last_sent = now
+            
+            await asyncio.sleep(poll_interval)
+        
+        yield "timeout", {"test_id": test_id, "status": "processing", "message": "상태 스트림 시간이 초과되었습니다. 상태 조회 API를 사용해주세요."}
+
 analysis_service = AnalysisService()
 
 def get_analysis_service() -> AnalysisService:
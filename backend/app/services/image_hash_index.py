@@ -0,0 +1,197 @@
+"""
+그림 근접 중복 검색 (지각 해시 인덱스)
+
+같은 그림을 조금 다른 구도/노출로 다시 찍어 올린 경우를 찾기 위해
+업로드 원본마다 64비트 dHash 를 계산하고, 해밍 거리 기준으로 검색합니다.
+
+- 다중 인덱스 해싱: 64비트를 (최대 거리 + 1)개 구간으로 나누면 거리 이내의 해시는
+  적어도 한 구간이 정확히 일치하므로(비둘기집 원리), 구간별 dict 조회로 후보를 좁힌 뒤
+  후보만 해밍 거리를 계산합니다. 100만 건에서도 조회당 후보 수백 개 수준입니다.
+- 해시는 추가 전용 파일(unique_id<TAB>hex)에 기록하여 재시작/다른 워커 프로세스에서도
+  다시 읽고, 파일이 없으면 result/images/original 에서 재구축합니다.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+HASH_BITS = 64
+
+
+def dhash(image: Image.Image, hash_size: int = 8) -> int:
+    """차이 해시(dHash) 계산 - 노출/크기 변화에 강한 64비트 지각 해시"""
+    gray = ImageOps.grayscale(image).resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS)
+    pixels = list(gray.getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def dhash_file(path) -> int:
+    """이미지 파일의 dHash (EXIF 회전 반영)"""
+    with Image.open(path) as img:
+        try:
+            img = ImageOps.exif_transpose(img)
+        except Exception:
+            pass
+        return dhash(img)
+
+
+class ImageHashIndex:
+    """해밍 거리 검색용 다중 인덱스 해시 테이블"""
+
+    def __init__(self, max_distance: int = 4, index_path: Optional[str] = None):
+        self.max_distance = max_distance
+        self.index_path = Path(index_path) if index_path else None
+
+        # 64비트를 max_distance + 1 개 구간으로 분할 (앞 구간이 1비트씩 더 길 수 있음)
+        band_count = max_distance + 1
+        base, extra = divmod(HASH_BITS, band_count)
+        self._bands: List[Tuple[int, int]] = []
+        shift = HASH_BITS
+        for i in range(band_count):
+            width = base + (1 if i < extra else 0)
+            shift -= width
+            self._bands.append((shift, (1 << width) - 1))
+
+        self._tables: List[Dict[int, List[int]]] = [{} for _ in self._bands]
+        self._keys: List[str] = []
+        self._hashes: List[int] = []
+        self._positions: Dict[str, int] = {}
+        self._file_offset = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _add_locked(self, key: str, value: int) -> None:
+        if key in self._positions:
+            return
+        position = len(self._keys)
+        self._keys.append(key)
+        self._hashes.append(value)
+        self._positions[key] = position
+        for table, (shift, mask) in zip(self._tables, self._bands):
+            table.setdefault((value >> shift) & mask, []).append(position)
+
+    def add(self, key: str, value: int) -> None:
+        """해시 추가 (인덱스 파일에도 기록)"""
+        with self._lock:
+            if key in self._positions:
+                return
+            self._sync_from_file()
+            self._add_locked(key, value)
+            if self.index_path:
+                self.index_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.index_path, "a", encoding="utf-8") as f:
+                    synced = f.tell() == self._file_offset
+                    f.write(f"{key}\t{value:016x}\n")
+                    # 그 사이 다른 프로세스가 추가한 줄이 있으면 다음 동기화에서 읽음 (중복 키는 무시)
+                    if synced:
+                        self._file_offset = f.tell()
+
+    def search(self, value: int, max_distance: Optional[int] = None, limit: int = 5) -> List[Tuple[str, int]]:
+        """해밍 거리 이내의 항목을 가까운 순으로 반환
+
+        Returns:
+            List: [(key, 거리), ...]
+        """
+        if max_distance is None or max_distance > self.max_distance:
+            max_distance = self.max_distance
+
+        with self._lock:
+            self._sync_from_file()
+            matches = {}
+            for table, (shift, mask) in zip(self._tables, self._bands):
+                for position in table.get((value >> shift) & mask, ()):
+                    if position in matches:
+                        continue
+                    distance = (self._hashes[position] ^ value).bit_count()
+                    if distance <= max_distance:
+                        matches[position] = distance
+            ranked = sorted(matches.items(), key=lambda x: x[1])[:limit]
+            return [(self._keys[position], distance) for position, distance in ranked]
+
+    def _sync_from_file(self) -> None:
+        """다른 프로세스가 인덱스 파일에 추가한 항목 반영"""
+        if not self.index_path or not self.index_path.exists():
+            return
+        if self.index_path.stat().st_size <= self._file_offset:
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            f.seek(self._file_offset)
+            for line in f:
+                if not line.endswith("\n"):
+                    break  # 다른 프로세스가 쓰는 중인 줄
+                self._file_offset += len(line.encode("utf-8"))
+                try:
+                    key, hex_value = line.rstrip("\n").split("\t")
+                    self._add_locked(key, int(hex_value, 16))
+                except ValueError:
+                    continue
+
+    def load(self) -> None:
+        """인덱스 파일 읽기"""
+        with self._lock:
+            self._sync_from_file()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._keys), "bands": len(self._bands), "max_distance": self.max_distance}
+
+
+def rebuild_index_file(original_dir, index_path) -> int:
+    """원본 이미지 디렉토리에서 인덱스 파일을 다시 생성
+
+    Returns:
+        int: 기록한 이미지 수
+    """
+    original_dir = Path(original_dir)
+    index_path = Path(index_path)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_suffix(index_path.suffix + ".tmp")
+
+    count = 0
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for image_path in sorted(original_dir.glob("*.jpg")):
+            try:
+                f.write(f"{image_path.stem}\t{dhash_file(image_path):016x}\n")
+                count += 1
+            except Exception as e:
+                print(f"이미지 해시 계산 실패: {image_path}: {e}")
+    os.replace(tmp_path, index_path)
+    return count
+
+
+# 프로세스 전역 인덱스 (첫 사용 시 파일에서 로드)
+_INDEX: Optional[ImageHashIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_image_hash_index(index_path: str, original_dir: str, max_distance: int = 4) -> ImageHashIndex:
+    """공유 이미지 해시 인덱스 반환 (인덱스 파일이 없으면 원본 이미지에서 재구축)"""
+    global _INDEX
+
+    if _INDEX is not None:
+        return _INDEX
+
+    with _INDEX_LOCK:
+        if _INDEX is None:
+            if not Path(index_path).exists() and Path(original_dir).exists():
+                count = rebuild_index_file(original_dir, index_path)
+                print(f"이미지 해시 인덱스 재구축 완료: {count}개")
+            index = ImageHashIndex(max_distance=max_distance, index_path=index_path)
+            index.load()
+            _INDEX = index
+    return _INDEX
+
+
+def get_loaded_image_hash_index() -> Optional[ImageHashIndex]:
+    """로드가 끝난 공유 인덱스 반환 (로드/재구축 중이거나 아직 로드하지 않았으면 기다리지 않고 None)"""
+    return _INDEX
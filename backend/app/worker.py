@@ -0,0 +1,129 @@
+"""
+그림 분석 워커 프로세스
+
+analysis_jobs 테이블에서 작업을 가져와 HTPAnalysisPipeline 으로 실행합니다.
+API 서버(ANALYSIS_QUEUE_BACKEND=database)와 별도로 실행하여 웹/ML 용량을 따로 늘릴 수 있습니다.
+
+실행:
+  python -m app.worker
+  python -m app.worker --concurrency 4
+"""
+
+import os
+import time
+import signal
+import socket
+import argparse
+import threading
+import traceback
+
+from .config import settings
+from .database import SessionLocal
+from .services.analysis_queue import claim_next_job, complete_job, fail_job, recover_stuck_jobs
+from .services.analysis_service import analysis_service
+
+# 주기적으로 멈춘 작업을 복구하는 간격 (초)
+RECOVERY_INTERVAL = 60
+
+
+class AnalysisWorker:
+    """analysis_jobs 큐를 소비하는 워커 (스레드 N개)"""
+
+    def __init__(self, concurrency: int, poll_interval: float):
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop_event = threading.Event()
+
+    def stop(self, *args):
+        """현재 작업을 마친 뒤 종료"""
+        print(f"[worker {self.worker_id}] 종료 요청 수신 - 진행 중인 작업 완료 후 종료합니다.")
+        self._stop_event.set()
+
+    def _recover(self):
+        db = SessionLocal()
+        try:
+            recovered = recover_stuck_jobs(db)
+            if recovered["requeued"] or recovered["failed"]:
+                print(f"[worker {self.worker_id}] 멈춘 작업 복구: {recovered}")
+            for test_id in recovered["failed"]:
+                analysis_service.save_error_result(test_id, "분석 작업이 재시도 횟수를 초과했습니다.", db)
+        except Exception as e:
+            print(f"[worker {self.worker_id}] 멈춘 작업 복구 실패: {e}")
+        finally:
+            db.close()
+
+    def _run_job(self, db, job):
+        print(f"[worker {self.worker_id}] 작업 시작: job_id={job.job_id}, test_id={job.test_id} (시도 {job.attempts}/{job.max_attempts})")
+        start_time = time.time()
+        try:
+            analysis_service.process_analysis(job.task_id, job.test_id, job.description, db)
+            complete_job(db, job.job_id)
+            print(f"[worker {self.worker_id}] 작업 완료: job_id={job.job_id} ({time.time() - start_time:.2f}초)")
+        except Exception as e:
+            traceback.print_exc()
+            db.rollback()
+            requeued = fail_job(db, job.job_id, str(e))
+            if requeued:
+                print(f"[worker {self.worker_id}] 작업 실패, 재시도 대기열 등록: job_id={job.job_id}: {e}")
+            else:
+                print(f"[worker {self.worker_id}] 작업 최종 실패: job_id={job.job_id}: {e}")
+                analysis_service.save_error_result(job.test_id, str(e), db)
+
+    def _loop(self):
+        while not self._stop_event.is_set():
+            db = SessionLocal()
+            try:
+                job = claim_next_job(db, self.worker_id)
+                if job is None:
+                    self._stop_event.wait(self.poll_interval)
+                    continue
+                self._run_job(db, job)
+            except Exception as e:
+                print(f"[worker {self.worker_id}] 작업 루프 오류: {e}")
+                self._stop_event.wait(self.poll_interval)
+            finally:
+                db.close()
+
+    def run(self):
+        print(f"[worker {self.worker_id}] 시작 (동시 실행 {self.concurrency}개)")
+
+        # 파이프라인(모델)을 먼저 로드하여 첫 작업 지연 제거
+        analysis_service.get_pipeline()
+        if settings.MODEL_WARMUP:
+            analysis_service.get_pipeline().warmup()
+
+        # 이전 워커가 비정상 종료하며 남긴 작업 복구
+        self._recover()
+
+        threads = [
+            threading.Thread(target=self._loop, name=f"analysis-worker-{i}", daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+
+        while not self._stop_event.wait(RECOVERY_INTERVAL):
+            self._recover()
+
+        for thread in threads:
+            thread.join()
+        print(f"[worker {self.worker_id}] 종료")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="그림 분석 워커 프로세스")
+    parser.add_argument('--concurrency', type=int, default=settings.ANALYSIS_WORKER_CONCURRENCY,
+                        help=f'동시에 실행할 분석 작업 수 (기본값: {settings.ANALYSIS_WORKER_CONCURRENCY})')
+    parser.add_argument('--poll-interval', type=float, default=settings.ANALYSIS_WORKER_POLL_INTERVAL,
+                        help='대기 작업이 없을 때 재확인 간격 (초)')
+    args = parser.parse_args()
+
+    worker = AnalysisWorker(concurrency=args.concurrency, poll_interval=args.poll_interval)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+심리 분석 모드별 지연시간/토큰 비용 벤치마크 (two_call vs single_call)
+
+고정된 이미지 세트로 두 분석 경로를 반복 실행하여 건당 p50/p95 지연시간, GPT 호출 수,
+입력/출력 토큰과 예상 비용을 비교합니다. OpenAI 대신 로컬 대체 모델을 사용합니다.
+
+- simulated: 프로세스 내 가상 모델 (첫 토큰 지연 + 출력 토큰 / 초당 토큰 수 만큼 대기, 고정 JSON 응답)
+- local: OpenAI 호환 로컬 서버 (--base-url, 예: llama.cpp / vLLM / Ollama 의 /v1)
+
+OpenSearch 에 연결할 수 없으면 RAG 검색도 고정 지연(--rag-ms)의 가상 검색으로 대체합니다.
+
+사용 예:
+  python benchmark_analysis_modes.py
+  python benchmark_analysis_modes.py --runs 5 --ttft-ms 600 --tokens-per-sec 40
+  python benchmark_analysis_modes.py --stand-in local --base-url http://localhost:11434/v1 --model llava
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from types import SimpleNamespace
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(BASE_DIR, "llm", "model")
+sys.path.insert(0, MODEL_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, "llm", "opensearch_modules"))
+
+SAMPLE_ANALYSIS = {
+    "features": {
+        "house": ["작은 크기의 집", "창문이 적음"],
+        "tree": ["가지가 위로 뻗은 나무", "뿌리가 드러남"],
+        "person": ["팔이 짧은 인물", "표정이 단순함"],
+        "overall": ["종이 중앙 배치", "약한 필압"]
+    },
+    "psychological_analysis": {
+        "house": "가정에 대한 관심이 크지만 정서적 교류는 제한적인 것으로 보입니다.",
+        "tree": "성장 욕구가 강하며 현실에 뿌리내리려는 경향을 나타냅니다.",
+        "person": "대인관계에서 조심스러운 태도를 보이는 경향이 있습니다."
+    },
+    "keywords": ["불안", "애정결핍", "성장욕구", "위축", "안정"],
+    "summary": "전반적으로 안정을 바라면서도 관계에서 조심스러운 모습이 보입니다."
+}
+
+
+def sample_response(completion_tokens: int) -> str:
+    """출력 토큰 수에 맞춘 고정 JSON 응답 (한국어 글자 수 / 2 ≈ 토큰)"""
+    analysis = json.loads(json.dumps(SAMPLE_ANALYSIS))
+    filler = " 스스로의 감정을 조절하려는 노력이 엿보입니다."
+    while len(json.dumps(analysis, ensure_ascii=False)) // 2 < completion_tokens:
+        analysis["summary"] += filler
+    return json.dumps(analysis, ensure_ascii=False)
+
+
+class SimulatedChatCompletions:
+    """AsyncOpenAI chat.completions 대체 (지연시간 모델 + 고정 응답)"""
+
+    def __init__(self, ttft_ms: float, tokens_per_sec: float, completion_tokens: int):
+        self.ttft = ttft_ms / 1000
+        self.tokens_per_sec = tokens_per_sec
+        self.content = sample_response(completion_tokens)
+        self.completion_tokens = len(self.content) // 2
+
+    def _usage(self, request):
+        from openai_gateway import estimate_request_tokens
+        prompt_tokens = estimate_request_tokens(request["messages"])
+        return SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=self.completion_tokens,
+                               total_tokens=prompt_tokens + self.completion_tokens)
+
+    async def create(self, stream=False, stream_options=None, **request):
+        await asyncio.sleep(self.ttft)
+        if stream:
+            return self._stream(request)
+        await asyncio.sleep(self.completion_tokens / self.tokens_per_sec)
+        message = SimpleNamespace(role="assistant", content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+                               usage=self._usage(request))
+
+    async def _stream(self, request):
+        chunk_chars = 16
+        for i in range(0, len(self.content), chunk_chars):
+            await asyncio.sleep(chunk_chars / 2 / self.tokens_per_sec)
+            delta = SimpleNamespace(content=self.content[i:i + chunk_chars])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta, finish_reason=None)], usage=None)
+        yield SimpleNamespace(choices=[], usage=self._usage(request))
+
+
+def load_image_set(image_dir: Path, count: int):
+    """고정 이미지 세트 (JPEG 바이트, 없으면 결정적으로 생성한 이미지)"""
+    paths = sorted(image_dir.glob("*.jpg"))[:count] if image_dir.exists() else []
+    images = [p.read_bytes() for p in paths]
+    if not images:
+        from PIL import Image, ImageDraw
+        print(f"⚠️ {image_dir} 에 이미지가 없어 생성한 이미지를 사용합니다.")
+        for i in range(count):
+            img = Image.new("RGB", (1280, 960), "white")
+            draw = ImageDraw.Draw(img)
+            draw.rectangle((100 + i * 20, 400, 500, 800), outline="black", width=4)
+            draw.ellipse((800, 200 + i * 10, 1100, 500), outline="black", width=4)
+            buffer = io.BytesIO()
+            img.save(buffer, format="JPEG", quality=90)
+            images.append(buffer.getvalue())
+    return images
+
+
+def simulate_rag(rag_ms: float):
+    """OpenSearch 없이 고정 지연 후 고정 문서를 돌려주는 검색"""
+    def search_rag_candidates(query_elements, k=10):
+        time.sleep(rag_ms / 1000)
+        return [{
+            "id": f"house_창문_{i}", "document": "house", "element": "창문", "score": 1.0 - i * 0.1,
+            "text": "창문을 많이 그린 점은 자신에게 관심을 가져 주었으면 하는 바램",
+            "metadata": {"keywords": ["관심 요구"]}
+        } for i in range(min(k, 3))]
+    return search_rag_candidates
+
+
+def percentile(values, ratio):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="심리 분석 모드별 지연시간/토큰 비용 벤치마크")
+    parser.add_argument('--image-dir', type=str, default=os.path.join(BASE_DIR, "llm", "test_images"), help='입력 이미지 디렉토리')
+    parser.add_argument('--images', type=int, default=8, help='고정 이미지 세트 크기')
+    parser.add_argument('--runs', type=int, default=3, help='이미지별 반복 횟수')
+    parser.add_argument('--modes', type=str, nargs='+', default=["two_call", "single_call"], help='비교할 분석 모드')
+    parser.add_argument('--labels', type=str, nargs='+', default=["house", "tree", "person", "window", "door"], help='단일 호출 모드에 줄 탐지 라벨')
+    parser.add_argument('--stand-in', type=str, default="simulated", choices=["simulated", "local"], help='OpenAI 대체 모델')
+    parser.add_argument('--base-url', type=str, default="http://localhost:8080/v1", help='local: OpenAI 호환 서버 주소')
+    parser.add_argument('--model', type=str, default=None, help='local: 모델 이름')
+    parser.add_argument('--ttft-ms', type=float, default=500, help='simulated: 첫 토큰까지 지연 (ms)')
+    parser.add_argument('--tokens-per-sec', type=float, default=60, help='simulated: 초당 출력 토큰 수')
+    parser.add_argument('--completion-tokens', type=int, default=700, help='simulated: 응답 출력 토큰 수')
+    parser.add_argument('--rag-ms', type=float, default=300, help='OpenSearch 가 없을 때 가상 검색 지연 (ms)')
+    parser.add_argument('--price-input', type=float, default=2.5, help='입력 토큰 100만개당 USD (gpt-4o)')
+    parser.add_argument('--price-output', type=float, default=10.0, help='출력 토큰 100만개당 USD (gpt-4o)')
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "local-stand-in")
+    if args.model:
+        os.environ["GPT_ANALYSIS_MODEL"] = args.model
+
+    from openai_gateway import configure_openai_gateway
+    import analyze_images_with_gpt as gpt
+
+    limits = dict(max_concurrent=8, requests_per_minute=10 ** 6, tokens_per_minute=10 ** 9)
+    if args.stand_in == "simulated":
+        completions = SimulatedChatCompletions(args.ttft_ms, args.tokens_per_sec, args.completion_tokens)
+        gateway = configure_openai_gateway(client=SimpleNamespace(chat=SimpleNamespace(completions=completions)), **limits)
+    else:
+        gateway = configure_openai_gateway(base_url=args.base_url, api_key=os.environ["OPENAI_API_KEY"], **limits)
+
+    if gpt.get_opensearch_client() is None:
+        print(f"⚠️ OpenSearch 를 사용할 수 없어 가상 검색({args.rag_ms:.0f}ms)을 사용합니다.")
+        gpt.search_rag_candidates = simulate_rag(args.rag_ms)
+
+    images = load_image_set(Path(args.image_dir), args.images)
+    label_counts = {label: 1 for label in args.labels}
+    print(f"대체 모델: {args.stand_in}, 이미지 {len(images)}장 x {args.runs}회, 모드: {', '.join(args.modes)}\n")
+
+    rows = []
+    for mode in args.modes:
+        latencies = []
+        before = gateway.stats()
+        for run in range(args.runs):
+            for i, image_bytes in enumerate(images):
+                start = time.perf_counter()
+                if mode == "single_call":
+                    result = gpt.analyze_image_gpt_single_call(f"bench{i}", image_bytes=image_bytes, label_counts=label_counts)
+                else:
+                    result = gpt.analyze_image_gpt(f"bench{i}", image_bytes=image_bytes)
+                latencies.append(time.perf_counter() - start)
+                if result is None:
+                    print(f"❌ {mode} 분석 실패 (이미지 {i})")
+        after = gateway.stats()
+        count = len(latencies)
+        calls = (after["requests"] - before["requests"]) / count
+        prompt_tokens = (after["prompt_tokens"] - before["prompt_tokens"]) / count
+        completion_tokens = (after["completion_tokens"] - before["completion_tokens"]) / count
+        cost = (prompt_tokens * args.price_input + completion_tokens * args.price_output) / 10 ** 6 * 1000
+        rows.append((mode, percentile(latencies, 0.5), percentile(latencies, 0.95), calls, prompt_tokens, completion_tokens, cost))
+
+    print(f"\n{'모드':>12} {'p50 ms':>9} {'p95 ms':>9} {'호출/건':>7} {'입력 토큰':>9} {'출력 토큰':>9} {'USD/1000건':>11}")
+    for mode, p50, p95, calls, prompt_tokens, completion_tokens, cost in rows:
+        print(f"{mode:>12} {p50 * 1000:>9.1f} {p95 * 1000:>9.1f} {calls:>7.2f} {prompt_tokens:>9.0f} {completion_tokens:>9.0f} {cost:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+동시 분석 수별 모델 추론 지연시간 벤치마크 (CPU)
+
+분석 1건의 모델 추론(YOLO 탐지 + BERT 분류, --with-rag 이면 KURE-v1 임베딩 + 리랭커)을
+동시 실행 수 1/2/4/8 로 반복 실행하여 건당 p50/p95 지연시간과 처리량을 측정합니다.
+torch 스레드 설정은 프로세스 전역이므로 스케줄러 사용/미사용은 각각 따로 실행해 비교합니다.
+
+사용 예:
+  python benchmark_inference_concurrency.py
+  python benchmark_inference_concurrency.py --unscheduled
+  python benchmark_inference_concurrency.py --concurrency 1 2 4 8 --requests 32 --max-concurrent 2 --with-rag
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(BASE_DIR, "llm", "model")
+sys.path.insert(0, MODEL_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, "llm", "opensearch_modules"))
+
+SAMPLE_KEYWORDS = ["불안", "위축", "안정", "관계", "자신감"]
+
+
+def load_images(image_dir: Path, count: int):
+    """벤치마크용 이미지 배열 준비 (없으면 무작위 이미지)"""
+    import cv2
+    import numpy as np
+
+    paths = sorted(image_dir.glob("*.jpg"))[:count] if image_dir.exists() else []
+    images = [img for img in (cv2.imread(str(p)) for p in paths) if img is not None]
+    if not images:
+        print(f"⚠️ {image_dir} 에 이미지가 없어 무작위 이미지를 사용합니다.")
+        rng = np.random.default_rng(0)
+        images = [rng.integers(0, 255, (640, 640, 3), dtype=np.uint8) for _ in range(4)]
+    return images
+
+
+def percentile(values, ratio):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="동시 분석 수별 모델 추론 지연시간 벤치마크")
+    parser.add_argument('--model', type=str, default=os.path.join(MODEL_DIR, "best.pt"), help='YOLO 모델 경로')
+    parser.add_argument('--image-dir', type=str, default=os.path.join(BASE_DIR, "llm", "test_images"), help='입력 이미지 디렉토리')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8], help='측정할 동시 분석 수')
+    parser.add_argument('--requests', type=int, default=32, help='동시 실행 수별 분석 건수')
+    parser.add_argument('--threads', type=int, default=0, help='추론 전체 스레드 수 (0 이면 코어 수)')
+    parser.add_argument('--max-concurrent', type=int, default=2, help='동시에 실행할 무거운 추론 수')
+    parser.add_argument('--yolo-pool-size', type=int, default=2, help='YOLO 모델 풀 크기')
+    parser.add_argument('--unscheduled', action='store_true', help='스케줄러 제한 없이 측정 (추론마다 모든 코어 사용)')
+    parser.add_argument('--with-rag', action='store_true', help='KURE-v1 임베딩 + 리랭커 포함 (OpenSearch 필요)')
+    args = parser.parse_args()
+
+    # GPU 가 있어도 CPU 지연시간만 측정
+    os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+    from inference_scheduler import configure_inference_scheduler, DEFAULT_MODEL_LIMITS
+    cpu_count = os.cpu_count() or 1
+    if args.unscheduled:
+        # 슬롯 제한 없이 추론마다 코어 수만큼 스레드 사용 (기본 런타임 동작과 같음)
+        scheduler = configure_inference_scheduler(total_threads=cpu_count * 64, max_concurrent=64, model_limits={})
+    else:
+        scheduler = configure_inference_scheduler(
+            total_threads=args.threads or None,
+            max_concurrent=args.max_concurrent,
+            model_limits=dict(DEFAULT_MODEL_LIMITS, yolo=args.yolo_pool_size)
+        )
+
+    from crop_by_labels import detect_objects_batch, get_yolo_model_pool
+    from keyword_classifier import get_keyword_classifier, warmup_keyword_classifier
+
+    pool = get_yolo_model_pool(args.model, size=max(args.yolo_pool_size, max(args.concurrency) if args.unscheduled else 0))
+    pool.warmup()
+    warmup_keyword_classifier()
+    classifier = get_keyword_classifier()
+
+    rag_client = None
+    if args.with_rag:
+        from analyze_images_with_gpt import get_opensearch_client
+        rag_client = get_opensearch_client()
+        if rag_client is None:
+            print("❌ OpenSearch 클라이언트를 초기화할 수 없습니다.")
+            sys.exit(1)
+
+    images = load_images(Path(args.image_dir), 16)
+    print(f"모드: {'스케줄러 미사용' if args.unscheduled else '스케줄러 사용'} {scheduler.runtime_info()}")
+    print(f"이미지 {len(images)}장, 분석 {args.requests}건/단계, RAG {'포함' if rag_client else '제외'}\n")
+
+    def run_analysis(i):
+        start = time.perf_counter()
+        detect_objects_batch([images[i % len(images)]], args.model)
+        if rag_client is not None:
+            results = rag_client.hybrid_search("psychology_analysis", "집 창문 크기", k=5, use_reranker=True)
+            rag_client.rerank_results("집 창문 크기", results)
+        classifier.predict_from_keywords(SAMPLE_KEYWORDS)
+        return time.perf_counter() - start
+
+    print(f"{'동시':>4} {'p50 ms':>9} {'p95 ms':>9} {'분석/초':>9}")
+    for concurrency in args.concurrency:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(run_analysis, range(concurrency)))  # 동시 실행 수별 첫 실행은 제외
+            start = time.perf_counter()
+            latencies = list(executor.map(run_analysis, range(args.requests)))
+            elapsed = time.perf_counter() - start
+        print(f"{concurrency:>4} {percentile(latencies, 0.5) * 1000:>9.1f} {percentile(latencies, 0.95) * 1000:>9.1f} "
+              f"{args.requests / elapsed:>9.2f}")
+
+    print(f"\n모델별 대기/실행 시간: {scheduler.stats()['models']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+YOLO 배치 추론 처리량 벤치마크 (CPU)
+
+배치 크기별로 detect_objects_batch 를 반복 실행하여 초당 처리 이미지 수를 측정합니다.
+이미지 디렉토리를 지정하지 않으면 llm/test_images 의 jpg 를, 없으면 무작위 이미지를 사용합니다.
+
+사용 예:
+  python benchmark_yolo_batch.py
+  python benchmark_yolo_batch.py --batch-sizes 1 4 8 16 --images 64 --threads 4
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(BASE_DIR, "llm", "model")
+sys.path.insert(0, MODEL_DIR)
+
+
+def load_images(image_dir: Path, count: int, size: int):
+    """벤치마크용 이미지 배열 준비 (부족하면 반복 사용)"""
+    import cv2
+    import numpy as np
+
+    paths = sorted(image_dir.glob("*.jpg"))[:count] if image_dir.exists() else []
+    images = [img for img in (cv2.imread(str(p)) for p in paths) if img is not None]
+    if not images:
+        print(f"⚠️ {image_dir} 에 이미지가 없어 무작위 이미지를 사용합니다.")
+        rng = np.random.default_rng(0)
+        images = [rng.integers(0, 255, (size, size, 3), dtype=np.uint8) for _ in range(min(count, 8))]
+    return [images[i % len(images)] for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO 배치 추론 처리량 벤치마크 (CPU)")
+    parser.add_argument('--model', type=str, default=os.path.join(MODEL_DIR, "best.pt"), help='YOLO 모델 경로')
+    parser.add_argument('--image-dir', type=str, default=os.path.join(BASE_DIR, "llm", "test_images"),
+                        help='입력 이미지 디렉토리')
+    parser.add_argument('--images', type=int, default=64, help='배치 크기별 처리할 이미지 수')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 4, 8, 16], help='측정할 배치 크기')
+    parser.add_argument('--size', type=int, default=320, help='무작위 이미지 크기')
+    parser.add_argument('--threads', type=int, default=None, help='torch CPU 스레드 수')
+    args = parser.parse_args()
+
+    # GPU 가 있어도 CPU 처리량만 측정
+    os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+    import torch
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    from crop_by_labels import detect_objects_batch, warmup_yolo_model
+
+    print(f"모델: {args.model}")
+    print(f"torch 스레드: {torch.get_num_threads()}")
+    warmup_yolo_model(args.model)
+
+    images = load_images(Path(args.image_dir), args.images, args.size)
+    print(f"이미지 {len(images)}장, 크기 예: {images[0].shape[1]}x{images[0].shape[0]}\n")
+
+    print(f"{'batch':>6} {'images/sec':>12} {'ms/image':>10} {'ms/batch':>10}")
+    baseline = None
+    for batch_size in args.batch_sizes:
+        # 배치 크기별 첫 실행은 측정에서 제외
+        detect_objects_batch(images[:batch_size], args.model)
+
+        start = time.perf_counter()
+        batches = 0
+        for i in range(0, len(images), batch_size):
+            detect_objects_batch(images[i:i + batch_size], args.model)
+            batches += 1
+        elapsed = time.perf_counter() - start
+
+        throughput = len(images) / elapsed
+        baseline = baseline or throughput
+        print(f"{batch_size:>6} {throughput:>12.2f} {elapsed / len(images) * 1000:>10.1f} "
+              f"{elapsed / batches * 1000:>10.1f}  (x{throughput / baseline:.2f})")
+
+
+if __name__ == "__main__":
+    main()
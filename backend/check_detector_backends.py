@@ -0,0 +1,138 @@
+"""
+YOLO 탐지기 백엔드 비교 (PyTorch vs ONNX Runtime)
+
+test_images 의 이미지로 각 백엔드를 실행하여
+- 정합성: PyTorch 결과와 라벨/박스가 일치하는지 (같은 라벨끼리 IoU 기준 매칭)
+- 지연시간: 이미지당 평균/p95 추론 시간 (CPU)
+을 비교하고, 정합성 기준을 통과한 백엔드 중 가장 빠른 것을 YOLO_BACKEND 권장값으로 출력합니다.
+정합성 기준을 통과하지 못한 백엔드가 있으면 종료 코드 1을 반환합니다.
+
+사용 예:
+  python check_detector_backends.py
+  python check_detector_backends.py --backends pytorch onnx onnx-int8 --iou 0.9 --repeat 3
+"""
+
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(BASE_DIR, "llm", "model")
+sys.path.insert(0, MODEL_DIR)
+
+
+def box_iou(a, b):
+    """두 박스(x1, y1, x2, y2)의 IoU"""
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, ix2 - ix1) * max(0.0, iy2 - iy1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def to_detections(result):
+    """Results 를 [(라벨, (x1, y1, x2, y2), 신뢰도)] 로 변환"""
+    detections = []
+    if result is None or result.boxes is None:
+        return detections
+    for box in result.boxes:
+        detections.append((
+            result.names[int(box.cls[0])],
+            tuple(float(v) for v in box.xyxy[0]),
+            float(box.conf[0])
+        ))
+    return detections
+
+
+def match_detections(reference, candidate, iou_threshold):
+    """같은 라벨끼리 IoU 가 가장 큰 박스를 1:1 매칭
+
+    Returns:
+        tuple: (매칭 수, 기준 박스 수, 후보 박스 수)
+    """
+    unmatched = list(candidate)
+    matched = 0
+    for label, box, _ in reference:
+        best_index, best_iou = None, iou_threshold
+        for i, (other_label, other_box, _) in enumerate(unmatched):
+            if other_label != label:
+                continue
+            iou = box_iou(box, other_box)
+            if iou >= best_iou:
+                best_index, best_iou = i, iou
+        if best_index is not None:
+            unmatched.pop(best_index)
+            matched += 1
+    return matched, len(reference), len(candidate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO 탐지기 백엔드 정합성/지연시간 비교")
+    parser.add_argument('--model', type=str, default=os.path.join(MODEL_DIR, "best.pt"), help='YOLO 가중치 경로 (.pt)')
+    parser.add_argument('--image-dir', type=str, default=os.path.join(BASE_DIR, "llm", "test_images"), help='비교할 이미지 디렉토리')
+    parser.add_argument('--backends', type=str, nargs='+', default=["pytorch", "onnx", "onnx-int8"], help='비교할 백엔드')
+    parser.add_argument('--iou', type=float, default=0.9, help='박스 일치로 볼 최소 IoU')
+    parser.add_argument('--min-recall', type=float, default=0.98, help='정합성 통과 기준 (PyTorch 박스 중 일치 비율)')
+    parser.add_argument('--repeat', type=int, default=3, help='지연시간 측정 반복 횟수')
+    args = parser.parse_args()
+
+    # GPU 가 있어도 CPU 기준으로 비교
+    os.environ.setdefault("CUDA_VISIBLE_DEVICES", "")
+
+    import cv2
+    from crop_by_labels import detect_objects_batch, warmup_yolo_model
+
+    image_paths = sorted(Path(args.image_dir).glob("*.jpg"))
+    images = [img for img in (cv2.imread(str(p)) for p in image_paths) if img is not None]
+    if not images:
+        print(f"❌ 비교할 이미지가 없습니다: {args.image_dir}")
+        sys.exit(1)
+    print(f"이미지 {len(images)}장: {args.image_dir}\n")
+
+    backends = ["pytorch"] + [b for b in args.backends if b != "pytorch"]
+    detections, latencies = {}, {}
+    for backend in backends:
+        warmup_yolo_model(args.model, backend)
+        per_image = []
+        outputs = []
+        for image in images:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                result = detect_objects_batch([image], args.model, backend)[0]
+                timings.append(time.perf_counter() - start)
+            per_image.append(min(timings))
+            outputs.append(to_detections(result))
+        detections[backend] = outputs
+        latencies[backend] = sorted(per_image)
+
+    print(f"{'backend':>10} {'mean ms':>9} {'p95 ms':>8} {'recall':>8} {'extra':>6}  정합성")
+    passed = []
+    failed = False
+    for backend in backends:
+        timings = latencies[backend]
+        mean_ms = sum(timings) / len(timings) * 1000
+        p95_ms = timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000
+
+        matched = reference_total = candidate_total = 0
+        for reference, candidate in zip(detections["pytorch"], detections[backend]):
+            m, r, c = match_detections(reference, candidate, args.iou)
+            matched, reference_total, candidate_total = matched + m, reference_total + r, candidate_total + c
+        recall = matched / reference_total if reference_total else 1.0
+        extra = candidate_total - matched
+        ok = recall >= args.min_recall
+        if ok:
+            passed.append((mean_ms, backend))
+        else:
+            failed = True
+        print(f"{backend:>10} {mean_ms:>9.1f} {p95_ms:>8.1f} {recall:>8.3f} {extra:>6}  {'✅' if ok else '❌'}")
+
+    fastest = min(passed)[1] if passed else "pytorch"
+    print(f"\n권장 YOLO_BACKEND={fastest}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+API 부팅 임포트 시간 예산 검사
+
+`python -X importtime` 으로 대상 모듈을 새 프로세스에서 임포트하여
+- 전체 누적 임포트 시간이 예산을 넘는지
+- 임포트 시점에 로드되면 안 되는 무거운 모델 라이브러리가 로드되는지
+를 확인합니다. 예산을 넘거나 금지 모듈이 로드되면 종료 코드 1을 반환합니다.
+
+사용 예:
+  python check_import_time.py
+  python check_import_time.py --module main --budget-ms 3000
+"""
+
+import os
+import sys
+import argparse
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(BASE_DIR, "llm", "model")
+
+# 첫 분석 요청(또는 워밍업) 전까지 로드되면 안 되는 모듈
+FORBIDDEN_MODULES = [
+    "ultralytics",
+    "sentence_transformers",
+    "transformers",
+    "opensearchpy",
+    "huggingface_hub",
+    "onnxruntime",
+]
+
+
+def measure_import_time(module: str):
+    """새 인터프리터에서 모듈을 임포트하고 -X importtime 결과를 파싱
+
+    Returns:
+        tuple: (전체 누적 시간(us), {모듈명: 누적 시간(us)})
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [BASE_DIR, MODEL_DIR, env.get("PYTHONPATH")]))
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"모듈 임포트 실패: {module}\n{proc.stderr[-2000:]}")
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        # 형식: "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            modules[name.strip()] = int(cumulative.strip())
+        except ValueError:
+            continue
+
+    total_us = modules.get(module, 0)
+    return total_us, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API 부팅 임포트 시간 예산 검사")
+    parser.add_argument('--module', type=str, default='app.main', help='검사할 모듈 (기본값: app.main)')
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv("IMPORT_TIME_BUDGET_MS", "3000")),
+                        help='허용 누적 임포트 시간 (ms, 기본값: 3000)')
+    parser.add_argument('--top', type=int, default=15, help='출력할 상위 모듈 수')
+    args = parser.parse_args()
+
+    total_us, modules = measure_import_time(args.module)
+    total_ms = total_us / 1000
+
+    print(f"임포트 대상: {args.module}")
+    print(f"누적 임포트 시간: {total_ms:.1f}ms (예산 {args.budget_ms:.0f}ms)")
+    print(f"\n상위 {args.top}개 모듈 (누적):")
+    # 인터프리터 시작 시 로드되는 모듈은 제외
+    startup_modules = {"site", "encodings", args.module}
+    top_level = {name: us for name, us in modules.items() if "." not in name and name not in startup_modules}
+    for name, us in sorted(top_level.items(), key=lambda x: -x[1])[:args.top]:
+        print(f"  {us / 1000:8.1f}ms  {name}")
+
+    loaded_forbidden = [name for name in FORBIDDEN_MODULES if name in modules]
+    failed = False
+
+    if loaded_forbidden:
+        failed = True
+        print(f"\n❌ 임포트 시점에 로드되면 안 되는 모듈: {', '.join(loaded_forbidden)}")
+
+    if total_ms > args.budget_ms:
+        failed = True
+        print(f"\n❌ 임포트 시간 예산 초과: {total_ms:.1f}ms > {args.budget_ms:.0f}ms")
+
+    if not failed:
+        print("\n✅ 임포트 시간 예산 통과")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
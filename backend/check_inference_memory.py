@@ -0,0 +1,99 @@
+"""
+추론 구성별 메모리 사용량 비교
+
+- in-process: 워커가 모든 모델을 직접 로드 (기존 구성)
+- sidecar: 사이드카 1개가 모델을 로드하고 워커는 소켓으로 호출
+
+각 구성의 워커(와 사이드카) RSS 를 측정하고, 워커 N개일 때 총 메모리를 추정합니다.
+워커 측정은 새 프로세스에서 모델 워밍업 후 RSS 를 읽습니다.
+
+사용 예:
+  python check_inference_memory.py
+  python check_inference_memory.py --workers 4 --modes in-process sidecar
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(BASE_DIR, "llm", "model")
+sys.path.insert(0, MODEL_DIR)
+
+# 워커 프로세스에서 실행: 파이프라인 모듈 임포트 → 모델 워밍업 → RSS 출력
+WORKER_SCRIPT = """
+import json, os, sys
+sys.path.insert(0, {model_dir!r})
+sys.path.insert(0, {opensearch_dir!r})
+import crop_by_labels, keyword_classifier, analyze_images_with_gpt
+from inference_sidecar import LocalInferenceBackend, get_sidecar_client, current_rss_mb
+client = get_sidecar_client({socket_path!r}) or LocalInferenceBackend()
+report = client.warmup()
+print(json.dumps({{"rss_mb": current_rss_mb(), "warmup": report}}))
+"""
+
+
+def run_worker(socket_path=None):
+    env = dict(os.environ, CUDA_VISIBLE_DEVICES="")
+    env.pop("INFERENCE_SIDECAR_SOCKET", None)
+    script = WORKER_SCRIPT.format(
+        model_dir=MODEL_DIR,
+        opensearch_dir=os.path.join(BASE_DIR, "llm", "opensearch_modules"),
+        socket_path=socket_path
+    )
+    proc = subprocess.run([sys.executable, "-c", script], cwd=BASE_DIR, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"워커 측정 실패\n{proc.stderr[-2000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def measure_sidecar():
+    """사이드카를 띄우고 (사이드카 RSS, 워커 RSS) 측정"""
+    from inference_sidecar import get_sidecar_client
+
+    socket_path = os.path.join(tempfile.mkdtemp(prefix="htp-sidecar-"), "inference.sock")
+    env = dict(os.environ, CUDA_VISIBLE_DEVICES="")
+    sidecar = subprocess.Popen(
+        [sys.executable, os.path.join(BASE_DIR, "run_inference_sidecar.py"), "--socket", socket_path],
+        cwd=BASE_DIR, env=env
+    )
+    try:
+        deadline = time.time() + 600
+        while not os.path.exists(socket_path):
+            if sidecar.poll() is not None or time.time() > deadline:
+                raise RuntimeError("사이드카 시작 실패")
+            time.sleep(0.5)
+        worker = run_worker(socket_path)
+        sidecar_stats = get_sidecar_client(socket_path).stats()
+        return sidecar_stats["rss_mb"], worker["rss_mb"]
+    finally:
+        sidecar.terminate()
+        sidecar.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추론 구성별 메모리 사용량 비교")
+    parser.add_argument('--workers', type=int, default=4, help='총 메모리를 추정할 API 워커 수')
+    parser.add_argument('--modes', type=str, nargs='+', default=["in-process", "sidecar"], help='측정할 구성')
+    args = parser.parse_args()
+
+    rows = []
+    if "in-process" in args.modes:
+        worker_rss = run_worker()["rss_mb"]
+        rows.append(("in-process", 0.0, worker_rss))
+    if "sidecar" in args.modes:
+        sidecar_rss, worker_rss = measure_sidecar()
+        rows.append(("sidecar", sidecar_rss, worker_rss))
+
+    print(f"{'구성':>12} {'사이드카 MB':>12} {'워커당 MB':>10} {f'워커 {args.workers}개 총 MB':>16}")
+    for mode, sidecar_rss, worker_rss in rows:
+        total = sidecar_rss + worker_rss * args.workers
+        print(f"{mode:>12} {sidecar_rss:>12.1f} {worker_rss:>10.1f} {total:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
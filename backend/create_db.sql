@@ -85,10 +85,38 @@ CREATE TABLE IF NOT EXISTS "drawing_test_results" (
   "turtle_scores" decimal(5,2),
   "thumbs_up" int4,
   "thumbs_down" int4,
+  "quality_tier" varchar(20),
   "created_at" timestamp NOT NULL DEFAULT (now()),
   PRIMARY KEY ("result_id")
 );
 
+CREATE TABLE IF NOT EXISTS "analysis_jobs" (
+  "job_id" serial4 NOT NULL,
+  "test_id" int4 NOT NULL,
+  "task_id" varchar(64) NOT NULL UNIQUE,
+  "description" text,
+  "status" varchar(20) NOT NULL DEFAULT 'queued',
+  "attempts" int4 NOT NULL DEFAULT 0,
+  "max_attempts" int4 NOT NULL DEFAULT 3,
+  "worker_id" varchar(128),
+  "error_message" text,
+  "created_at" timestamp NOT NULL DEFAULT (now()),
+  "started_at" timestamp,
+  "finished_at" timestamp,
+  PRIMARY KEY ("job_id")
+);
+
+-- 기존 데이터베이스: 분석 품질 단계 컬럼 추가
+ALTER TABLE "drawing_test_results" ADD COLUMN IF NOT EXISTS "quality_tier" varchar(20);
+
+-- 분석 진행 상태 저장소 (ANALYSIS_STATUS_BACKEND=postgres, uvicorn 워커/분석 워커가 공유)
+CREATE TABLE IF NOT EXISTS "analysis_status" (
+  "status_key" varchar(128) NOT NULL,
+  "data" text NOT NULL,
+  "expires_at" timestamp NOT NULL,
+  PRIMARY KEY ("status_key")
+);
+
 CREATE UNIQUE INDEX "social_users_social_id_key" ON "social_users" ("social_id");
 
 CREATE UNIQUE INDEX "drawing_test_results_test_id_key" ON "drawing_test_results" ("test_id");
@@ -98,6 +126,10 @@ CREATE UNIQUE INDEX "drawing_test_results_test_id_key" ON "drawing_test_results"
 CREATE INDEX "idx_drawing_tests_user_id" ON "drawing_tests" ("user_id");
 CREATE INDEX "idx_drawing_test_results_created_at" ON "drawing_test_results" ("created_at" DESC);
 CREATE INDEX "idx_drawing_tests_user_submitted" ON "drawing_tests" ("user_id", "submitted_at" DESC);
+-- 분석 작업 큐: 워커가 대기 작업을 오래된 순으로 가져감
+CREATE INDEX "idx_analysis_jobs_status_created" ON "analysis_jobs" ("status", "created_at");
+-- 분석 진행 상태: 만료된 행 정리
+CREATE INDEX "idx_analysis_status_expires_at" ON "analysis_status" ("expires_at");
 
 ALTER TABLE "user_informations" ADD CONSTRAINT "user_informations_regular_user_id_fkey" FOREIGN KEY ("regular_user_id") REFERENCES "users" ("user_id") ON DELETE CASCADE;
 
@@ -120,4 +152,6 @@ ALTER TABLE "chat_messages" ADD CONSTRAINT "chat_messages_session_id_fkey" FOREI
 
 ALTER TABLE "drawing_test_results" ADD CONSTRAINT "drawing_test_results_persona_type_fkey" FOREIGN KEY ("persona_type") REFERENCES "personas" ("persona_id");
 
-ALTER TABLE "drawing_test_results" ADD CONSTRAINT "drawing_test_results_test_id_fkey" FOREIGN KEY ("test_id") REFERENCES "drawing_tests" ("test_id") ON DELETE CASCADE;
\ No newline at end of file
+ALTER TABLE "drawing_test_results" ADD CONSTRAINT "drawing_test_results_test_id_fkey" FOREIGN KEY ("test_id") REFERENCES "drawing_tests" ("test_id") ON DELETE CASCADE;
+
+ALTER TABLE "analysis_jobs" ADD CONSTRAINT "analysis_jobs_test_id_fkey" FOREIGN KEY ("test_id") REFERENCES "drawing_tests" ("test_id") ON DELETE CASCADE;
\ No newline at end of file
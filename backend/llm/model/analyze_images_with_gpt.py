@@ -1,51 +1,103 @@
 import base64
-print("DEBUG: analyze_images_with_gpt.py imported")
 import os
-import openai
 from dotenv import load_dotenv
 import sys
 import json
+import threading
+import time
 import numpy as np
-from openai import OpenAI
 import re
 from PIL import Image, ImageOps
 import io
 from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+
+from retry_policy import get_default_retry_policy, is_retriable_error, RetryBudgetExceeded
+from openai_gateway import get_openai_gateway
+from stage_cache import content_hash
+from stream_json import IncrementalJSONFieldParser
 
 load_dotenv()
 
 sys.path.append(os.path.dirname(__file__))
 sys.path.append(os.path.join(os.path.dirname(__file__), '../opensearch_modules'))
 
-from opensearch_client import OpenSearchEmbeddingClient
-opensearch_client = OpenSearchEmbeddingClient(host=os.getenv('OPENSEARCH_HOST', 'opensearch-node'))
-
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# 그림 분석 모델 (OpenAI 호환 로컬 모델로 대체할 때 변경)
+GPT_ANALYSIS_MODEL = os.getenv("GPT_ANALYSIS_MODEL", "gpt-4o")
+
+# GPT 전송용 이미지 인코딩 캐시 (내용 해시 → ImagePayload, 재업로드/재분석 시 재사용)
+IMAGE_DATA_URL_PREFIX = "data:image/jpeg;base64,"
+MAX_IMAGE_BASE64_LENGTH = 20 * 1024 * 1024  # OpenAI 이미지 입력 한도 (20MB)
+_PAYLOAD_CACHE_MAX_ENTRIES = int(os.getenv("GPT_IMAGE_PAYLOAD_CACHE_SIZE", "64"))
+_PAYLOAD_CACHE: "OrderedDict[str, ImagePayload]" = OrderedDict()
+_PAYLOAD_CACHE_LOCK = threading.Lock()
+_PAYLOAD_STATS = {"hits": 0, "misses": 0, "encode_sec": 0.0}
 
 IMAGE_DIR = os.path.join(os.path.dirname(__file__), '../detection_results/images')
 RESULT_DIR = os.path.join(os.path.dirname(__file__), '../detection_results/results')
 
-# OpenSearch RAG 시스템 초기화
-try:
-    # 작업 디렉토리를 opensearch_modules로 변경하여 임베딩 파일 접근
-    original_cwd = os.getcwd()
-    opensearch_modules_dir = os.path.join(os.path.dirname(__file__), '../opensearch_modules')
-    os.chdir(opensearch_modules_dir)
-    
-    opensearch_client = OpenSearchEmbeddingClient(host=os.getenv('OPENSEARCH_HOST', 'opensearch-node'))
-    RAG_INDEX_NAME = "psychology_analysis"
-    
-    # 작업 디렉토리 복구
-    os.chdir(original_cwd)
-    print("OpenSearch RAG 시스템 초기화 완료")
-except Exception as e:
-    print(f"OpenSearch 초기화 실패: {e}")
-    opensearch_client = None
-    # 작업 디렉토리 복구 (에러 발생 시에도)
-    try:
-        os.chdir(original_cwd)
-    except:
-        pass
+RAG_INDEX_NAME = "psychology_analysis"
+
+# OpenSearch RAG 클라이언트 (첫 사용 시 1회 생성, 프로세스 내 공유)
+_OPENSEARCH_CLIENT = None
+_OPENSEARCH_LOCK = threading.Lock()
+_OPENSEARCH_LAST_FAILURE = None
+_OPENSEARCH_RETRY_INTERVAL = 60  # 초기화 실패 후 재시도까지 대기 시간 (초)
+
+def get_opensearch_client():
+    """공유 OpenSearch RAG 클라이언트 반환 (임포트 시점이 아닌 첫 호출 시 생성)
+    
+    Returns:
+        OpenSearchEmbeddingClient: 초기화 실패 시 None
+    """
+    global _OPENSEARCH_CLIENT, _OPENSEARCH_LAST_FAILURE
+    
+    if _OPENSEARCH_CLIENT is not None:
+        return _OPENSEARCH_CLIENT
+    
+    with _OPENSEARCH_LOCK:
+        if _OPENSEARCH_CLIENT is not None:
+            return _OPENSEARCH_CLIENT
+        
+        # 최근 실패 직후에는 요청마다 연결/모델 로드를 반복하지 않음
+        if _OPENSEARCH_LAST_FAILURE and time.time() - _OPENSEARCH_LAST_FAILURE < _OPENSEARCH_RETRY_INTERVAL:
+            return None
+        
+        try:
+            from opensearch_client import OpenSearchEmbeddingClient
+            from inference_sidecar import get_sidecar_client
+            _OPENSEARCH_CLIENT = OpenSearchEmbeddingClient(
+                host=os.getenv('OPENSEARCH_HOST', 'opensearch-node'),
+                inference_client=get_sidecar_client()
+            )
+            _OPENSEARCH_LAST_FAILURE = None
+            print("OpenSearch RAG 시스템 초기화 완료")
+        except Exception as e:
+            print(f"OpenSearch 초기화 실패: {e}")
+            _OPENSEARCH_LAST_FAILURE = time.time()
+    
+    return _OPENSEARCH_CLIENT
+
+def warmup_embedding_model():
+    """KURE-v1 임베딩 모델로 더미 쿼리를 1회 인코딩 (첫 요청 지연 제거)"""
+    opensearch_client = get_opensearch_client()
+    if not opensearch_client:
+        raise RuntimeError("OpenSearch 클라이언트가 초기화되지 않았습니다.")
+    opensearch_client.model.encode("집 나무 사람")
+
+def warmup_reranker_model():
+    """Reranker 모델로 더미 쌍을 1회 스코어링 (첫 요청 지연 제거)"""
+    opensearch_client = get_opensearch_client()
+    if not opensearch_client:
+        raise RuntimeError("OpenSearch 클라이언트가 초기화되지 않았습니다.")
+    if not opensearch_client.reranker_available:
+        raise RuntimeError("Reranker 모델을 사용할 수 없습니다.")
+    opensearch_client.reranker.predict([["집", "집의 크기"]])
+
 def extract_psychological_elements(analysis_text):
     """
     GPT 분석 결과에서 심리 분석 요소들을 추출
@@ -91,11 +143,15 @@ def extract_psychological_elements(analysis_text):
     
     return elements
 
-def search_rag_documents(query_elements):
+def search_rag_candidates(query_elements, k=10, use_reranker=True) -> List[Dict[str, Any]]:
     """
-    OpenSearch를 사용하여 관련 RAG 문서 검색
+    OpenSearch 하이브리드 검색 (Reranker 순서의 후보 목록, 실패 시 빈 목록)
     """
-    if not opensearch_client or not query_elements:
+    if not query_elements:
+        return []
+    
+    opensearch_client = get_opensearch_client()
+    if not opensearch_client:
         return []
     
     try:
@@ -103,28 +159,179 @@ def search_rag_documents(query_elements):
         combined_query = ' '.join(query_elements)
         
         # 하이브리드 검색 수행
-        search_results = opensearch_client.hybrid_search(
+        return opensearch_client.hybrid_search(
             index_name=RAG_INDEX_NAME,
             query_text=combined_query,
-            k=10,
-            use_reranker=True
+            k=k,
+            use_reranker=use_reranker
         )
-        
-        # Reranker 기준 1번째 결과 반환
-        if search_results:
-            top_result = search_results[0]
-            return {
-                'text': top_result['text'],
-                'metadata': top_result.get('metadata', {}),
-                'document': top_result.get('document', ''),
-                'element': top_result.get('element', ''),
-                'score': top_result.get('rerank_score', top_result.get('score', 0))
-            }  
     except Exception as e:
         print(f"RAG 검색 실패: {e}")
     
+    return []
+
+def _to_rag_result(search_result):
+    return {
+        'text': search_result['text'],
+        'metadata': search_result.get('metadata', {}),
+        'document': search_result.get('document', ''),
+        'element': search_result.get('element', ''),
+        'score': search_result.get('rerank_score', search_result.get('score', 0))
+    }
+
+def search_rag_documents(query_elements):
+    """
+    OpenSearch를 사용하여 관련 RAG 문서 검색
+    """
+    search_results = search_rag_candidates(query_elements)
+    
+    # Reranker 기준 1번째 결과 반환
+    if search_results:
+        return _to_rag_result(search_results[0])
+    
     return None
 
+# YOLO 라벨 → RAG 문서의 요소명 (영문 라벨만 변환, 한글 라벨은 그대로 사용)
+LABEL_QUERY_TERMS = {
+    "house": "집", "roof": "지붕", "wall": "벽", "door": "문", "window": "창문", "chimney": "굴뚝",
+    "smoke": "연기", "fence": "울타리", "path": "길", "pond": "연못", "mountain": "산",
+    "tree": "나무", "trunk": "기둥", "branch": "가지", "crown": "수관", "leaf": "나뭇잎", "root": "뿌리",
+    "fruit": "열매", "flower": "꽃", "grass": "잔디", "sun": "태양", "cloud": "구름",
+    "person": "사람", "head": "머리", "face": "얼굴", "eye": "눈", "nose": "코", "mouth": "입",
+    "ear": "귀", "hair": "머리카락", "neck": "목", "upper_body": "상체", "arm": "팔", "hand": "손",
+    "leg": "다리", "foot": "발", "button": "단추", "pocket": "주머니", "shoe": "신발",
+}
+# 라벨 기반 검색 결과의 병합 가중치 (그림 내용을 서술한 GPT 요소 기반 검색이 1.0)
+LABEL_RAG_WEIGHT = 0.5
+
+_RAG_EXECUTOR = None
+_RAG_EXECUTOR_LOCK = threading.Lock()
+
+def build_label_query(label_counts: Dict[str, int]) -> List[str]:
+    """탐지 라벨(집/나무/사람과 구성 요소)로 RAG 검색어 구성 (전체 객체 → 구성 요소 순)"""
+    terms = []
+    for label in sorted(label_counts, key=lambda l: (l.lower() not in ("house", "tree", "person"), l)):
+        term = LABEL_QUERY_TERMS.get(label.lower(), label)
+        if term not in terms:
+            terms.append(term)
+    return terms
+
+def start_label_rag_search(label_counts: Dict[str, int], k=10, use_reranker=True):
+    """탐지 라벨 기반 RAG 검색을 백그라운드에서 시작 (1차 GPT 호출과 동시에 실행)
+    
+    Returns:
+        Future: 후보 목록 (라벨이 없으면 None)
+    """
+    global _RAG_EXECUTOR
+    
+    query_elements = build_label_query(label_counts or {})
+    if not query_elements:
+        return None
+    with _RAG_EXECUTOR_LOCK:
+        if _RAG_EXECUTOR is None:
+            _RAG_EXECUTOR = ThreadPoolExecutor(max_workers=int(os.getenv("RAG_PREFETCH_WORKERS", "4")),
+                                               thread_name_prefix="rag-prefetch")
+    print(f"🔎 탐지 라벨 기반 RAG 검색 시작: {query_elements}")
+    return _RAG_EXECUTOR.submit(search_rag_candidates, query_elements, k, use_reranker)
+
+def merge_rag_results(element_results: List[Dict[str, Any]], label_results: List[Dict[str, Any]]):
+    """요소 기반 / 라벨 기반 검색 결과를 RRF 로 병합하여 최상위 문서 반환 (둘 다 없으면 None)"""
+    if not label_results:
+        return _to_rag_result(element_results[0]) if element_results else None
+    if not element_results:
+        return _to_rag_result(label_results[0])
+    opensearch_client = get_opensearch_client()
+    fused = opensearch_client._reciprocal_rank_fusion([element_results, label_results],
+                                                      weights=[1.0, LABEL_RAG_WEIGHT])
+    return _to_rag_result(fused[0])
+
+# 객체 크롭 분석: 탐지된 세부 요소를 작은 low detail 이미지로 따로 관찰 (전체 이미지 초기 분석과 동시에 실행)
+CROP_IMAGE_DETAIL = "low"
+CROP_MAX_TOKENS = 200
+CROP_PROMPT = '''
+        HTP 심리검사 그림에서 "{term}" 부분만 잘라낸 이미지입니다. 이 부분의 그림 특징을 관찰하여 다음 JSON 형식으로 출력해 주세요.
+        {{"features": ["특징1", "특징2"], "keywords": ["감정 키워드1"]}}
+        특징은 크기, 형태, 선의 굵기, 생략되거나 강조된 부분 위주로 최대 3개까지 짧게 작성해 주세요.
+        '''
+
+def start_crop_analysis(crops, retry_budget=None, reserve_calls=2):
+    """객체 크롭들을 low detail Vision 호출로 동시에 분석 시작 (재시도 없음)
+
+    Args:
+        crops (list): [(탐지 라벨, 크롭 JPEG 바이트)]
+        retry_budget (RetryBudget): 작업 단위 GPT 호출 예산 (크롭 1장당 1회 사용)
+        reserve_calls (int): 초기/최종 분석용으로 남겨 둘 호출 수
+
+    Returns:
+        list: [(라벨, Future, 시작 시각)] (예산이 부족하면 앞쪽 크롭만 시작)
+    """
+    budget = retry_budget or get_default_retry_policy().new_budget()
+    pending = []
+    for label, jpeg_bytes in crops:
+        if budget.remaining <= reserve_calls:
+            print(f"GPT 호출 예산이 부족하여 크롭 {len(crops) - len(pending)}장 분석 생략")
+            break
+        budget.acquire()
+        term = LABEL_QUERY_TERMS.get(label.lower(), label)
+        request = dict(
+            model=GPT_ANALYSIS_MODEL,
+            messages=[
+                {"role": "system", "content": "당신은 HTP(House-Tree-Person) 심리검사 전문 분석가입니다. JSON 형식으로 응답해 주세요."},
+                {"role": "user", "content": [
+                    {"type": "text", "text": CROP_PROMPT.format(term=term)},
+                    {"type": "image_url", "image_url": {
+                        "url": IMAGE_DATA_URL_PREFIX + base64.b64encode(jpeg_bytes).decode("utf-8"),
+                        "detail": CROP_IMAGE_DETAIL
+                    }}
+                ]}
+            ],
+            max_tokens=CROP_MAX_TOKENS,
+            response_format={"type": "json_object"}
+        )
+        pending.append((label, get_openai_gateway().submit_chat_completion(**request), time.time()))
+    if pending:
+        print(f"🔍 객체 크롭 {len(pending)}장 동시 분석 시작: {[label for label, _, _ in pending]}")
+    return pending
+
+def collect_crop_findings(pending, retry_budget=None, timeout=None) -> List[Dict[str, Any]]:
+    """start_crop_analysis() 결과 수집 (실패한 크롭은 제외)
+
+    Returns:
+        list: [{"label", "element", "features", "keywords"}]
+    """
+    findings = []
+    for label, future, started_at in pending:
+        try:
+            response = future.result(timeout=timeout)
+            parsed = json.loads(response.choices[0].message.content)
+            findings.append({
+                "label": label,
+                "element": LABEL_QUERY_TERMS.get(label.lower(), label),
+                "features": [str(f) for f in parsed.get("features", [])][:3],
+                "keywords": [str(k) for k in parsed.get("keywords", [])]
+            })
+            outcome = "success"
+        except Exception as e:
+            print(f"객체 크롭 분석 실패 ({label}): {e}")
+            outcome = "error"
+        if retry_budget is not None:
+            # 크롭은 보조 분석이므로 오류가 심리 분석 단계의 재시도 판단(last_error_retriable)에 영향을 주지 않게 기록
+            retry_budget.record("crop", 1, outcome, time.time() - started_at)
+    return findings
+
+def crop_findings_to_elements(findings: List[Dict[str, Any]], per_object=2) -> List[str]:
+    """크롭 관찰 결과를 RAG 검색 요소로 변환 (예: "창문 작고 닫혀 있음")"""
+    elements = []
+    for finding in findings:
+        for feature in finding["features"][:per_object]:
+            elements.append(f"{finding['element']} {feature}")
+    return elements
+
+# 스트리밍 중 먼저 완성된 키워드/요약으로 다음 단계를 시작할 수 있도록 필드 순서 지정
+STREAM_FIELD_ORDER = """
+            JSON 필드는 "keywords", "summary", "psychological_analysis", "features" 순서로 작성해 주세요.
+            """
+
 PROMPT = '''
         당신은 HTP(House-Tree-Person) 심리검사 분석 전문가입니다. 주어진 그림을 분석하여 다음 JSON 형식으로 출력해 주세요.
         
@@ -151,9 +358,7 @@ PROMPT = '''
         - JSON 형식을 엄격히 준수할 것
         '''
 
-openai.api_key = OPENAI_API_KEY
-
-def optimize_image_for_gpt(image_path: str, max_size: tuple = (1024, 1024), quality: int = 85) -> tuple:
+def optimize_image_for_gpt(image_path: str, max_size: tuple = (1024, 1024), quality: int = 85, image_bytes: bytes = None) -> tuple:
     """
     GPT Vision API 호출을 위해 이미지를 최적화
     
@@ -161,16 +366,17 @@ def optimize_image_for_gpt(image_path: str, max_size: tuple = (1024, 1024), qual
         image_path (str): 원본 이미지 경로
         max_size (tuple): 최대 크기 (width, height)
         quality (int): JPEG 압축 품질 (1-100)
+        image_bytes (bytes): 메모리의 이미지 바이트 (있으면 파일 대신 사용)
         
     Returns:
         tuple: (optimized_base64_string, compression_info)
     """
     try:
         # 원본 파일 크기 확인
-        original_size = os.path.getsize(image_path)
+        original_size = len(image_bytes) if image_bytes is not None else os.path.getsize(image_path)
         
         # 이미지 로드
-        with Image.open(image_path) as img:
+        with Image.open(io.BytesIO(image_bytes) if image_bytes is not None else image_path) as img:
             # EXIF 회전 정보 적용
             img = ImageOps.exif_transpose(img)
             
@@ -208,28 +414,143 @@ def optimize_image_for_gpt(image_path: str, max_size: tuple = (1024, 1024), qual
     except Exception as e:
         print(f"이미지 최적화 실패: {e}")
         # 실패 시 원본 방식 사용
-        with open(image_path, "rb") as img_file:
-            img_bytes = img_file.read()
-            return base64.b64encode(img_bytes).decode("utf-8"), {
-                'original_file_size': len(img_bytes),
-                'compressed_size': len(img_bytes),
-                'compression_ratio': 0,
-                'error': str(e)
-            }
+        if image_bytes is not None:
+            img_bytes = image_bytes
+        else:
+            with open(image_path, "rb") as img_file:
+                img_bytes = img_file.read()
+        return base64.b64encode(img_bytes).decode("utf-8"), {
+            'original_file_size': len(img_bytes),
+            'compressed_size': len(img_bytes),
+            'compression_ratio': 0,
+            'error': str(e)
+        }
+
+@dataclass(frozen=True)
+class ImagePayload:
+    """GPT Vision 요청용으로 1회 인코딩한 이미지 (재시도/초기·최종 분석 호출이 공유)"""
+    data_url: str
+    compression_info: Dict[str, Any]
+    content_hash: str
+    
+    @property
+    def base64_length(self) -> int:
+        return len(self.data_url) - len(IMAGE_DATA_URL_PREFIX)
+
+def build_image_payload(image_bytes: bytes, content_hash: str) -> ImagePayload:
+    """이미지 바이트를 GPT 전송용으로 리사이즈/압축/Base64 인코딩하고 크기를 확인"""
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            img_size = img.size
+    except Exception as e:
+        print(f"⚠️ 이미지 크기 확인 실패, 기본 압축 적용: {e}")
+        img_size = None
+    
+    # 이미 작은 이미지(YOLO 처리된)이면 추가 압축 없이 사용
+    if img_size and img_size[0] <= 320 and img_size[1] <= 320 and len(image_bytes) < 50000:  # 50KB 미만
+        print(f"📸 이미 최적화된 이미지 감지: {img_size}, {len(image_bytes):,} bytes - 추가 압축 생략")
+        img_base64 = base64.b64encode(image_bytes).decode('utf-8')
+        compression_info = {
+            'original_file_size': len(image_bytes),
+            'compressed_size': len(image_bytes),
+            'compression_ratio': 0,
+            'original_dimensions': img_size,
+            'compressed_dimensions': img_size
+        }
+    else:
+        if img_size:
+            print(f"📸 큰 이미지 감지: {img_size}, {len(image_bytes):,} bytes - GPT용 압축 적용")
+        img_base64, compression_info = optimize_image_for_gpt(None, max_size=(1024, 1024), quality=85, image_bytes=image_bytes)
+        # 압축에 실패해 원본이 너무 크면 더 작게 다시 압축
+        if len(img_base64) > MAX_IMAGE_BASE64_LENGTH:
+            img_base64, compression_info = optimize_image_for_gpt(None, max_size=(768, 768), quality=70, image_bytes=image_bytes)
+    
+    if len(img_base64) > MAX_IMAGE_BASE64_LENGTH:
+        raise ValueError(f"GPT 전송 이미지가 너무 큽니다: Base64 {len(img_base64):,}자 (최대 {MAX_IMAGE_BASE64_LENGTH:,}자)")
+    
+    # 압축 결과 로그
+    print(f"이미지 파일 크기: {compression_info['original_file_size']:,} bytes")
+    if 'error' not in compression_info:
+        print(f"처리 후 크기: {compression_info['compressed_size']:,} bytes")
+        print(f"압축률: {compression_info['compression_ratio']}%")
+        print(f"원본 크기: {compression_info['original_dimensions']}")
+        print(f"처리 후 크기: {compression_info['compressed_dimensions']}")
+    print(f"MIME 타입: image/jpeg")
+    print(f"Base64 길이: {len(img_base64)}")
+    
+    compression_info['base64_length'] = len(img_base64)
+    return ImagePayload(data_url=IMAGE_DATA_URL_PREFIX + img_base64, compression_info=compression_info, content_hash=content_hash)
+
+def get_image_payload(image_path=None, image_bytes=None) -> ImagePayload:
+    """GPT 전송용 이미지 반환 (같은 내용의 이미지는 인코딩 결과를 재사용)
+    
+    Args:
+        image_path (str): 이미지 파일 경로 (image_bytes 가 없을 때 1회 읽음)
+        image_bytes (bytes): 메모리의 이미지 바이트
+    """
+    if image_bytes is None:
+        with open(image_path, "rb") as f:
+            image_bytes = f.read()
+    key = content_hash(image_bytes)
+    
+    with _PAYLOAD_CACHE_LOCK:
+        payload = _PAYLOAD_CACHE.get(key)
+        if payload is not None:
+            _PAYLOAD_CACHE.move_to_end(key)
+            _PAYLOAD_STATS["hits"] += 1
+            return payload
+        _PAYLOAD_STATS["misses"] += 1
+    
+    start_time = time.time()
+    payload = build_image_payload(image_bytes, key)
+    with _PAYLOAD_CACHE_LOCK:
+        _PAYLOAD_STATS["encode_sec"] += time.time() - start_time
+        _PAYLOAD_CACHE[key] = payload
+        while len(_PAYLOAD_CACHE) > _PAYLOAD_CACHE_MAX_ENTRIES:
+            _PAYLOAD_CACHE.popitem(last=False)
+    return payload
 
-def analyze_image_with_gpt(image_path, prompt, rag_context=None, max_retries=5):
+def get_image_payload_stats() -> Dict[str, Any]:
+    """GPT 이미지 인코딩 캐시 통계"""
+    with _PAYLOAD_CACHE_LOCK:
+        stats = dict(_PAYLOAD_STATS, entries=len(_PAYLOAD_CACHE), max_entries=_PAYLOAD_CACHE_MAX_ENTRIES)
+    stats["encode_sec"] = round(stats["encode_sec"], 3)
+    return stats
+
+def analyze_image_with_gpt(image_path, prompt, rag_context=None, max_retries=None, image_bytes=None,
+                           retry_budget=None, call_name="gpt", image_payload=None, on_field=None, image_detail=None):
     """
     GPT Vision API를 사용하여 이미지를 분석하는 함수 (거부 방지 로직 포함)
     
+    재시도는 작업 단위 호출 예산(retry_budget) 안에서만 수행하며,
+    거부 응답과 재시도 가능한 오류(429/5xx/타임아웃)만 지수 백오프 후 재시도합니다.
+    
     Args:
         image_path (str): 분석할 이미지 파일 경로
         prompt (str): GPT에게 전달할 프롬프트
         rag_context (dict): RAG 검색 결과 (선택사항)
-        max_retries (int): 최대 재시도 횟수
+        max_retries (int): 최대 시도 횟수 (기본값: 재시도 정책의 call_max_attempts)
+        image_bytes (bytes): 메모리의 이미지 JPEG 바이트 (있으면 파일을 읽지 않음)
+        retry_budget (RetryBudget): 작업 단위 호출 예산 (없으면 기본 정책으로 새로 생성)
+        call_name (str): 시도 기록에 남길 호출 구분
+        image_payload (ImagePayload): 미리 인코딩한 이미지 (없으면 image_path/image_bytes 로 1회 생성)
+        on_field (callable): 지정하면 응답을 스트리밍하며 최상위 JSON 필드가 완성될 때마다 on_field(name, value) 호출
+        image_detail (str): Vision 이미지 detail ("low" 면 크기와 무관하게 고정 토큰, None 이면 API 기본값)
         
     Returns:
         str: GPT 분석 결과 텍스트
+        
+    Raises:
+        RetryBudgetExceeded: 호출 예산이 소진된 경우
     """
+    budget = retry_budget or get_default_retry_policy().new_budget()
+    if max_retries is None:
+        max_retries = budget.policy.call_max_attempts
+    
+    # 이미지는 시도마다 다시 인코딩하지 않음
+    if image_payload is None:
+        image_payload = get_image_payload(image_path, image_bytes)
+    
     # 거부 응답 패턴 정의
     rejection_patterns = [
         "I'm unable to",
@@ -249,6 +570,8 @@ def analyze_image_with_gpt(image_path, prompt, rag_context=None, max_retries=5):
     ]
     
     for attempt in range(max_retries):
+        budget.acquire()
+        attempt_start = time.time()
         try:
             # 재시도 시 프롬프트 강화
             if attempt > 0:
@@ -263,52 +586,13 @@ def analyze_image_with_gpt(image_path, prompt, rag_context=None, max_retries=5):
             else:
                 enhanced_prompt = prompt
 
-            # 🚀 이미지 최적화: 이미 YOLO에서 320x320으로 압축된 이미지인지 확인
-            try:
-                import os
-                from PIL import Image
-                
-                # 파일 크기와 이미지 크기 확인
-                file_size = os.path.getsize(image_path)
-                with Image.open(image_path) as img:
-                    img_size = img.size
-                
-                # 이미 작은 이미지(YOLO 처리된)이면 추가 압축 없이 사용
-                if img_size[0] <= 320 and img_size[1] <= 320 and file_size < 50000:  # 50KB 미만
-                    print(f"📸 이미 최적화된 이미지 감지: {img_size}, {file_size:,} bytes - 추가 압축 생략")
-                    with open(image_path, 'rb') as f:
-                        img_base64 = base64.b64encode(f.read()).decode('utf-8')
-                    compression_info = {
-                        'original_file_size': file_size,
-                        'compressed_size': file_size,
-                        'compression_ratio': 0,
-                        'original_dimensions': img_size,
-                        'compressed_dimensions': img_size
-                    }
-                else:
-                    print(f"📸 큰 이미지 감지: {img_size}, {file_size:,} bytes - GPT용 압축 적용")
-                    img_base64, compression_info = optimize_image_for_gpt(image_path, max_size=(1024, 1024), quality=85)
-                    
-            except Exception as e:
-                print(f"⚠️ 이미지 크기 확인 실패, 기본 압축 적용: {e}")
-                img_base64, compression_info = optimize_image_for_gpt(image_path, max_size=(1024, 1024), quality=85)
-            
-            # 압축 결과 로그
-            print(f"이미지 파일 크기: {compression_info['original_file_size']:,} bytes")
-            if 'error' not in compression_info:
-                print(f"처리 후 크기: {compression_info['compressed_size']:,} bytes")
-                print(f"압축률: {compression_info['compression_ratio']}%")
-                print(f"원본 크기: {compression_info['original_dimensions']}")
-                print(f"처리 후 크기: {compression_info['compressed_dimensions']}")
-            
-            data_url = f"data:image/jpeg;base64,{img_base64}"
-            print(f"MIME 타입: image/jpeg")
-            print(f"Base64 길이: {len(img_base64)}")
-            
             # 메시지 컨텐츠 구성
+            image_url = {"url": image_payload.data_url}
+            if image_detail:
+                image_url["detail"] = image_detail
             content = [
                 {"type": "text", "text": enhanced_prompt},
-                {"type": "image_url", "image_url": {"url": data_url}}
+                {"type": "image_url", "image_url": image_url}
             ]
             
             # RAG 컨텍스트 추가
@@ -316,13 +600,13 @@ def analyze_image_with_gpt(image_path, prompt, rag_context=None, max_retries=5):
                 rag_text = f"\n\n[참고 자료]\n문서: {rag_context['document']} - {rag_context['element']}\n내용: {rag_context['text']}"
                 content.append({"type": "text", "text": rag_text})
 
-            import time
             gpt_start_time = time.time()
             gpt_start_datetime = datetime.now()
             print(f"🤖 [TIMING] GPT API 호출 시작: {gpt_start_datetime.strftime('%H:%M:%S.%f')[:-3]} (시도 {attempt + 1}/{max_retries})")
             
-            response = openai.chat.completions.create(
-                model="gpt-4o",
+            # 프로세스 공유 게이트웨이 (동시 호출 수, RPM/TPM 한도, 연결 재사용)
+            request = dict(
+                model=GPT_ANALYSIS_MODEL,
                 messages=[
                     {"role": "system", "content": "당신은 HTP(House-Tree-Person) 심리검사 전문 분석가입니다. JSON 형식으로 응답해 주세요."},
                     {
@@ -333,6 +617,12 @@ def analyze_image_with_gpt(image_path, prompt, rag_context=None, max_retries=5):
                 max_tokens=2000,
                 response_format={"type": "json_object"}
             )
+            if on_field is not None:
+                # 완성된 필드부터 다음 단계로 전달 (시도마다 새 파서)
+                parser = IncrementalJSONFieldParser(on_field)
+                response = get_openai_gateway().stream_chat_completion(on_delta=parser.feed, **request)
+            else:
+                response = get_openai_gateway().create_chat_completion(**request)
             
             gpt_end_time = time.time()
             gpt_duration = gpt_end_time - gpt_start_time
@@ -350,72 +640,129 @@ def analyze_image_with_gpt(image_path, prompt, rag_context=None, max_retries=5):
                     print(f"거부 응답 패턴 감지: '{pattern}' (시도 {attempt + 1}/{max_retries})")
                     break
             
-            # 거부 응답이 아니거나 마지막 시도라면 결과 반환
-            if not is_rejection or attempt == max_retries - 1:
-                if is_rejection and attempt == max_retries - 1:
+            budget.record(call_name, attempt + 1, "rejected" if is_rejection else "success", time.time() - attempt_start)
+            
+            # 거부 응답이 아니거나 마지막 시도(또는 예산 소진)라면 결과 반환
+            last_attempt = attempt == max_retries - 1 or budget.remaining == 0
+            if not is_rejection or last_attempt:
+                if is_rejection:
                     print(f"경고: 모든 재시도가 실패했습니다. 마지막 응답을 반환합니다.")
                 return result_text
             
-            # 재시도 전 잠시 대기
-            print(f"거부 응답으로 인한 재시도 대기 중... (2초)")
-            time.sleep(2)
+            # 재시도 전 대기 (지수 백오프 + 지터)
+            delay = budget.sleep_backoff(attempt + 1)
+            print(f"거부 응답으로 인한 재시도 대기 완료 ({delay:.2f}초)")
             
         except Exception as e:
             print(f"GPT API 호출 실패 (시도 {attempt + 1}/{max_retries}): {e}")
-            if attempt == max_retries - 1:
+            budget.record(call_name, attempt + 1, "error", time.time() - attempt_start, error=e)
+            if not is_retriable_error(e) or attempt == max_retries - 1 or budget.remaining == 0:
                 raise
-            # 재시도 전 잠시 대기
-            import time
-            time.sleep(2)
+            # 재시도 전 대기 (지수 백오프 + 지터)
+            budget.sleep_backoff(attempt + 1)
     
     return "분석을 완료할 수 없습니다."
 
 
-def analyze_image_gpt(image_base):
-    """GPT와 OpenSearch RAG를 사용하여 이미지 분석을 수행하는 함수
-    
-    Args:
-        image_base (str): 분석할 이미지의 기본 파일명 (예: test4)
-        
-    Returns:
-        dict: 분석 결과를 포함한 딕셔너리
-    """
+def _resolve_analysis_image(image_base, image_bytes=None):
+    """분석할 detection_result 이미지 경로 확인 (API 키/파일이 없으면 None)"""
     if not OPENAI_API_KEY:
         print("OPENAI_API_KEY가 설정되어 있지 않습니다. .env 파일을 확인하세요.")
         return None
 
-    if not os.path.exists(IMAGE_DIR):
-        print(f"폴더를 찾을 수 없습니다: {IMAGE_DIR}")
-        return None
-
     target_filename = f"detection_result_{image_base}.jpg"
     image_path = os.path.join(IMAGE_DIR, target_filename)
     
-    if not os.path.exists(image_path):
-        print(f"{IMAGE_DIR} 폴더에 {target_filename} 파일이 없습니다.")
-        return None
+    if image_bytes is None:
+        if not os.path.exists(IMAGE_DIR):
+            print(f"폴더를 찾을 수 없습니다: {IMAGE_DIR}")
+            return None
+        
+        if not os.path.exists(image_path):
+            print(f"{IMAGE_DIR} 폴더에 {target_filename} 파일이 없습니다.")
+            return None
 
     print(f"\n===== {target_filename} 심리 분석 결과 =====")
+    return image_path
+
+def _parse_analysis_json(analysis_text, stage_name):
+    """GPT 응답 JSON 파싱 (실패 시 응답 텍스트를 요약으로 둔 기본 구조)"""
+    try:
+        analysis = json.loads(analysis_text)
+        print(f"{stage_name} JSON 파싱 성공")
+        return analysis
+    except json.JSONDecodeError:
+        print(f"{stage_name} JSON 파싱 실패, 텍스트로 처리 시도")
+        # 실패 시 기본 구조 생성
+        return {
+            "features": {"overall": ["분석 실패"]}, 
+            "keywords": [], 
+            "summary": analysis_text
+        }
+
+def _build_analysis_result(final_analysis, rag_result):
+    """파이프라인에 반환할 분석 결과 구성"""
+    result_text = final_analysis.get("summary", "")
+    if not result_text and "psychological_analysis" in final_analysis:
+         # summary가 없으면 해석을 합쳐서 생성
+         analysis = final_analysis["psychological_analysis"]
+         result_text = f"집: {analysis.get('house', '')}\n나무: {analysis.get('tree', '')}\n사람: {analysis.get('person', '')}"
+
+    # 감정 키워드 추출
+    enriched = []
+    if rag_result:
+        enriched.append({
+            'element': rag_result['element'],
+            'condition': rag_result['text'][:100] + '...' if len(rag_result['text']) > 100 else rag_result['text'],
+            'keywords': rag_result['metadata'].get('keywords', [])
+        })
+
+    return {
+        "raw_text": json.dumps(final_analysis, ensure_ascii=False), # 호환성을 위해 JSON 문자열 저장
+        "result_text": result_text,
+        "items": enriched,
+        "rag_context": rag_result,
+        "parsed_result": final_analysis # 파싱된 결과도 저장
+    }
+
+def analyze_image_gpt(image_base, image_bytes=None, retry_budget=None, on_final_field=None, label_rag=None,
+                      rag_k=10, use_reranker=True, image_detail=None, object_crops=None):
+    """GPT와 OpenSearch RAG를 사용하여 이미지 분석을 수행하는 함수
+    
+    Args:
+        image_base (str): 분석할 이미지의 기본 파일명 (예: test4)
+        image_bytes (bytes): 메모리로 전달된 탐지 결과 이미지 (있으면 detection_result 파일 불필요)
+        retry_budget (RetryBudget): 작업 단위 GPT 호출 예산 (초기 분석과 최종 분석이 공유)
+        on_final_field (callable): 지정하면 최종 분석을 스트리밍하며 완성된 최상위 필드를 on_final_field(name, value) 로 전달
+        label_rag (Future): start_label_rag_search() 로 미리 시작한 탐지 라벨 기반 검색 (요소 기반 결과와 병합)
+        rag_k (int): RAG 검색 결과 수
+        use_reranker (bool): RAG 검색에 Reranker 사용 여부
+        image_detail (str): Vision 이미지 detail ("low" 면 저해상도 고정 토큰, None 이면 API 기본값)
+        object_crops (list): [(탐지 라벨, 크롭 JPEG)] 지정하면 초기 분석과 동시에 low detail 로 분석하여 검색 요소에 추가
+        
+    Returns:
+        dict: 분석 결과를 포함한 딕셔너리
+    """
+    image_path = _resolve_analysis_image(image_base, image_bytes)
+    if image_path is None:
+        return None
     
-    import time
     analysis_start_time = time.time()
     
     try:
+        # 이미지는 1회만 인코딩하여 초기/최종 분석의 모든 시도에서 공유
+        image_payload = get_image_payload(image_path, image_bytes)
+        
+        # 객체 크롭 분석은 초기 분석과 동시에 실행 (검색 요소 수집 전에만 결과 필요)
+        pending_crops = start_crop_analysis(object_crops, retry_budget) if object_crops else []
+        
         # 1차 GPT 해석 (초기 분석 - JSON)
         print("1단계: 초기 심리 분석 수행 중...")
-        initial_analysis_text = analyze_image_with_gpt(image_path, PROMPT)
+        initial_analysis_text = analyze_image_with_gpt(image_path, PROMPT, retry_budget=retry_budget,
+                                                       call_name="initial", image_payload=image_payload,
+                                                       image_detail=image_detail)
         
-        try:
-            initial_analysis = json.loads(initial_analysis_text)
-            print("초기 분석 JSON 파싱 성공")
-        except json.JSONDecodeError:
-            print("초기 분석 JSON 파싱 실패, 텍스트로 처리 시도")
-            # 실패 시 기본 구조 생성
-            initial_analysis = {
-                "features": {"overall": ["분석 실패"]}, 
-                "keywords": [], 
-                "summary": initial_analysis_text
-            }
+        initial_analysis = _parse_analysis_json(initial_analysis_text, "초기 분석")
 
         # 심리 분석 요소 추출 (JSON에서 키워드 및 특징 추출)
         print("\n2단계: 심리 분석 요소 추출 중...")
@@ -429,9 +776,25 @@ def analyze_image_gpt(image_base):
                 
         print(f"추출된 요소들 (상위 10개): {psychological_elements[:10]}")
         
+        # 상위 5개 요소 + 객체 크롭에서 관찰한 세부 요소
+        query_elements = psychological_elements[:5]
+        crop_findings = collect_crop_findings(pending_crops, retry_budget)
+        if crop_findings:
+            crop_elements = crop_findings_to_elements(crop_findings)
+            print(f"객체 크롭 관찰 요소 ({len(crop_findings)}개 객체): {crop_elements}")
+            query_elements = query_elements + crop_elements
+        
         # OpenSearch RAG 검색
         print("\n3단계: RAG 시스템을 통한 관련 자료 검색 중...")
-        rag_result = search_rag_documents(psychological_elements[:5]) # 상위 5개만 사용
+        element_results = search_rag_candidates(query_elements, rag_k, use_reranker)
+        label_results = []
+        if label_rag is not None:
+            try:
+                # 1차 GPT 호출 동안 실행된 탐지 라벨 기반 검색 결과
+                label_results = label_rag.result() or []
+            except Exception as e:
+                print(f"탐지 라벨 기반 RAG 검색 실패: {e}")
+        rag_result = merge_rag_results(element_results, label_results)
         
         final_analysis = initial_analysis
         
@@ -451,37 +814,30 @@ def analyze_image_gpt(image_base):
             위 분석 결과와 참고 자료를 바탕으로, 더욱 정확하고 전문적인 최종 심리 분석을 JSON 형식으로 다시 작성해 주세요.
             초기 분석의 구조를 유지하되, 내용을 보강해 주세요.
             """
+            if crop_findings:
+                final_prompt += f"""
+            부분별 관찰 (세부 요소를 확대하여 관찰한 결과):
+            {json.dumps([{"element": f["element"], "features": f["features"]} for f in crop_findings], ensure_ascii=False)}
+            """
+            if on_final_field is not None:
+                final_prompt += STREAM_FIELD_ORDER
             
-            final_analysis_text = analyze_image_with_gpt(image_path, final_prompt)
             try:
+                final_analysis_text = analyze_image_with_gpt(image_path, final_prompt, retry_budget=retry_budget,
+                                                             call_name="final", image_payload=image_payload,
+                                                             on_field=on_final_field, image_detail=image_detail)
                 final_analysis = json.loads(final_analysis_text)
                 print("최종 분석 JSON 파싱 성공")
             except json.JSONDecodeError:
                 print("최종 분석 JSON 파싱 실패, 초기 분석 결과 사용")
+            except RetryBudgetExceeded as e:
+                # 초기 분석은 이미 있으므로 보강 없이 진행
+                print(f"최종 분석 생략 ({e}), 초기 분석 결과 사용")
 
         # 결과 구성
-        result_text = final_analysis.get("summary", "")
-        if not result_text and "psychological_analysis" in final_analysis:
-             # summary가 없으면 해석을 합쳐서 생성
-             analysis = final_analysis["psychological_analysis"]
-             result_text = f"집: {analysis.get('house', '')}\n나무: {analysis.get('tree', '')}\n사람: {analysis.get('person', '')}"
-
-        # 감정 키워드 추출
-        enriched = []
-        if rag_result:
-            enriched.append({
-                'element': rag_result['element'],
-                'condition': rag_result['text'][:100] + '...' if len(rag_result['text']) > 100 else rag_result['text'],
-                'keywords': rag_result['metadata'].get('keywords', [])
-            })
-
-        result = {
-            "raw_text": json.dumps(final_analysis, ensure_ascii=False), # 호환성을 위해 JSON 문자열 저장
-            "result_text": result_text,
-            "items": enriched,
-            "rag_context": rag_result,
-            "parsed_result": final_analysis # 파싱된 결과도 저장
-        }
+        result = _build_analysis_result(final_analysis, rag_result)
+        if crop_findings:
+            result["object_findings"] = crop_findings
         
         analysis_end_time = time.time()
         print(f"✅ [TIMING] 심리 분석 전체 완료: {analysis_end_time - analysis_start_time:.2f}초")
@@ -494,6 +850,73 @@ def analyze_image_gpt(image_base):
         traceback.print_exc()
         return None
 
+def analyze_image_gpt_single_call(image_base, image_bytes=None, retry_budget=None, on_final_field=None,
+                                  label_rag=None, label_counts=None, rag_k=10, use_reranker=True, image_detail=None):
+    """GPT 호출 1회로 분석하는 저지연 모드
+    
+    초기 분석 → 요소 기반 검색 → 최종 분석 대신, 탐지 라벨로 미리 찾은 해석 자료를
+    첫 호출에 함께 넣어 Vision 호출 1회로 결과를 만듭니다. 반환 형식은 analyze_image_gpt 와 같습니다.
+    
+    Args:
+        image_base (str): 분석할 이미지의 기본 파일명 (예: test4)
+        image_bytes (bytes): 메모리로 전달된 탐지 결과 이미지 (있으면 detection_result 파일 불필요)
+        retry_budget (RetryBudget): 작업 단위 GPT 호출 예산
+        on_final_field (callable): 지정하면 응답을 스트리밍하며 완성된 최상위 필드를 on_final_field(name, value) 로 전달
+        label_rag (Future): start_label_rag_search() 로 미리 시작한 검색 (없으면 label_counts 로 바로 검색)
+        label_counts (dict): 1단계 탐지 라벨별 개수
+        rag_k (int): RAG 검색 결과 수
+        use_reranker (bool): RAG 검색에 Reranker 사용 여부
+        image_detail (str): Vision 이미지 detail ("low" 면 저해상도 고정 토큰, None 이면 API 기본값)
+        
+    Returns:
+        dict: 분석 결과를 포함한 딕셔너리
+    """
+    image_path = _resolve_analysis_image(image_base, image_bytes)
+    if image_path is None:
+        return None
+    
+    analysis_start_time = time.time()
+    
+    try:
+        image_payload = get_image_payload(image_path, image_bytes)
+        
+        # 해석 자료 검색 (1단계 직후 시작한 검색이 있으면 그 결과 사용)
+        print("1단계: 탐지 라벨 기반 해석 자료 검색 중...")
+        label_results = []
+        try:
+            if label_rag is not None:
+                label_results = label_rag.result() or []
+            elif label_counts:
+                label_results = search_rag_candidates(build_label_query(label_counts), rag_k, use_reranker)
+        except Exception as e:
+            print(f"탐지 라벨 기반 RAG 검색 실패: {e}")
+        rag_result = merge_rag_results([], label_results)
+        
+        prompt = PROMPT
+        if rag_result:
+            print(f"검색된 관련 자료: {rag_result['document']} - {rag_result['element']}")
+            prompt += """
+            함께 제공되는 [참고 자료]의 해석 기준이 그림에 해당하면 분석에 반영해 주세요.
+            """
+        if on_final_field is not None:
+            prompt += STREAM_FIELD_ORDER
+        
+        # 참고 자료를 포함한 단일 분석
+        print("\n2단계: 참고 자료를 포함한 심리 분석 수행 중 (단일 호출)...")
+        analysis_text = analyze_image_with_gpt(image_path, prompt, rag_context=rag_result, retry_budget=retry_budget,
+                                               call_name="single", image_payload=image_payload,
+                                               on_field=on_final_field, image_detail=image_detail)
+        result = _build_analysis_result(_parse_analysis_json(analysis_text, "단일 분석"), rag_result)
+        
+        print(f"✅ [TIMING] 심리 분석 전체 완료 (단일 호출): {time.time() - analysis_start_time:.2f}초")
+        return result
+
+    except Exception as e:
+        print(f"분석 실패 - 상세 오류: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return None
+
 def main():
     """메인 함수 - 커맨드 라인 인자 처리"""
     import argparse
@@ -1,113 +1,575 @@
 import cv2
 import os
-from ultralytics import YOLO
-from pathlib import Path
 import sys
+import time
+import queue
+import threading
+from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Any
+from contextlib import contextmanager
+from concurrent.futures import Future
 
 sys.path.append(os.path.dirname(__file__))
 
+from inference_scheduler import get_inference_scheduler
+
 MODEL_DIR = os.path.dirname(__file__)
+DEFAULT_MODEL_PATH = os.path.join(MODEL_DIR, "best.pt")
 RESULT_DIR = os.path.join(os.path.dirname(__file__), '../detection_results/images')
 
-# 전역 모델 캐시
-_YOLO_MODEL = None
+# 탐지기 백엔드: "pytorch" (best.pt) / "onnx" (ONNX Runtime) / "onnx-int8" (동적 int8 양자화)
+DETECTOR_BACKENDS = ("pytorch", "onnx", "onnx-int8")
+DEFAULT_BACKEND = os.getenv("YOLO_BACKEND", "pytorch")
+
+_EXPORT_LOCK = threading.Lock()
+
+# 그림 전체를 나타내는 라벨 (크롭 분석에서는 세부 요소보다 뒤에 선택)
+WHOLE_OBJECT_LABELS = ("house", "tree", "person", "집", "나무", "사람")
+
+def export_onnx_model(model_path=None, quantize=False):
+    """best.pt 를 ONNX 로 변환하여 가중치 옆에 캐시 (이미 최신 변환본이 있으면 재사용)
+    
+    Args:
+        model_path (str): PyTorch 가중치 경로 (.pt)
+        quantize (bool): int8 동적 양자화 모델도 생성할지 여부
+        
+    Returns:
+        str: ONNX 모델 경로 (quantize=True 이면 int8 모델 경로)
+    """
+    if model_path is None:
+        model_path = DEFAULT_MODEL_PATH
+    
+    weights = Path(model_path)
+    onnx_path = weights.with_suffix(".onnx")
+    int8_path = weights.with_name(f"{weights.stem}.int8.onnx")
+    
+    def is_fresh(path):
+        return path.exists() and path.stat().st_mtime >= weights.stat().st_mtime
+    
+    with _EXPORT_LOCK:
+        if not is_fresh(onnx_path):
+            from ultralytics import YOLO
+            print(f"ONNX 변환 시작: {weights}")
+            # 마이크로 배치를 위해 배치 차원은 동적으로 변환
+            exported = YOLO(str(weights)).export(format="onnx", dynamic=True)
+            if Path(exported) != onnx_path:
+                os.replace(exported, onnx_path)
+            print(f"ONNX 변환 완료: {onnx_path}")
+        
+        if not quantize:
+            return str(onnx_path)
+        
+        if not is_fresh(int8_path):
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            print(f"int8 양자화 시작: {onnx_path}")
+            quantize_dynamic(str(onnx_path), str(int8_path), weight_type=QuantType.QUInt8)
+            print(f"int8 양자화 완료: {int8_path}")
+        return str(int8_path)
+
+def _load_yolo_model(model_path, backend):
+    """YOLO 모델 인스턴스 1개 생성 (캐시 없음, 실패 시 예외)
+    
+    ONNX 백엔드도 ultralytics 가 ONNX Runtime 으로 실행하므로 결과(Results) 구조는 동일합니다.
+    """
+    # ultralytics 는 임포트 비용이 크므로 모델을 실제로 로드할 때 임포트
+    from ultralytics import YOLO
+    if backend == "pytorch":
+        return YOLO(model_path)
+    if backend in ("onnx", "onnx-int8"):
+        onnx_path = export_onnx_model(model_path, quantize=(backend == "onnx-int8"))
+        return YOLO(onnx_path, task="detect")
+    raise ValueError(f"지원하지 않는 탐지기 백엔드: {backend} ({', '.join(DETECTOR_BACKENDS)})")
 
-def get_yolo_model(model_path):
-    global _YOLO_MODEL
-    if _YOLO_MODEL is None:
+class YoloModelPool:
+    """YOLO 모델 인스턴스 풀 (동시 분석이 각자 다른 인스턴스로 추론)
+    
+    ultralytics 모델은 추론 중 predictor 상태를 바꾸므로 여러 스레드가 한 인스턴스를 동시에 호출하면 안 됩니다.
+    checkout() 으로 인스턴스를 빌려 쓰고 반납하며, 인스턴스는 필요할 때 최대 size 개까지 만듭니다.
+    모델 로드는 풀 잠금 밖에서 하므로(슬롯만 예약) 로드 중에도 다른 스레드는 반납된 인스턴스를 사용할 수 있습니다.
+    """
+    
+    def __init__(self, model_path=None, backend=None, size=1):
+        self.model_path = model_path or DEFAULT_MODEL_PATH
+        self.backend = backend or DEFAULT_BACKEND
+        self.size = max(1, size)
+        self._idle = queue.LifoQueue()  # 최근 사용한 인스턴스 우선 (캐시 친화적)
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()  # 모델 생성만 직렬화 (풀 잠금과 중첩하지 않음)
+        self._created = 0
+        self._in_use = 0
+        self._stats = {"checkouts": 0, "waits": 0, "wait_sec": 0.0, "max_in_use": 0, "load_failures": 0}
+    
+    def acquire(self, timeout=None):
+        """인스턴스 1개 대여 (모두 사용 중이면 반납될 때까지 대기)
+        
+        Raises:
+            RuntimeError: 모델 로드 실패
+            TimeoutError: timeout 초 안에 반납된 인스턴스가 없음
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        waited_from = None
+        while True:
+            try:
+                model = self._idle.get_nowait()
+            except queue.Empty:
+                model = None
+                with self._lock:
+                    reserve = self._created < self.size
+                    if reserve:
+                        self._created += 1
+                if reserve:
+                    model = self._load_slot()
+                else:
+                    if waited_from is None:
+                        waited_from = time.monotonic()
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"YOLO 모델 대기 시간 초과 ({timeout}초)")
+                    try:
+                        model = self._idle.get(timeout=remaining)
+                    except queue.Empty:
+                        raise TimeoutError(f"YOLO 모델 대기 시간 초과 ({timeout}초)")
+            if model is None:
+                continue  # 다른 스레드의 로드 실패로 빈 슬롯이 생김 → 다시 예약 시도
+            
+            with self._lock:
+                self._in_use += 1
+                self._stats["checkouts"] += 1
+                self._stats["max_in_use"] = max(self._stats["max_in_use"], self._in_use)
+                if waited_from is not None:
+                    self._stats["waits"] += 1
+                    self._stats["wait_sec"] += time.monotonic() - waited_from
+            return model
+    
+    def _load_slot(self):
+        """예약한 슬롯의 모델 생성 (실패하면 슬롯을 되돌리고 대기 중인 스레드를 깨움)"""
         try:
-            _YOLO_MODEL = YOLO(model_path)
-            print(f"모델 로드 성공: {model_path}")
+            with self._load_lock:
+                model = _load_yolo_model(self.model_path, self.backend)
+            print(f"모델 로드 성공: {self.model_path} ({self.backend}, {self._created}/{self.size})")
+            return model
         except Exception as e:
+            with self._lock:
+                self._created -= 1
+                self._stats["load_failures"] += 1
+            self._idle.put(None)
             print(f"모델 로드 실패: {e}")
-            return None
-    return _YOLO_MODEL
+            raise RuntimeError(f"YOLO 모델 로드 실패: {self.model_path} ({self.backend})") from e
+    
+    def release(self, model):
+        """대여한 인스턴스 반납"""
+        with self._lock:
+            self._in_use -= 1
+        self._idle.put(model)
+    
+    @contextmanager
+    def checkout(self, timeout=None):
+        """with pool.checkout() as model: 형태로 인스턴스 대여/반납"""
+        model = self.acquire(timeout)
+        try:
+            yield model
+        finally:
+            self.release(model)
+    
+    def resize(self, size):
+        """최대 인스턴스 수 증가 (이미 만든 인스턴스는 줄이지 않음)"""
+        with self._lock:
+            self.size = max(self.size, size)
+    
+    def warmup(self):
+        """모든 인스턴스를 미리 만들고 더미 이미지로 추론을 1회씩 실행"""
+        import numpy as np
+        
+        dummy = np.zeros((320, 320, 3), dtype=np.uint8)
+        models = [self.acquire() for _ in range(self.size)]
+        try:
+            for model in models:
+                model(dummy, verbose=False)
+        finally:
+            for model in models:
+                self.release(model)
+    
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats, size=self.size, loaded=self._created, in_use=self._in_use)
+        stats["wait_sec"] = round(stats["wait_sec"], 3)
+        stats["backend"] = self.backend
+        return stats
+
+# 프로세스 전역 모델 풀 ((모델 경로, 백엔드)별 1개)
+DEFAULT_POOL_SIZE = int(os.getenv("YOLO_POOL_SIZE", "2"))
+_MODEL_POOLS = {}
+_MODEL_POOLS_LOCK = threading.Lock()
+
+def get_yolo_model_pool(model_path=None, backend=None, size=None):
+    """공유 YOLO 모델 풀 반환 (모델은 첫 대여 시 로드)
+    
+    Args:
+        model_path (str): YOLO 모델 파일 경로 (.pt) (기본값: best.pt)
+        backend (str): 탐지기 백엔드 (기본값: YOLO_BACKEND 환경변수 또는 pytorch)
+        size (int): 최대 인스턴스 수 (기본값: YOLO_POOL_SIZE 환경변수 또는 2, 기존 풀보다 크면 늘림)
+    """
+    model_path = os.path.abspath(model_path or DEFAULT_MODEL_PATH)
+    backend = backend or DEFAULT_BACKEND
+    with _MODEL_POOLS_LOCK:
+        pool = _MODEL_POOLS.get((model_path, backend))
+        if pool is None:
+            pool = YoloModelPool(model_path, backend, size=size or DEFAULT_POOL_SIZE)
+            _MODEL_POOLS[(model_path, backend)] = pool
+        elif size:
+            pool.resize(size)
+        return pool
+
+def warmup_yolo_model(model_path=None, backend=None):
+    """모델 풀의 인스턴스를 모두 로드하고 더미 이미지로 추론을 1회씩 실행 (첫 요청 지연 제거)"""
+    get_yolo_model_pool(model_path, backend).warmup()
 
-def crop_objects_by_labels(image_path, model_path=None, output_dir="cropped_objects", result_dir="detection_results"):
+def _load_image(image):
+    """경로면 cv2 로 읽고, 배열이면 그대로 반환"""
+    if isinstance(image, (str, Path)):
+        return cv2.imread(str(image))
+    return image
+
+def detect_objects_batch(images, model_path=None, backend=None):
     """
-    YOLO 모델을 사용하여 이미지에서 객체를 감지하고 라벨별로 크롭하여 저장하는 함수
+    여러 이미지를 한 번의 YOLO 순전파로 탐지
     
     Args:
-        image_path (str): 분석할 이미지 파일 경로
+        images (list): 이미지 경로 또는 BGR 이미지 배열 목록
         model_path (str): YOLO 모델 파일 경로 (.pt) (기본값: best.pt)
-        output_dir (str): 크롭된 이미지들을 저장할 디렉토리
-        result_dir (str): 결과 이미지를 저장할 디렉토리
+        backend (str): 탐지기 백엔드 (기본값: YOLO_BACKEND 환경변수 또는 pytorch)
+        
+    Returns:
+        list: 입력 순서대로 ultralytics Results (읽기 실패한 이미지는 None)
     """
-    if model_path is None:
-        model_path = os.path.join(os.path.dirname(__file__), "best.pt")
+    arrays = [_load_image(image) for image in images]
+    valid_indices = [i for i, array in enumerate(arrays) if array is not None]
+    outputs = [None] * len(arrays)
+    if not valid_indices:
+        return outputs
+    
+    # 모델 로드 실패 시 RuntimeError
+    with get_yolo_model_pool(model_path, backend).checkout() as model, get_inference_scheduler().slot("yolo"):
+        results = model([arrays[i] for i in valid_indices], verbose=False)
+    for i, result in zip(valid_indices, results):
+        outputs[i] = result
+    return outputs
+
+# 클래스별 박스 색상 (ultralytics 기본 팔레트, BGR)
+_PALETTE = [
+    "FF3838", "FF9D97", "FF701F", "FFB21D", "CFD231", "48F90A", "92CC17", "3DDB86", "1A9334", "00D4BB",
+    "2C99A8", "00C2FF", "344593", "6473FF", "0018EC", "8438FF", "520085", "CB38FF", "FF95C8", "FF37C7",
+]
+
+def _box_color(class_id):
+    hex_color = _PALETTE[class_id % len(_PALETTE)]
+    r, g, b = (int(hex_color[i:i + 2], 16) for i in (0, 2, 4))
+    return (b, g, r)
 
+@dataclass
+class Detection:
+    """탐지된 객체 1개"""
+    label: str
+    confidence: float
+    xyxy: Tuple[int, int, int, int]
+    class_id: int
+    crop: Any = field(default=None, repr=False)  # 원본 이미지의 크롭 뷰 (with_crops=True 일 때, 복사 없음)
     
-    # YOLO 모델 로드 (캐시 사용)
-    model = get_yolo_model(model_path)
-    if model is None:
-        return
+    def to_dict(self) -> Dict[str, Any]:
+        return {"label": self.label, "confidence": round(self.confidence, 4), "xyxy": list(self.xyxy), "class_id": self.class_id}
+
+@dataclass
+class DetectionResult:
+    """이미지 1장의 탐지 결과
     
-    # 원본 이미지 로드
-    original_image = cv2.imread(image_path)
-    if original_image is None:
-        print(f"이미지 로드 실패: {image_path}")
-        return
+    바운딩 박스가 그려진 이미지는 annotated_jpeg() 를 호출할 때만 그리고 인코딩합니다(1회 캐시).
+    """
+    image: Any = field(repr=False)  # 입력 BGR 이미지 배열
+    detections: List[Detection]
+    names: Dict[int, str] = field(default_factory=dict, repr=False)
+    _annotated: Optional[bytes] = field(default=None, repr=False)
     
-    print(f"이미지 로드 성공: {image_path}")
-    print(f"이미지 크기: {original_image.shape[1]}x{original_image.shape[0]}")
+    @classmethod
+    def from_yolo(cls, result, image, with_crops=False) -> "DetectionResult":
+        """ultralytics Results 에서 구조화된 탐지 결과 생성"""
+        detections = []
+        boxes = result.boxes
+        if boxes is not None:
+            height, width = image.shape[:2]
+            for box in boxes:
+                x1, y1, x2, y2 = map(int, box.xyxy[0])
+                x1, y1, x2, y2 = max(0, x1), max(0, y1), min(width, x2), min(height, y2)
+                class_id = int(box.cls[0])
+                detections.append(Detection(
+                    label=result.names[class_id],
+                    confidence=float(box.conf[0]),
+                    xyxy=(x1, y1, x2, y2),
+                    class_id=class_id,
+                    crop=image[y1:y2, x1:x2] if with_crops else None
+                ))
+        return cls(image=image, detections=detections, names=dict(result.names))
     
-    # YOLO 추론 실행
-    results = model(original_image)
+    @property
+    def label_counts(self) -> Dict[str, int]:
+        counts = {}
+        for detection in self.detections:
+            counts[detection.label] = counts.get(detection.label, 0) + 1
+        return counts
     
-    # 라벨별 카운터 초기화
-    label_counters = {}
+    def crop(self, detection: Detection):
+        """탐지 객체의 크롭 뷰 (복사 없음)"""
+        if detection.crop is not None:
+            return detection.crop
+        x1, y1, x2, y2 = detection.xyxy
+        return self.image[y1:y2, x1:x2]
     
-    print("\n객체 감지 및 크롭 시작...")
+    def select_crops(self, top_n=4, min_side=24) -> List[Detection]:
+        """크롭 분석할 탐지 객체 선택 (세부 요소 우선, 라벨마다 신뢰도가 가장 높은 1개씩)
+        
+        문/창문/뿌리처럼 전체 이미지에서 작게 보이는 요소가 크롭의 이점이 크므로
+        집/나무/사람 전체 박스는 세부 요소를 다 고른 뒤에만 선택합니다.
+        """
+        candidates = [
+            d for d in self.detections
+            if min(d.xyxy[2] - d.xyxy[0], d.xyxy[3] - d.xyxy[1]) >= min_side
+        ]
+        candidates.sort(key=lambda d: (d.label.lower() in WHOLE_OBJECT_LABELS, -d.confidence))
+        selected, seen = [], set()
+        for detection in candidates:
+            if detection.label not in seen:
+                selected.append(detection)
+                seen.add(detection.label)
+        return selected[:top_n]
+    
+    def crop_jpeg(self, detection: Detection, max_size=256, jpeg_quality=85) -> Optional[bytes]:
+        """탐지 객체 크롭을 긴 변 max_size 이하로 줄인 JPEG 바이트"""
+        crop = self.crop(detection)
+        height, width = crop.shape[:2]
+        if height == 0 or width == 0:
+            return None
+        scale = max_size / max(height, width)
+        if scale < 1:
+            crop = cv2.resize(crop, (max(1, int(width * scale)), max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+        ok, encoded = cv2.imencode('.jpg', crop, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+        return encoded.tobytes() if ok else None
+    
+    @classmethod
+    def from_dict(cls, image, data: Dict[str, Any]) -> "DetectionResult":
+        """to_dict() 로 저장한 탐지 결과 복원"""
+        detections = [
+            Detection(label=d["label"], confidence=d["confidence"], xyxy=tuple(d["xyxy"]), class_id=d["class_id"])
+            for d in data.get("detections", [])
+        ]
+        return cls(image=image, detections=detections)
     
-    for r in results:
-        boxes = r.boxes
-        if boxes is None or len(boxes) == 0:
-            print("감지된 객체가 없습니다.")
-            return
+    def render(self):
+        """바운딩 박스와 라벨이 그려진 이미지 배열 (ultralytics Results.plot 과 비슷한 스타일)
         
-        print(f"총 {len(boxes)}개의 객체가 감지되었습니다.")
+        ultralytics 없이 cv2 로만 그리므로 모델을 로드하지 않은 프로세스에서도 사용할 수 있습니다.
+        """
+        canvas = self.image.copy()
+        height, width = canvas.shape[:2]
+        line_width = max(round((height + width) / 2 * 0.003), 2)
+        font_scale = line_width / 3
+        font_thickness = max(line_width - 1, 1)
         
-        for i, box in enumerate(boxes):
-            # 바운딩 박스 좌표 추출
-            x1, y1, x2, y2 = map(int, box.xyxy[0])
-            
-            # 클래스 ID와 라벨 추출
-            cls_id = int(box.cls[0])
-            label = model.names[cls_id]
-            
-            # 신뢰도 추출
-            confidence = float(box.conf[0])
-            
-            # 라벨별 카운터 업데이트
-            if label not in label_counters:
-                label_counters[label] = 0
-            label_counters[label] += 1
+        for detection in self.detections:
+            x1, y1, x2, y2 = detection.xyxy
+            color = _box_color(detection.class_id)
+            cv2.rectangle(canvas, (x1, y1), (x2, y2), color, thickness=line_width, lineType=cv2.LINE_AA)
             
-            # 객체 크롭
-            cropped_image = original_image[y1:y2, x1:x2]
-            
-            if cropped_image.size == 0:
-                print(f"객체 {i+1} ({label}): 크롭 실패 - 빈 이미지")
-                continue
-            
-            print(f"객체 {i+1}: {label} (신뢰도: {confidence:.2f})")
-            print(f"크기: {cropped_image.shape[1]}x{cropped_image.shape[0]}")
+            label = f"{detection.label} {detection.confidence:.2f}"
+            (text_w, text_h), _ = cv2.getTextSize(label, 0, font_scale, font_thickness)
+            outside = y1 - text_h - 3 >= 0
+            label_y2 = y1 - text_h - 3 if outside else y1 + text_h + 3
+            cv2.rectangle(canvas, (x1, y1), (x1 + text_w, label_y2), color, -1, cv2.LINE_AA)
+            cv2.putText(canvas, label, (x1, y1 - 2 if outside else y1 + text_h + 2), 0, font_scale,
+                        (255, 255, 255), thickness=font_thickness, lineType=cv2.LINE_AA)
+        return canvas
+    
+    @property
+    def is_rendered(self) -> bool:
+        return self._annotated is not None
+    
+    def annotated_jpeg(self, jpeg_quality=90) -> Optional[bytes]:
+        """바운딩 박스가 그려진 JPEG 바이트 (처음 요청될 때만 그리고 인코딩)"""
+        if self._annotated is None:
+            ok, encoded = cv2.imencode('.jpg', self.render(), [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+            self._annotated = encoded.tobytes() if ok else None
+        return self._annotated
+    
+    def save_annotated(self, path, jpeg_quality=90) -> bool:
+        """바운딩 박스가 그려진 이미지를 파일로 저장"""
+        data = self.annotated_jpeg(jpeg_quality)
+        if data is None:
+            return False
+        Path(path).write_bytes(data)
+        return True
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "image_size": [int(self.image.shape[1]), int(self.image.shape[0])],
+            "label_counts": self.label_counts,
+            "detections": [detection.to_dict() for detection in self.detections]
+        }
+
+def render_saved_detection(detection_json_path, image_path, output_path) -> bool:
+    """저장된 탐지 결과(JSON)와 입력 이미지로 바운딩 박스 이미지를 그려 저장 (모델 불필요)"""
+    import json
     
-    # 결과 요약 출력
-    print(f"\n크롭 결과 요약:")
+    image = cv2.imread(str(image_path))
+    if image is None:
+        return False
+    with open(detection_json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return DetectionResult.from_dict(image, data).save_annotated(output_path)
+
+def detect_objects_in_memory(image, model_path=None, batcher=None, backend=None, with_crops=False):
+    """
+    이미지 배열에서 객체를 감지하여 구조화된 결과로 반환 (파일 입출력, 결과 이미지 인코딩 없음)
+    
+    Args:
+        image (numpy.ndarray): BGR 이미지 배열
+        model_path (str): YOLO 모델 파일 경로 (.pt) (기본값: best.pt)
+        batcher (YoloMicroBatcher): 지정하면 동시 요청과 묶어서 추론
+        backend (str): 탐지기 백엔드 (배처를 쓰지 않을 때)
+        with_crops (bool): 탐지 객체별 크롭 뷰 포함 여부
+        
+    Returns:
+        DetectionResult: 탐지 결과 (모델 로드 실패 시 None)
+    """
+    if batcher is not None:
+        result = batcher.detect(image)
+    else:
+        try:
+            result = detect_objects_batch([image], model_path, backend)[0]
+        except RuntimeError as e:
+            print(e)
+            return None
+    
+    if result is None:
+        return None
     
-    if label_counters:
-        for label, count in label_counters.items():
-            print(f"   • {label}: {count}개")
+    detection = DetectionResult.from_yolo(result, image, with_crops=with_crops)
+    if detection.detections:
+        print(f"총 {len(detection.detections)}개의 객체가 감지되었습니다: " + ", ".join(f"{label} {count}개" for label, count in detection.label_counts.items()))
     else:
-        print("   • 크롭된 객체가 없습니다.")
+        print("감지된 객체가 없습니다.")
+    return detection
+
+class YoloMicroBatcher:
+    """동시 요청을 짧은 시간(max_wait_ms) 동안 모아 한 번의 배치 추론으로 처리
+    
+    전용 스레드 하나만 모델을 호출하며, 호출자는 결과가 나올 때까지 대기합니다.
+    """
     
-    # 결과 이미지 저장 (바운딩 박스가 그려진 이미지)
-    # 입력 이미지 파일명에서 확장자 제거
-    image_base = os.path.splitext(os.path.basename(image_path))[0]
-    result_image_path = os.path.join(RESULT_DIR, f"detection_result_{image_base}.jpg")
-    results[0].save(filename=result_image_path)
-    print(f"🎯 탐지 결과 이미지: {result_image_path}")
+    def __init__(self, model_path=None, max_batch_size=8, max_wait_ms=5.0, backend=None):
+        self.model_path = model_path or DEFAULT_MODEL_PATH
+        self.backend = backend or DEFAULT_BACKEND
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._stats = {"batches": 0, "images": 0, "max_batch": 0, "errors": 0}
+        self._thread = threading.Thread(target=self._run, name="yolo-micro-batcher", daemon=True)
+        self._thread.start()
+    
+    def detect(self, image, timeout=None):
+        """이미지 1장 탐지 (다른 요청과 함께 배치 처리)
+        
+        Returns:
+            ultralytics Results (이미지를 읽을 수 없으면 None)
+        """
+        future = Future()
+        self._queue.put((image, future))
+        return future.result(timeout=timeout)
+    
+    def _collect(self):
+        items = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(items) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return items
+    
+    def _run(self):
+        while True:
+            items = self._collect()
+            try:
+                results = detect_objects_batch([image for image, _ in items], self.model_path, self.backend)
+                for (_, future), result in zip(items, results):
+                    future.set_result(result)
+            except Exception as e:
+                with self._stats_lock:
+                    self._stats["errors"] += 1
+                for _, future in items:
+                    future.set_exception(e)
+            with self._stats_lock:
+                self._stats["batches"] += 1
+                self._stats["images"] += len(items)
+                self._stats["max_batch"] = max(self._stats["max_batch"], len(items))
+    
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["avg_batch"] = round(stats["images"] / stats["batches"], 2) if stats["batches"] else 0.0
+        stats["max_batch_size"] = self.max_batch_size
+        stats["max_wait_ms"] = self.max_wait * 1000.0
+        stats["backend"] = self.backend
+        return stats
+
+# 프로세스 전역 마이크로 배처 (모델 경로별 1개)
+_BATCHERS = {}
+_BATCHERS_LOCK = threading.Lock()
+
+def get_yolo_batcher(model_path=None, max_batch_size=8, max_wait_ms=5.0, backend=None):
+    """공유 YOLO 마이크로 배처 반환 (첫 호출 시 배치 스레드 시작)"""
+    model_path = model_path or DEFAULT_MODEL_PATH
+    backend = backend or DEFAULT_BACKEND
+    with _BATCHERS_LOCK:
+        batcher = _BATCHERS.get((model_path, backend))
+        if batcher is None:
+            batcher = YoloMicroBatcher(model_path, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms, backend=backend)
+            _BATCHERS[(model_path, backend)] = batcher
+        return batcher
+
+def crop_objects_by_labels(image_path, model_path=None, backend=None, save_annotated=True, with_crops=False):
+    """
+    이미지 파일에서 객체를 감지하고, 요청 시 바운딩 박스가 그려진 결과 이미지를 저장하는 함수
+    
+    Args:
+        image_path (str): 분석할 이미지 파일 경로
+        model_path (str): YOLO 모델 파일 경로 (.pt) (기본값: best.pt)
+        backend (str): 탐지기 백엔드 (기본값: YOLO_BACKEND 환경변수 또는 pytorch)
+        save_annotated (bool): 바운딩 박스가 그려진 결과 이미지를 detection_result_*.jpg 로 저장할지 여부
+        with_crops (bool): 탐지 객체별 크롭 뷰 포함 여부
+        
+    Returns:
+        DetectionResult: 탐지 결과 (모델/이미지 로드 실패 시 None)
+    """
+    original_image = cv2.imread(image_path)
+    if original_image is None:
+        print(f"이미지 로드 실패: {image_path}")
+        return None
+    
+    detection = detect_objects_in_memory(original_image, model_path, backend=backend, with_crops=with_crops)
+    if detection is None or not detection.detections:
+        return detection
+    
+    # 결과 이미지 저장 (바운딩 박스가 그려진 이미지, 요청 시에만)
+    if save_annotated:
+        image_base = os.path.splitext(os.path.basename(image_path))[0]
+        result_image_path = os.path.join(RESULT_DIR, f"detection_result_{image_base}.jpg")
+        detection.save_annotated(result_image_path)
+        print(f"🎯 탐지 결과 이미지: {result_image_path}")
+    
+    return detection
 
 def main():
     """메인 함수 - 커맨드 라인 인자 처리"""
@@ -133,20 +595,6 @@ def main():
         help='분석할 이미지 파일 경로'
     )
     
-    parser.add_argument(
-        '--output', 
-        type=str, 
-        default='cropped_objects',
-        help='크롭된 이미지들을 저장할 디렉토리 (기본값: cropped_objects)'
-    )
-    
-    parser.add_argument(
-        '--result',
-        type=str,
-        default='detection_results',
-        help='탐지 결과 이미지를 저장할 디렉토리 (기본값: detection_results)'
-    )
-    
     args = parser.parse_args()
     
     # 모델 파일 경로 설정 (best.pt 지정)
@@ -165,7 +613,7 @@ def main():
     print("=" * 50)
     
     # 크롭 실행 (항상 best.pt 모델 사용)
-    crop_objects_by_labels(args.image, model_path, args.output, args.result)
+    crop_objects_by_labels(args.image, model_path)
     
     print("=" * 50)
     print("작업이 완료되었습니다.")
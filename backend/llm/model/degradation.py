@@ -0,0 +1,141 @@
+"""
+부하에 따른 분석 품질 단계 조정
+
+분석 대기열이 길어져도 모든 작업이 가장 비싼 경로(리랭커 + k*3 후보 검색, GPT 2회, high detail 이미지)를
+사용하면 꼬리 지연시간이 끝없이 늘어납니다. 부하 신호(진행 중인 분석 수 + 대기열 길이)에 따라
+품질 단계를 한 단계씩 낮추고, 부하가 충분히 줄어들면 일정 시간 뒤 한 단계씩 되돌립니다.
+
+- full: 설정 그대로 (리랭커, k=10, 설정된 분석 모드)
+- no_rerank: 리랭커 생략
+- reduced: 리랭커 생략, k=5, GPT 호출 1회
+- minimal: 리랭커 생략, k=3, GPT 호출 1회, low detail 이미지 (이미지 토큰 고정 85)
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Any, Optional, Sequence
+
+
+@dataclass(frozen=True)
+class QualityTier:
+    """분석 품질 단계"""
+    name: str
+    use_reranker: bool = True
+    rag_k: int = 10
+    analysis_mode: Optional[str] = None  # None 이면 파이프라인 설정 사용
+    image_detail: Optional[str] = None  # Vision 이미지 detail (None 이면 API 기본값)
+
+
+QUALITY_TIERS = (
+    QualityTier("full"),
+    QualityTier("no_rerank", use_reranker=False),
+    QualityTier("reduced", use_reranker=False, rag_k=5, analysis_mode="single_call"),
+    QualityTier("minimal", use_reranker=False, rag_k=3, analysis_mode="single_call", image_detail="low"),
+)
+
+
+class DegradationController:
+    """부하 신호로 품질 단계를 고르는 컨트롤러 (프로세스 내 분석이 공유)
+
+    thresholds[i] 는 i+1 번째 단계로 내려가는 부하 기준입니다.
+    부하가 기준 이상이면 즉시 내려가고, 현재 단계 기준 * recover_ratio 미만으로
+    cooldown_sec 동안 유지되면 한 단계씩 올라갑니다.
+    """
+
+    def __init__(self, thresholds: Sequence[int] = (4, 8, 16), recover_ratio: float = 0.5,
+                 cooldown_sec: float = 30.0, probe_interval_sec: float = 5.0,
+                 load_probe: Optional[Callable[[], int]] = None, enabled: bool = True):
+        if len(thresholds) != len(QUALITY_TIERS) - 1:
+            raise ValueError(f"단계 기준은 {len(QUALITY_TIERS) - 1}개여야 합니다: {thresholds}")
+        self.thresholds = tuple(thresholds)
+        self.recover_ratio = recover_ratio
+        self.cooldown_sec = cooldown_sec
+        self.probe_interval_sec = probe_interval_sec
+        self.load_probe = load_probe
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._level = 0
+        self._changed_at = time.monotonic()
+        self._calm_since: Optional[float] = None
+        self._probe_value = 0
+        self._probe_at = 0.0
+        self._stats = {"switches": 0, "probe_errors": 0, "assigned": {tier.name: 0 for tier in QUALITY_TIERS}}
+
+    def set_load_probe(self, load_probe: Optional[Callable[[], int]]) -> None:
+        """외부 대기열 길이 조회 함수 지정 (예: analysis_jobs 의 queued 수)"""
+        with self._lock:
+            self.load_probe = load_probe
+            self._probe_at = 0.0
+
+    def _external_load(self, now: float) -> int:
+        if self.load_probe is None:
+            return 0
+        if now - self._probe_at >= self.probe_interval_sec:
+            self._probe_at = now
+            try:
+                self._probe_value = int(self.load_probe())
+            except Exception as e:
+                self._stats["probe_errors"] += 1
+                print(f"⚠️ 부하 조회 실패, 진행 중인 분석 수만 사용: {e}")
+                self._probe_value = 0
+        return self._probe_value
+
+    def _update_level(self, load: int, now: float) -> None:
+        target = sum(1 for threshold in self.thresholds if load >= threshold)
+        if target > self._level:
+            self._level = target
+            self._changed_at = now
+            self._calm_since = None
+            self._stats["switches"] += 1
+            print(f"⚠️ [DEGRADE] 부하 {load} → 품질 단계 {QUALITY_TIERS[self._level].name}")
+            return
+        if self._level == 0:
+            return
+        if load < self.thresholds[self._level - 1] * self.recover_ratio:
+            if self._calm_since is None:
+                self._calm_since = now
+            if now - max(self._calm_since, self._changed_at) >= self.cooldown_sec:
+                self._level -= 1
+                self._changed_at = now
+                self._calm_since = None
+                self._stats["switches"] += 1
+                print(f"✅ [DEGRADE] 부하 {load} → 품질 단계 {QUALITY_TIERS[self._level].name} 복귀")
+        else:
+            self._calm_since = None
+
+    @contextmanager
+    def track(self):
+        """분석 1건을 진행 중으로 집계하고, 이 분석에 적용할 품질 단계를 반환"""
+        now = time.monotonic()
+        with self._lock:
+            self._in_flight += 1
+            if self.enabled:
+                self._update_level(self._in_flight - 1 + self._external_load(now), now)
+            tier = QUALITY_TIERS[self._level if self.enabled else 0]
+            self._stats["assigned"][tier.name] += 1
+        try:
+            yield tier
+        finally:
+            now = time.monotonic()
+            with self._lock:
+                self._in_flight -= 1
+                # 부하가 줄어든 시점부터 복귀 대기 시간을 계산
+                if self.enabled:
+                    self._update_level(self._in_flight + self._external_load(now), now)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "tier": QUALITY_TIERS[self._level].name,
+                "in_flight": self._in_flight,
+                "queued": self._probe_value,
+                "thresholds": list(self.thresholds),
+                "switches": self._stats["switches"],
+                "probe_errors": self._stats["probe_errors"],
+                "assigned": dict(self._stats["assigned"]),
+            }
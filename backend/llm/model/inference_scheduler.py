@@ -0,0 +1,174 @@
+"""
+모델 추론 CPU 자원 스케줄러
+
+YOLO, KURE-v1 임베딩, bge 리랭커, BERT 분류기가 한 프로세스에서 실행되는데
+PyTorch/ONNX Runtime 은 기본적으로 추론 1건마다 모든 코어를 사용하므로, 분석 2건만 동시에 돌아도
+스레드가 코어 수를 크게 넘어(과다 구독) 1건일 때보다 느려집니다.
+
+- 프로세스 전체에서 동시에 실행되는 무거운 추론 수를 max_concurrent 로 제한
+- 추론 1건의 intra-op 스레드 수를 total_threads / max_concurrent 로 맞춤 (동시 실행 시에도 코어 수 이내)
+- 모델별 동시 실행 수 제한 (예: 리랭커는 1건씩)
+- 모델별 대기/실행 시간 통계 제공
+
+PyTorch 의 스레드 수는 프로세스 전역 설정이므로 모델별로 다르게 줄 수 없고,
+대신 모델별 슬롯 수로 같은 모델이 코어를 나눠 쓰는 정도를 조절합니다.
+"""
+
+import os
+import sys
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+# 모델별 기본 동시 실행 수 (여기 없는 모델은 전체 슬롯만 적용)
+DEFAULT_MODEL_LIMITS = {
+    "yolo": 2,
+    "embedding": 1,
+    "reranker": 1,
+    "classifier": 1,
+}
+
+
+class InferenceScheduler:
+    """무거운 추론의 동시 실행 수와 스레드 수를 관리"""
+
+    def __init__(self, total_threads: Optional[int] = None, max_concurrent: int = 2,
+                 model_limits: Optional[Dict[str, int]] = None):
+        self.total_threads = max(1, total_threads or os.cpu_count() or 1)
+        self.max_concurrent = max(1, min(max_concurrent, self.total_threads))
+        self.threads_per_inference = max(1, self.total_threads // self.max_concurrent)
+        self.model_limits = dict(DEFAULT_MODEL_LIMITS if model_limits is None else model_limits)
+
+        self._slots = threading.BoundedSemaphore(self.max_concurrent)
+        self._model_slots = {
+            name: threading.BoundedSemaphore(max(1, limit)) for name, limit in self.model_limits.items()
+        }
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._active = 0
+        self._runtime_applied = False
+
+    def apply_runtime_threads(self) -> Dict[str, Any]:
+        """PyTorch 스레드 수 적용 (프로세스에서 1회)
+
+        inter-op 스레드는 첫 병렬 연산 전에만 바꿀 수 있으므로 실패하면 기존 값을 유지합니다.
+        """
+        with self._stats_lock:
+            if self._runtime_applied:
+                return self.runtime_info()
+            self._runtime_applied = True
+
+        # 나중에 생성되는 OpenMP/MKL 런타임도 같은 값을 쓰도록 환경변수 설정
+        for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+            os.environ[name] = str(self.threads_per_inference)
+
+        try:
+            import torch
+        except ImportError:
+            return self.runtime_info()
+
+        torch.set_num_threads(self.threads_per_inference)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError as e:
+            print(f"inter-op 스레드 수 변경 불가 (이미 병렬 연산 실행됨): {e}")
+        print(f"추론 스레드 설정: 추론당 {self.threads_per_inference}개 x 동시 {self.max_concurrent}건 "
+              f"(전체 {self.total_threads}개)")
+        return self.runtime_info()
+
+    def runtime_info(self) -> Dict[str, Any]:
+        info = {
+            "total_threads": self.total_threads,
+            "max_concurrent": self.max_concurrent,
+            "threads_per_inference": self.threads_per_inference,
+        }
+        torch = sys.modules.get("torch")
+        if torch is not None:
+            info["torch_threads"] = torch.get_num_threads()
+            info["torch_interop_threads"] = torch.get_num_interop_threads()
+        return info
+
+    @contextmanager
+    def slot(self, model: str):
+        """추론 1건 실행 구간 (모델 슬롯 → 전체 슬롯 순서로 획득)
+
+        with get_inference_scheduler().slot("yolo"):
+            results = model(images)
+        """
+        queued_at = time.perf_counter()
+        model_slot = self._model_slots.get(model)
+        if model_slot is not None:
+            model_slot.acquire()
+        try:
+            with self._slots:
+                started_at = time.perf_counter()
+                with self._stats_lock:
+                    self._active += 1
+                try:
+                    yield
+                finally:
+                    finished_at = time.perf_counter()
+                    with self._stats_lock:
+                        self._active -= 1
+                        stats = self._stats.setdefault(model, {"runs": 0, "wait_sec": 0.0, "run_sec": 0.0, "max_wait_sec": 0.0})
+                        wait = started_at - queued_at
+                        stats["runs"] += 1
+                        stats["wait_sec"] += wait
+                        stats["run_sec"] += finished_at - started_at
+                        stats["max_wait_sec"] = max(stats["max_wait_sec"], wait)
+        finally:
+            if model_slot is not None:
+                model_slot.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            models = {}
+            for name, counts in self._stats.items():
+                runs = counts["runs"]
+                models[name] = {
+                    "runs": runs,
+                    "avg_wait_ms": round(counts["wait_sec"] / runs * 1000, 1) if runs else 0.0,
+                    "avg_run_ms": round(counts["run_sec"] / runs * 1000, 1) if runs else 0.0,
+                    "max_wait_ms": round(counts["max_wait_sec"] * 1000, 1),
+                    "limit": self.model_limits.get(name),
+                }
+            active = self._active
+        return dict(self.runtime_info(), active=active, models=models)
+
+
+# 프로세스 전역 스케줄러 (파이프라인 설정으로 1회 구성, 구성 전에는 기본값)
+_SCHEDULER: Optional[InferenceScheduler] = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def configure_inference_scheduler(total_threads: Optional[int] = None, max_concurrent: int = 2,
+                                  model_limits: Optional[Dict[str, int]] = None) -> InferenceScheduler:
+    """공유 스케줄러 구성 (이미 추론이 시작된 뒤에는 기존 스케줄러를 유지)
+
+    Args:
+        total_threads: 추론에 쓸 전체 CPU 스레드 수 (기본값: 코어 수)
+        max_concurrent: 동시에 실행할 무거운 추론 수
+        model_limits: 모델별 동시 실행 수 (기본값: DEFAULT_MODEL_LIMITS)
+    """
+    global _SCHEDULER
+
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None or (not _SCHEDULER._stats and _SCHEDULER._active == 0):
+            _SCHEDULER = InferenceScheduler(total_threads, max_concurrent, model_limits)
+        scheduler = _SCHEDULER
+    scheduler.apply_runtime_threads()
+    return scheduler
+
+
+def get_inference_scheduler() -> InferenceScheduler:
+    """공유 스케줄러 반환 (구성 전이면 환경변수 기본값으로 생성)"""
+    global _SCHEDULER
+
+    if _SCHEDULER is not None:
+        return _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            total_threads = int(os.getenv("INFERENCE_THREADS", "0")) or None
+            _SCHEDULER = InferenceScheduler(total_threads, int(os.getenv("INFERENCE_MAX_CONCURRENT", "2")))
+        return _SCHEDULER
@@ -0,0 +1,368 @@
+"""
+모델 추론 사이드카 (Unix 소켓)
+
+API 워커(uvicorn 프로세스)마다 KURE-v1, bge 리랭커, YOLO, BERT 분류기를 따로 로드하면
+워커당 수 GB 의 메모리를 사용하므로, 모델을 한 번만 로드한 사이드카 프로세스가
+Unix 소켓으로 encode / rerank / detect / classify 요청을 받아 모든 워커에 제공합니다.
+
+- LocalInferenceBackend: 프로세스 내 모델로 추론 (사이드카 서버의 구현이자, 사이드카 없이 쓰는 대체 구현)
+- InferenceSidecarServer: LocalInferenceBackend(또는 같은 메서드를 가진 객체)를 소켓으로 제공
+- InferenceSidecarClient: 워커 쪽 클라이언트 (LocalInferenceBackend 와 같은 메서드)
+
+메시지 형식: [헤더 길이 4바이트][JSON 헤더][페이로드 길이 4바이트][페이로드 바이트]
+이미지와 임베딩 벡터는 JSON 으로 변환하지 않고 페이로드 바이트로 전달합니다.
+
+사이드카 실행: python run_inference_sidecar.py --socket /tmp/htp-inference.sock
+"""
+
+import os
+import json
+import time
+import struct
+import socket
+import threading
+import socketserver
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+_LENGTH = struct.Struct("!I")
+
+
+class SidecarError(RuntimeError):
+    """사이드카 연결 실패 또는 사이드카에서 발생한 추론 오류"""
+
+
+def current_rss_mb() -> float:
+    """현재 프로세스의 RSS (MB)"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            resident_pages = int(f.read().split()[1])
+        return round(resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError, IndexError):
+        import resource
+        # /proc 가 없으면 최대 RSS 로 대신 (Linux: KB, macOS: 바이트)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / 1024 if peak < 1 << 32 else peak / (1024 * 1024), 1)
+
+
+def _recv_exact(sock, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("사이드카 연결이 끊어졌습니다.")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _send_message(sock, header: Dict[str, Any], payload: bytes = b"") -> None:
+    encoded = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    sock.sendall(_LENGTH.pack(len(encoded)) + encoded + _LENGTH.pack(len(payload)) + payload)
+
+
+def _recv_message(sock) -> Tuple[Dict[str, Any], bytes]:
+    header = json.loads(_recv_exact(sock, _LENGTH.unpack(_recv_exact(sock, 4))[0]).decode("utf-8"))
+    payload = _recv_exact(sock, _LENGTH.unpack(_recv_exact(sock, 4))[0])
+    return header, payload
+
+
+def _decode_image(image_bytes: bytes):
+    import cv2
+    image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError("이미지 디코딩 실패")
+    return image
+
+
+class LocalInferenceBackend:
+    """프로세스 내 모델로 추론 (모델은 첫 사용 시 로드)"""
+
+    def __init__(self, model_path: Optional[str] = None, yolo_backend: Optional[str] = None,
+                 yolo_batch_size: int = 1, yolo_batch_wait_ms: float = 5.0):
+        self.model_path = model_path
+        self.yolo_backend = yolo_backend
+        self.yolo_batch_size = yolo_batch_size
+        self.yolo_batch_wait_ms = yolo_batch_wait_ms
+        self._embedding_model = None
+        self._reranker = None
+        self._load_lock = threading.Lock()
+
+    def _get_embedding_model(self):
+        if self._embedding_model is None:
+            with self._load_lock:
+                if self._embedding_model is None:
+                    from sentence_transformers import SentenceTransformer
+                    from opensearch_config import EmbeddingConfig
+                    config = EmbeddingConfig.from_env()
+                    model = SentenceTransformer(config.model_name)
+                    model.max_seq_length = config.max_seq_length
+                    print(f"임베딩 모델 로드 성공: {config.model_name}")
+                    self._embedding_model = model
+        return self._embedding_model
+
+    def _get_reranker(self):
+        if self._reranker is None:
+            with self._load_lock:
+                if self._reranker is None:
+                    from sentence_transformers import CrossEncoder
+                    from opensearch_config import EmbeddingConfig
+                    config = EmbeddingConfig.from_env()
+                    self._reranker = CrossEncoder(config.reranker_model)
+                    print(f"Reranker 모델 로드 성공: {config.reranker_model}")
+        return self._reranker
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """KURE-v1 임베딩 (texts 순서대로 2차원 배열)"""
+        from inference_scheduler import get_inference_scheduler
+        model = self._get_embedding_model()
+        with get_inference_scheduler().slot("embedding"):
+            return np.asarray(model.encode(list(texts)), dtype=np.float32)
+
+    def rerank(self, pairs: List[List[str]]) -> np.ndarray:
+        """[질의, 문서] 쌍의 리랭커 점수"""
+        from inference_scheduler import get_inference_scheduler
+        reranker = self._get_reranker()
+        with get_inference_scheduler().slot("reranker"):
+            return np.asarray(reranker.predict([list(pair) for pair in pairs]), dtype=np.float32)
+
+    def detect(self, image, image_bytes: Optional[bytes] = None):
+        """YOLO 탐지 (DetectionResult, 실패 시 None)
+
+        Args:
+            image: BGR 이미지 배열 (None 이면 image_bytes 를 디코딩)
+            image_bytes: 인코딩된 이미지 (사이드카 전송용, 로컬에서는 사용하지 않음)
+        """
+        from crop_by_labels import detect_objects_in_memory, get_yolo_batcher
+        if image is None:
+            image = _decode_image(image_bytes)
+        batcher = None
+        if self.yolo_batch_size > 1:
+            batcher = get_yolo_batcher(self.model_path, max_batch_size=self.yolo_batch_size,
+                                       max_wait_ms=self.yolo_batch_wait_ms, backend=self.yolo_backend)
+        return detect_objects_in_memory(image, self.model_path, batcher=batcher, backend=self.yolo_backend)
+
+    def classify_text(self, analysis_text: str) -> Dict[str, Any]:
+        """분석 텍스트의 키워드 기반 성격 유형 분류"""
+        from keyword_classifier import run_keyword_prediction_from_data
+        return run_keyword_prediction_from_data(analysis_text, quiet=True)
+
+    def warmup(self) -> Dict[str, Any]:
+        """모든 모델 로드 및 더미 추론 1회"""
+        from crop_by_labels import warmup_yolo_model
+        from keyword_classifier import warmup_keyword_classifier
+
+        steps = [
+            ("yolo", lambda: warmup_yolo_model(self.model_path, self.yolo_backend)),
+            ("embedding", lambda: self.encode(["집 나무 사람"])),
+            ("reranker", lambda: self.rerank([["집", "집의 크기"]])),
+            ("keyword_classifier", warmup_keyword_classifier),
+        ]
+        report = {}
+        for name, step in steps:
+            start_time = time.time()
+            try:
+                step()
+                report[name] = {"success": True}
+            except Exception as e:
+                report[name] = {"success": False, "error": str(e)}
+            report[name]["duration_sec"] = round(time.time() - start_time, 3)
+        return report
+
+    def stats(self) -> Dict[str, Any]:
+        from crop_by_labels import get_yolo_model_pool
+        from inference_scheduler import get_inference_scheduler
+        return {
+            "pid": os.getpid(),
+            "rss_mb": current_rss_mb(),
+            "embedding_loaded": self._embedding_model is not None,
+            "reranker_loaded": self._reranker is not None,
+            "yolo_pool": get_yolo_model_pool(self.model_path, self.yolo_backend).stats(),
+            "inference_scheduler": get_inference_scheduler().stats(),
+        }
+
+
+class _SidecarRequestHandler(socketserver.BaseRequestHandler):
+    """연결 1개의 요청을 순서대로 처리 (연결마다 스레드 1개)"""
+
+    def handle(self):
+        backend = self.server.backend
+        while True:
+            try:
+                header, payload = _recv_message(self.request)
+            except (ConnectionError, OSError, struct.error):
+                return
+            op = header.get("op")
+            try:
+                if op == "encode":
+                    vectors = backend.encode(header["texts"])
+                    _send_message(self.request, {"ok": True, "shape": list(vectors.shape)}, vectors.tobytes())
+                elif op == "rerank":
+                    scores = backend.rerank(header["pairs"])
+                    _send_message(self.request, {"ok": True, "scores": [float(s) for s in scores]})
+                elif op == "detect":
+                    detection = backend.detect(None, payload)
+                    _send_message(self.request, {"ok": True, "detection": detection.to_dict() if detection else None})
+                elif op == "classify_text":
+                    _send_message(self.request, {"ok": True, "result": backend.classify_text(header["text"])})
+                elif op == "warmup":
+                    _send_message(self.request, {"ok": True, "result": backend.warmup()})
+                elif op == "stats":
+                    _send_message(self.request, {"ok": True, "result": backend.stats()})
+                else:
+                    _send_message(self.request, {"ok": False, "error": f"알 수 없는 요청: {op}"})
+            except (ConnectionError, BrokenPipeError):
+                return
+            except Exception as e:
+                try:
+                    _send_message(self.request, {"ok": False, "error": f"{type(e).__name__}: {e}"})
+                except OSError:
+                    return
+
+
+class InferenceSidecarServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix 소켓 추론 서버"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, backend=None):
+        self.socket_path = socket_path
+        self.backend = backend or LocalInferenceBackend()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # 이전 실행에서 남은 소켓 파일
+        super().__init__(socket_path, _SidecarRequestHandler)
+        os.chmod(socket_path, 0o660)
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class InferenceSidecarClient:
+    """사이드카 클라이언트 (스레드마다 연결 1개 유지, 끊어지면 1회 재연결)"""
+
+    def __init__(self, socket_path: str, timeout: float = 60.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError as e:
+            sock.close()
+            raise SidecarError(f"추론 사이드카에 연결할 수 없습니다: {self.socket_path} ({e})") from e
+        self._local.sock = sock
+        return sock
+
+    def _request(self, header: Dict[str, Any], payload: bytes = b"") -> Tuple[Dict[str, Any], bytes]:
+        for attempt in range(2):
+            sock = getattr(self._local, "sock", None) or self._connect()
+            try:
+                _send_message(sock, header, payload)
+                response, response_payload = _recv_message(sock)
+                break
+            except (ConnectionError, OSError) as e:
+                sock.close()
+                self._local.sock = None
+                if attempt:
+                    raise SidecarError(f"추론 사이드카 요청 실패: {e}") from e
+        if not response.get("ok"):
+            raise SidecarError(response.get("error", "추론 사이드카 오류"))
+        return response, response_payload
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        response, payload = self._request({"op": "encode", "texts": list(texts)})
+        return np.frombuffer(payload, dtype=np.float32).reshape(response["shape"])
+
+    def rerank(self, pairs: List[List[str]]) -> np.ndarray:
+        response, _ = self._request({"op": "rerank", "pairs": [list(pair) for pair in pairs]})
+        return np.asarray(response["scores"], dtype=np.float32)
+
+    def detect(self, image, image_bytes: Optional[bytes] = None):
+        """YOLO 탐지 (인코딩된 이미지를 보내고 박스만 받아 DetectionResult 로 복원)"""
+        from crop_by_labels import DetectionResult
+        if image_bytes is None:
+            import cv2
+            ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 95])
+            if not ok:
+                raise ValueError("이미지 인코딩 실패")
+            image_bytes = encoded.tobytes()
+        if image is None:
+            image = _decode_image(image_bytes)
+        response, _ = self._request({"op": "detect"}, image_bytes)
+        if response["detection"] is None:
+            return None
+        return DetectionResult.from_dict(image, response["detection"])
+
+    def classify_text(self, analysis_text: str) -> Dict[str, Any]:
+        response, _ = self._request({"op": "classify_text", "text": analysis_text})
+        return response["result"]
+
+    def warmup(self) -> Dict[str, Any]:
+        response, _ = self._request({"op": "warmup"})
+        failed = [name for name, step in response["result"].items() if not step.get("success")]
+        if failed:
+            raise RuntimeError(f"사이드카 모델 워밍업 실패: {', '.join(failed)}")
+        return response["result"]
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            response, _ = self._request({"op": "stats"})
+            return dict(response["result"], socket=self.socket_path, connected=True)
+        except SidecarError as e:
+            return {"socket": self.socket_path, "connected": False, "error": str(e)}
+
+    def sentence_encoder(self) -> "RemoteSentenceEncoder":
+        return RemoteSentenceEncoder(self)
+
+    def cross_encoder(self) -> "RemoteCrossEncoder":
+        return RemoteCrossEncoder(self)
+
+
+class RemoteSentenceEncoder:
+    """SentenceTransformer.encode 와 같은 형태로 사이드카 임베딩 호출"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def encode(self, sentences, **kwargs) -> np.ndarray:
+        if isinstance(sentences, str):
+            return self.client.encode([sentences])[0]
+        return self.client.encode(sentences)
+
+
+class RemoteCrossEncoder:
+    """CrossEncoder.predict 와 같은 형태로 사이드카 리랭커 호출"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def predict(self, pairs, **kwargs) -> np.ndarray:
+        return self.client.rerank(pairs)
+
+
+# 프로세스 전역 클라이언트 (소켓 경로별 1개)
+_CLIENTS: Dict[str, InferenceSidecarClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+
+def get_sidecar_client(socket_path: Optional[str] = None) -> Optional[InferenceSidecarClient]:
+    """사이드카 클라이언트 반환 (소켓 경로가 없으면 None → 프로세스 내 모델 사용)
+
+    Args:
+        socket_path: 사이드카 소켓 경로 (기본값: INFERENCE_SIDECAR_SOCKET 환경변수)
+    """
+    socket_path = socket_path or os.getenv("INFERENCE_SIDECAR_SOCKET")
+    if not socket_path:
+        return None
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(socket_path)
+        if client is None:
+            client = InferenceSidecarClient(socket_path, timeout=float(os.getenv("INFERENCE_SIDECAR_TIMEOUT", "60")))
+            _CLIENTS[socket_path] = client
+        return client
@@ -1,4 +1,6 @@
 import os
+import time
+import threading
 import torch
 import torch.nn as nn
 import json
@@ -7,34 +9,21 @@ from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 import logging
-from huggingface_hub import login
 from dotenv import load_dotenv
-from transformers import AutoModel, AutoTokenizer, AutoConfig
+
+from inference_scheduler import get_inference_scheduler
 
 # 환경변수 로드
 load_dotenv()
 
 # 허깅페이스 설정 (환경변수에서 읽기)
+# 토큰은 hf_hub_download 에 직접 전달하므로 임포트 시점의 login() 호출은 하지 않음
 HF_TOKEN = os.getenv("HF_TOKEN")
 HF_MODEL_NAME = os.getenv("HF_MODEL_NAME", "Bokji/HTP-personality-classifier")
 
 # 기본 설정
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-# 허깅페이스 로그인 (토큰이 있는 경우에만)
-if HF_TOKEN:
-    try:
-        login(token=HF_TOKEN)
-        print("허깅페이스 로그인 성공")
-    except Exception as e:
-        print(f"허깅페이스 로그인 실패: {e}")
-else:
-    print("HF_TOKEN 환경변수가 설정되지 않았습니다. 로컬 모델을 사용합니다.")
-
-
-
-
-
 
 class KeywordPersonalityClassifier:
     """감정 키워드 기반 성격 유형 분류기"""
@@ -51,6 +40,11 @@ class KeywordPersonalityClassifier:
         }
         self.reverse_label_map = {v: k for k, v in self.label_map.items()}
         
+        # 토크나이저는 첫 예측 시 한 번만 로드하여 재사용
+        self.tokenizer = None
+        self._tokenizer_lock = threading.Lock()
+        self._inference_lock = threading.Lock()
+        
         # 감정 키워드 사전 (HTP 심리분석 기반 확장)
         self.emotion_keywords = {
             "불안": ["불안", "걱정", "초조", "긴장", "불안감", "사회불안", "정서불안", "심리불안"],
@@ -269,6 +263,16 @@ class KeywordPersonalityClassifier:
                 "model_used": "error_fallback"
             }
     
+    def _get_tokenizer(self):
+        """BERT 토크나이저 반환 (최초 1회만 로드)"""
+        if self.tokenizer is None:
+            with self._tokenizer_lock:
+                if self.tokenizer is None:
+                    from transformers import AutoTokenizer
+                    self.tokenizer = AutoTokenizer.from_pretrained('bert-base-uncased')
+                    self.logger.info("BERT 토크나이저 로드 완료")
+        return self.tokenizer
+    
     def _predict_with_bert_model(self, keywords: List[str]) -> Dict[str, any]:
         """BERT 모델을 사용한 예측"""
         try:
@@ -277,20 +281,19 @@ class KeywordPersonalityClassifier:
             
             # BERT 모델인 경우 토크나이저 사용
             try:
-                from transformers import AutoTokenizer
-                tokenizer = AutoTokenizer.from_pretrained('bert-base-uncased')
+                tokenizer = self._get_tokenizer()
                 
-                # 텍스트 토크나이징
-                inputs = tokenizer(
-                    text,
-                    return_tensors="pt",
-                    padding=True,
-                    truncation=True,
-                    max_length=512
-                )
-                
-                # 모델 예측
-                with torch.no_grad():
+                # 모델 예측 (토크나이저/모델을 여러 스레드가 공유하므로 직렬화)
+                with self._inference_lock, get_inference_scheduler().slot("classifier"), torch.no_grad():
+                    # 텍스트 토크나이징
+                    inputs = tokenizer(
+                        text,
+                        return_tensors="pt",
+                        padding=True,
+                        truncation=True,
+                        max_length=512
+                    )
+                    
                     if hasattr(self.model, '__call__'):
                         # 모델이 호출 가능한 경우
                         try:
@@ -356,14 +359,68 @@ class KeywordPersonalityClassifier:
         
         return result
 
+# 프로세스 전역 분류기 레지스트리 (모델/토크나이저를 프로세스당 한 번만 로드)
+_CLASSIFIER_INSTANCE: Optional[KeywordPersonalityClassifier] = None
+_CLASSIFIER_LOCK = threading.Lock()
+_CLASSIFIER_STATS = {
+    "loaded": False,
+    "load_time_sec": None,
+    "loaded_at": None,
+    "load_count": 0,
+    "hits": 0,
+    "load_errors": 0,
+    "last_error": None
+}
+
+def get_keyword_classifier() -> KeywordPersonalityClassifier:
+    """공유 키워드 분류기 반환 (최초 호출 시에만 로드, 스레드 안전)"""
+    global _CLASSIFIER_INSTANCE
+    
+    classifier = _CLASSIFIER_INSTANCE
+    if classifier is None:
+        with _CLASSIFIER_LOCK:
+            if _CLASSIFIER_INSTANCE is None:
+                start_time = time.time()
+                try:
+                    _CLASSIFIER_INSTANCE = KeywordPersonalityClassifier()
+                except Exception as e:
+                    _CLASSIFIER_STATS["load_errors"] += 1
+                    _CLASSIFIER_STATS["last_error"] = str(e)
+                    raise
+                _CLASSIFIER_STATS["loaded"] = True
+                _CLASSIFIER_STATS["load_time_sec"] = round(time.time() - start_time, 3)
+                _CLASSIFIER_STATS["loaded_at"] = datetime.now().isoformat()
+                _CLASSIFIER_STATS["load_count"] += 1
+                return _CLASSIFIER_INSTANCE
+            classifier = _CLASSIFIER_INSTANCE
+    
+    with _CLASSIFIER_LOCK:
+        _CLASSIFIER_STATS["hits"] += 1
+    return classifier
+
+def get_classifier_stats() -> Dict[str, any]:
+    """분류기 레지스트리 상태 (로드 시간, 재사용 횟수 등)"""
+    with _CLASSIFIER_LOCK:
+        stats = dict(_CLASSIFIER_STATS)
+    classifier = _CLASSIFIER_INSTANCE
+    stats["tokenizer_loaded"] = bool(classifier is not None and classifier.tokenizer is not None)
+    return stats
+
+def warmup_keyword_classifier() -> None:
+    """공유 분류기를 로드하고 더미 키워드로 예측을 1회 실행 (첫 요청 지연 제거)"""
+    classifier = get_keyword_classifier()
+    result = classifier.predict_from_keywords(["불안", "애정결핍"])
+    if result.get("error"):
+        raise RuntimeError(result["error"])
+
 def predict_personality_from_keywords(keywords: List[str]) -> Dict[str, any]:
     """감정 키워드 리스트로부터 성격 유형 예측 (단일 함수 인터페이스)"""
-    classifier = KeywordPersonalityClassifier()
+    classifier = get_keyword_classifier()
     return classifier.predict_from_keywords(keywords)
 
 def predict_personality_from_text(text: str) -> Dict[str, any]:
     """텍스트로부터 성격 유형 예측 (단일 함수 인터페이스)"""
-    classifier = KeywordPersonalityClassifier()
+    classifier = get_keyword_classifier()
     return classifier.predict_from_text(text)
 
 def run_keyword_prediction_from_result(image_base: str, quiet: bool = True) -> Dict[str, any]:
@@ -395,14 +452,14 @@ def run_keyword_prediction_from_data(analysis_text: str, quiet: bool = True) ->
         if not raw_text:
             raise ValueError("분석 결과에서 텍스트를 찾을 수 없습니다.")
         
-        # 키워드 분류기 생성
-        classifier = KeywordPersonalityClassifier()
+        # 키워드 분류기 (프로세스 전역 인스턴스 재사용)
+        classifier = get_keyword_classifier()
         
         # 1. 현재 이미지 분석 결과에서 키워드 추출
         current_keywords = classifier._extract_emotion_keywords(raw_text)
         
-        # 2. 이전 단계의 감정 키워드 데이터 로드
-        previous_keywords = _load_previous_stage_keywords()
+        # 2. 이전 단계의 감정 키워드 데이터 로드 (프로세스당 1회 로드 후 캐시)
+        previous_keywords = list(_get_previous_stage_keywords())
         
         # 3. 가중치 적용한 키워드 결합
         # 현재 이미지 키워드: 3배 가중치
@@ -461,6 +518,15 @@ def run_keyword_prediction_from_data(analysis_text: str, quiet: bool = True) ->
             "model_used": "keyword_classifier"
         }
 
+_PREVIOUS_KEYWORDS_CACHE: Optional[Tuple[str, ...]] = None
+
+def _get_previous_stage_keywords() -> Tuple[str, ...]:
+    """이전 단계 키워드 캐시 반환 (전처리 결과 파일은 실행 중 변하지 않음)"""
+    global _PREVIOUS_KEYWORDS_CACHE
+    if _PREVIOUS_KEYWORDS_CACHE is None:
+        _PREVIOUS_KEYWORDS_CACHE = tuple(_load_previous_stage_keywords())
+    return _PREVIOUS_KEYWORDS_CACHE
+
 def _load_previous_stage_keywords() -> List[str]:
     """이전 단계에서 추출된 키워드들을 로드 (감정 키워드만 필터링)"""
     keywords = []
@@ -4,16 +4,27 @@ import json
 import logging
 import traceback
 import shutil
+import copy
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, Tuple, Any
-from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Any, List
+from dataclasses import dataclass, field
 from enum import Enum
 
 # 내부 모듈 임포트
-from crop_by_labels import crop_objects_by_labels
-from analyze_images_with_gpt import analyze_image_gpt
-from keyword_classifier import run_keyword_prediction_from_result
+from crop_by_labels import crop_objects_by_labels, detect_objects_in_memory, get_yolo_batcher, get_yolo_model_pool, warmup_yolo_model, DetectionResult
+from analyze_images_with_gpt import analyze_image_gpt, warmup_embedding_model, warmup_reranker_model, get_image_payload_stats, start_label_rag_search, analyze_image_gpt_single_call
+from keyword_classifier import run_keyword_prediction_from_result, get_classifier_stats, warmup_keyword_classifier
+from status_store import get_status_store
+from stage_cache import get_stage_cache, content_hash, file_content_hash
+from retry_policy import RetryPolicy, get_retry_stats
+from inference_scheduler import configure_inference_scheduler, DEFAULT_MODEL_LIMITS
+from inference_sidecar import get_sidecar_client, current_rss_mb
+from openai_gateway import get_openai_gateway
+from degradation import DegradationController, QualityTier, QUALITY_TIERS
 
 # 경로 설정
 sys.path.append(os.path.dirname(__file__))
@@ -51,11 +62,69 @@ class PipelineConfig:
     
     # 모델 설정  
     yolo_model_path: str = "best.pt"
+    yolo_backend: str = "pytorch"  # "pytorch" / "onnx" / "onnx-int8" (ONNX Runtime, CPU 서버용)
     kobert_model_path: str = "kobert_model"
     
     # API 설정
     openai_api_timeout: int = 120
     max_retries: int = 3
+    
+    # GPT 재시도 정책 (작업당 전체 호출 예산 안에서 지수 백오프 + 지터로 재시도)
+    gpt_call_max_attempts: int = 3
+    gpt_stage_max_attempts: int = 2
+    gpt_job_budget: int = 8
+    gpt_backoff_base: float = 1.0
+    gpt_backoff_max: float = 20.0
+    
+    # 진행 상태 저장소 설정 ("memory" 또는 여러 프로세스가 공유하는 "postgres")
+    status_backend: str = "memory"
+    status_database_url: Optional[str] = None
+    status_ttl_seconds: int = 3600
+    status_max_entries: int = 10000
+    
+    # 단계 결과 캐시 설정 (같은 이미지 재제출 시 YOLO/GPT/분류 결과 재사용)
+    stage_cache_enabled: bool = True
+    stage_cache_ttl_seconds: int = 86400
+    stage_cache_max_entries: int = 1000
+    
+    # 단계 간 이미지를 메모리로 전달 (중간 JPEG 파일 없이 분석 이미지만 마지막에 1회 저장)
+    in_memory_handoff: bool = False
+    
+    # GPT 에 보낼 이미지: "annotated" (바운딩 박스 그린 이미지) / "original" (YOLO 입력 이미지, 그리기 생략)
+    gpt_image_source: str = "annotated"
+    # 분석 완료 시 바운딩 박스 이미지를 바로 그려 저장할지 여부 (False면 결과 조회 시 탐지 결과로 그림)
+    render_analyzed_image: bool = True
+    
+    # YOLO 마이크로 배치 (메모리 전달 모드에서 동시 요청을 모아 한 번에 추론, 1이면 사용 안 함)
+    yolo_batch_size: int = 1
+    yolo_batch_wait_ms: float = 5.0
+    # YOLO 모델 풀 크기 (동시 분석이 각자 다른 인스턴스로 추론, 코어 수 이하 권장)
+    yolo_pool_size: int = 2
+    
+    # 심리 분석 모드: "two_call" (초기 분석 → 요소 기반 검색 → 최종 분석) / "single_call" (라벨 기반 자료를 넣은 Vision 호출 1회, 저지연)
+    analysis_mode: str = "two_call"
+    
+    # 부하에 따른 품질 단계 조정 (진행 중 분석 수 + 대기열 길이가 기준 이상이면 리랭커/검색 수/GPT 호출/이미지 크기 축소)
+    adaptive_degradation: bool = False
+    degradation_thresholds: Tuple[int, int, int] = (4, 8, 16)
+    degradation_cooldown_sec: float = 30.0
+    
+    # 1단계 탐지 라벨로 RAG 검색을 1차 GPT 호출과 동시에 실행 (GPT 요소 기반 결과와 병합)
+    rag_from_detection_labels: bool = False
+    
+    # 최종 GPT 분석 스트리밍 (요약이 완성되는 즉시 성격 분류를 미리 시작, 최종 프롬프트의 필드 순서를 바꾸므로 기본값: 사용 안 함)
+    stream_final_analysis: bool = False
+    
+    # 객체 크롭 분석 (two_call 모드, 사용 시 1단계는 메모리 전달 경로로 실행): 세부 요소 상위 N개 크롭을 low detail 로 동시에 분석하여 검색 요소에 추가 (0 이면 사용 안 함)
+    crop_analysis_top_n: int = 0
+    crop_analysis_max_size: int = 256  # 크롭 이미지의 최대 변 길이 (px)
+    
+    # 모델 추론 CPU 예산 (동시에 실행할 무거운 추론 수, 추론당 스레드 = 전체 스레드 / 동시 실행 수)
+    inference_threads: int = 0  # 0 이면 코어 수
+    inference_max_concurrent: int = 2
+    
+    # 추론 사이드카 Unix 소켓 경로 (지정하면 YOLO/임베딩/리랭커/분류기를 이 프로세스에서 로드하지 않음)
+    inference_sidecar_socket: Optional[str] = None
 
 
 @dataclass
@@ -77,6 +146,12 @@ class PipelineResult:
     confidence_score: Optional[float] = None
     keyword_analysis: Optional[Dict] = None  # 키워드 분석 결과 직접 저장
     analyzed_image_url: Optional[str] = None  # YOLO 탐지 결과 이미지 URL
+    cached_stages: List[str] = field(default_factory=list)  # 캐시에서 가져온 단계
+    detection: Optional[DetectionResult] = field(default=None, repr=False)  # 메모리 전달 모드의 구조화된 탐지 결과
+    input_image_bytes: Optional[bytes] = field(default=None, repr=False)  # 메모리 전달 모드의 입력 JPEG
+    gpt_attempts: Optional[Dict] = None  # GPT 호출 예산 사용량 및 시도별 기록
+    quality_tier: Optional[str] = None  # 부하에 따라 적용된 품질 단계
+    early_classifications: Dict[str, Future] = field(default_factory=dict, repr=False)  # 스트리밍 중 미리 시작한 분류 (분석 텍스트 → Future)
 
     # 오류 정보
     error_message: Optional[str] = None
@@ -84,6 +159,26 @@ class PipelineResult:
     traceback: Optional[str] = None
 
 
+@dataclass
+class HTPSessionResult:
+    """집/나무/사람 그림 묶음(검사 1회) 분석 결과"""
+    status: PipelineStatus
+    session_id: str
+    timestamp: datetime
+    drawings: Dict[str, PipelineResult] = field(default_factory=dict)  # 그림 이름 → 그림별 탐지/심리 분석 결과
+
+    # 그림별 분석 텍스트를 합쳐 1회 분류한 결과
+    personality_type: Optional[str] = None
+    confidence_score: Optional[float] = None
+    keyword_analysis: Optional[Dict] = None
+    merged_text: Optional[str] = None
+    failed_drawings: List[str] = field(default_factory=list)
+    duration_sec: Optional[float] = None
+
+    # 오류 정보
+    error_message: Optional[str] = None
+
+
 class HTPAnalysisPipeline:
     """HTP 심리검사 이미지 분석 파이프라인 클래스"""
     
@@ -96,7 +191,61 @@ class HTPAnalysisPipeline:
         print("HTPAnalysisPipeline 초기화 시작")
         self.config = config or self._create_default_config()
         self.logger = self._setup_logging()
-        self._status_cache = {}  # 상태 캐싱을 위한 딕셔너리
+        self.status_store = get_status_store(
+            backend=self.config.status_backend,
+            database_url=self.config.status_database_url,
+            ttl_seconds=self.config.status_ttl_seconds,
+            max_entries=self.config.status_max_entries
+        )
+        self.retry_policy = RetryPolicy(
+            call_max_attempts=self.config.gpt_call_max_attempts,
+            stage_max_attempts=self.config.gpt_stage_max_attempts,
+            job_budget=self.config.gpt_job_budget,
+            backoff_base=self.config.gpt_backoff_base,
+            backoff_max=self.config.gpt_backoff_max
+        )
+        self.inference_scheduler = configure_inference_scheduler(
+            total_threads=self.config.inference_threads or None,
+            max_concurrent=self.config.inference_max_concurrent,
+            model_limits=dict(DEFAULT_MODEL_LIMITS, yolo=self.config.yolo_pool_size)
+        )
+        self.inference_client = None
+        if self.config.inference_sidecar_socket:
+            self.inference_client = get_sidecar_client(self.config.inference_sidecar_socket)
+        self.yolo_pool = get_yolo_model_pool(
+            str(self.config.model_dir / self.config.yolo_model_path),
+            backend=self.config.yolo_backend,
+            size=self.config.yolo_pool_size
+        )
+        self.yolo_batcher = None
+        if self.config.in_memory_handoff and self.config.yolo_batch_size > 1:
+            self.yolo_batcher = get_yolo_batcher(
+                str(self.config.model_dir / self.config.yolo_model_path),
+                max_batch_size=self.config.yolo_batch_size,
+                max_wait_ms=self.config.yolo_batch_wait_ms,
+                backend=self.config.yolo_backend
+            )
+        self.stage_cache = None
+        if self.config.stage_cache_enabled:
+            self.stage_cache = get_stage_cache(
+                ttl_seconds=self.config.stage_cache_ttl_seconds,
+                max_entries=self.config.stage_cache_max_entries
+            )
+        self._early_executor = None
+        if self.config.stream_final_analysis:
+            self._early_executor = ThreadPoolExecutor(
+                max_workers=self.config.inference_max_concurrent,
+                thread_name_prefix="htp-early-classify"
+            )
+        self.degradation = DegradationController(
+            thresholds=self.config.degradation_thresholds,
+            cooldown_sec=self.config.degradation_cooldown_sec,
+            enabled=self.config.adaptive_degradation
+        )
+        self._stage_timings_lock = threading.Lock()
+        self._stage_timings = {stage: deque(maxlen=50) for stage in ("detection", "analysis", "classification")}
+        self._early_stats_lock = threading.Lock()
+        self._early_stats = {"started": 0, "used": 0, "discarded": 0}
         self._validate_environment()
         print("HTPAnalysisPipeline 초기화 완료")
     
@@ -195,31 +344,57 @@ class HTPAnalysisPipeline:
         
         return True
     
-    def _execute_stage_1(self, image_path: Path, result: PipelineResult) -> bool:
+    def _execute_stage_1(self, image_path: Path, result: PipelineResult, cache_key: Optional[str] = None) -> bool:
         """1단계: YOLO 객체 탐지 및 크롭핑
         
         Args:
             image_path: 입력 이미지 경로
             result: 결과 저장 객체
+            cache_key: 입력 이미지 내용 해시 (None이면 캐시 미사용)
             
         Returns:
             bool: 성공 여부
         """
+        # 사이드카는 인코딩된 이미지를 받아 박스만 돌려주므로 메모리 전달 모드로 처리
+        # 파일 모드의 detection_result 이미지는 GPT 입력과 분석 이미지로만 쓰이므로, 둘 다 필요 없으면
+        # (GPT 에 원본 이미지 전송 + 분석 이미지는 조회 시 그림) 그리기/인코딩 없는 메모리 전달 경로 사용
+        # 크롭 분석은 구조화된 탐지 결과에서 크롭을 만들므로 메모리 전달 경로로 처리
+        if (self.config.in_memory_handoff or self.inference_client is not None
+                or not self._detection_render_consumed() or self.config.crop_analysis_top_n > 0):
+            return self._execute_stage_1_in_memory(image_path, result, cache_key)
+        
         try:
             self.logger.info("[1/3] YOLO 객체 탐지 및 크롭핑 시작...")
             
-            # 객체 탐지 실행
-            detection_result = crop_objects_by_labels(str(image_path))
-            
-            # 결과 이미지 파일 확인
+            # 결과 이미지 파일 경로
             detection_image_path = (
                 self.config.detection_results_dir / "images" / 
                 f"detection_result_{result.image_base}.jpg"
             )
             
+            # 탐지 결과 이미지와 함께 박스/라벨 집계도 캐시하여 적중 시에도 라벨 기반 RAG 검색에 사용
+            cached = self.stage_cache.get("detection", cache_key) if cache_key else None
+            if cached is not None:
+                # 같은 이미지의 탐지 결과 이미지를 재사용
+                detection_image_path.write_bytes(cached["image"])
+                detected_objects = copy.deepcopy(cached["boxes"])
+                result.cached_stages.append("detection")
+                self.logger.info("⚡ 객체 탐지 캐시 적중")
+            else:
+                # 객체 탐지 실행
+                detection_result = crop_objects_by_labels(str(image_path), str(self.config.model_dir / self.config.yolo_model_path),
+                                                          backend=self.config.yolo_backend)
+                detected_objects = detection_result.to_dict() if detection_result is not None else {}
+                if cache_key and detection_image_path.exists():
+                    self.stage_cache.set("detection", cache_key, {
+                        "image": detection_image_path.read_bytes(),
+                        "boxes": detected_objects,
+                    })
+            
             if detection_image_path.exists():
                 result.detection_success = True
                 result.detected_objects = {"detection_image": str(detection_image_path)}
+                result.detected_objects.update(detected_objects)
 
                 # YOLO 탐지 결과 이미지를 result/images/analyzed/ 디렉토리로 복사
                 analyzed_dir = Path("result/images/analyzed")
@@ -246,27 +421,168 @@ class HTPAnalysisPipeline:
             result.error_message = str(e)
             return False
     
-    def _execute_stage_2(self, result: PipelineResult, max_retries: int = 5) -> bool:
-        """2단계: GPT-4 Vision 심리 분석 (재시도 로직 포함)
+    def _execute_stage_1_in_memory(self, image_path: Path, result: PipelineResult, cache_key: Optional[str] = None) -> bool:
+        """1단계 (메모리 전달 모드): 입력을 1회 디코딩하여 탐지하고 구조화된 결과를 다음 단계에 전달
+        
+        detection_result 파일을 쓰지 않으며, 바운딩 박스 이미지는 실제로 필요할 때만 그립니다.
         
         Args:
+            image_path: 입력 이미지 경로
             result: 결과 저장 객체
-            max_retries: 최대 재시도 횟수
+            cache_key: 입력 이미지 내용 해시 (None이면 캐시 미사용)
             
         Returns:
             bool: 성공 여부
         """
-        for attempt in range(max_retries):
-            try:
+        try:
+            self.logger.info("[1/3] YOLO 객체 탐지 시작 (메모리 전달)...")
+            import cv2
+            import numpy as np
+            
+            result.input_image_bytes = image_path.read_bytes()
+            image = cv2.imdecode(np.frombuffer(result.input_image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if image is None:
+                self.logger.error(f"이미지 디코딩 실패: {image_path}")
+                return False
+            
+            cached = self.stage_cache.get("detection_boxes", cache_key) if cache_key else None
+            if cached is not None:
+                detection = DetectionResult.from_dict(image, cached)
+                result.cached_stages.append("detection")
+                self.logger.info("⚡ 객체 탐지 캐시 적중")
+            elif self.inference_client is not None:
+                detection = self.inference_client.detect(image, result.input_image_bytes)
+                if cache_key and detection is not None and detection.detections:
+                    self.stage_cache.set("detection_boxes", cache_key, detection.to_dict())
+            else:
+                model_path = str(self.config.model_dir / self.config.yolo_model_path)
+                detection = detect_objects_in_memory(image, model_path, batcher=self.yolo_batcher,
+                                                     backend=self.config.yolo_backend)
+                if cache_key and detection is not None and detection.detections:
+                    self.stage_cache.set("detection_boxes", cache_key, detection.to_dict())
+            
+            if detection is None or not detection.detections:
+                self.logger.error("객체 탐지 결과가 없습니다.")
+                return False
+            
+            result.detection_success = True
+            result.detection = detection
+            result.detected_objects = detection.to_dict()
+            self.logger.info(f"객체 탐지 완료 (메모리): {detection.label_counts}")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"객체 탐지 단계 오류: {str(e)}")
+            result.error_stage = "detection"
+            result.error_message = str(e)
+            return False
+    
+    def _detection_render_consumed(self) -> bool:
+        """분석 중에 바운딩 박스 이미지가 필요한지 여부 (GPT 입력 또는 완료 시 분석 이미지 저장)"""
+        return self.config.gpt_image_source != "original" or self.config.render_analyzed_image
+    
+    def _gpt_image_bytes(self, result: PipelineResult) -> Optional[bytes]:
+        """메모리 전달 모드에서 GPT 에 보낼 이미지 (파일 모드면 None)"""
+        if result.detection is None:
+            return None
+        if self.config.gpt_image_source == "original":
+            return result.input_image_bytes
+        return result.detection.annotated_jpeg()
+    
+    def _write_analyzed_image(self, result: PipelineResult) -> None:
+        """메모리 전달 모드: 탐지 결과를 result/images/analyzed/ 에 1회 저장
+        
+        탐지 결과(JSON)는 항상 저장하고, 바운딩 박스 이미지는 render_analyzed_image 일 때만 그립니다.
+        그리지 않은 이미지는 결과 조회 시 render_saved_detection() 으로 만듭니다.
+        """
+        if result.detection is None or result.analyzed_image_url:
+            return
+        try:
+            analyzed_dir = Path("result/images/analyzed")
+            analyzed_dir.mkdir(parents=True, exist_ok=True)
+            (analyzed_dir / f"{result.image_base}.json").write_text(
+                json.dumps(result.detection.to_dict(), ensure_ascii=False), encoding="utf-8"
+            )
+            # GPT 용으로 이미 그린 이미지는 인코딩 비용 없이 저장
+            if self.config.render_analyzed_image or result.detection.is_rendered:
+                result.detection.save_annotated(analyzed_dir / f"{result.image_base}.jpg")
+            result.analyzed_image_url = f"result/images/analyzed/{result.image_base}.jpg"
+        except Exception as e:
+            self.logger.warning(f"분석 이미지 저장 실패: {e}")
+    
+    def _execute_stage_2(self, result: PipelineResult, max_retries: Optional[int] = None, cache_key: Optional[str] = None,
+                         tier: QualityTier = QUALITY_TIERS[0], early_classify: bool = True) -> bool:
+        """2단계: GPT-4 Vision 심리 분석 (재시도 정책 적용)
+        
+        단계 반복과 GPT 호출 재시도가 작업당 하나의 호출 예산을 공유하므로
+        한 그림에 대한 GPT 호출 수는 gpt_job_budget 을 넘지 않습니다.
+        
+        Args:
+            result: 결과 저장 객체
+            max_retries: 단계 최대 반복 횟수 (기본값: gpt_stage_max_attempts)
+            cache_key: 입력 이미지 내용 해시 (None이면 캐시 미사용)
+            tier: 부하에 따라 적용할 품질 단계
+            early_classify: 최종 분석 스트리밍 중 성격 분류를 미리 시작할지 여부 (묶음 분석은 합친 텍스트로 분류하므로 False)
+            
+        Returns:
+            bool: 성공 여부
+        """
+        # 모드별 결과가 섞이지 않도록 모드마다 다른 캐시 단계 사용
+        single_call = (tier.analysis_mode or self.config.analysis_mode) == "single_call"
+        object_crops = None if single_call else self._object_crops(result, tier)
+        cache_stage = "analysis_single_call" if single_call else ("analysis_crops" if object_crops else "analysis")
+        cached_analysis = self.stage_cache.get(cache_stage, cache_key) if cache_key else None
+        if cached_analysis is not None:
+            # 검증을 통과한 이전 분석 결과만 캐시되므로 GPT 호출 없이 사용
+            result.analysis_success = True
+            result.psychological_analysis = copy.deepcopy(cached_analysis)
+            result.cached_stages.append("analysis")
+            self.logger.info("⚡ 심리 분석 캐시 적중 (GPT 호출 생략)")
+            return True
+        
+        if max_retries is None:
+            max_retries = self.retry_policy.stage_max_attempts
+        budget = self.retry_policy.new_budget()
+        
+        # 탐지 라벨 기반 RAG 검색은 GPT 호출 전에 시작하여 임계 경로에서 제외
+        # (단일 호출 모드는 이 검색 결과를 참고 자료로 사용)
+        label_rag = None
+        if self.config.rag_from_detection_labels or single_call:
+            label_rag = start_label_rag_search((result.detected_objects or {}).get("label_counts"),
+                                               k=tier.rag_k, use_reranker=tier.use_reranker)
+        
+        try:
+            for attempt in range(max_retries):
+                if budget.remaining == 0:
+                    self.logger.error(f"GPT 호출 예산 소진 ({budget.used}/{self.retry_policy.job_budget}회)")
+                    break
+                
                 if attempt == 0:
                     self.logger.info(f"[{attempt + 1}/{max_retries}] GPT-4 Vision 심리 분석 시작...")
                 else:
-                    self.logger.info(f"[{attempt + 1}/{max_retries}] GPT-4 Vision 심리 분석 재시도... (시도 {attempt + 1}/{max_retries})")
+                    self.logger.info(f"[{attempt + 1}/{max_retries}] GPT-4 Vision 심리 분석 재시도... (남은 호출 예산 {budget.remaining}회)")
                 
-                # GPT 분석 실행 (함수 내부에서 자체 재시도 포함)
-                analysis_result = analyze_image_gpt(result.image_base)
+                try:
+                    # GPT 분석 실행 (호출 재시도는 같은 예산 안에서 수행)
+                    extra = {} if single_call else {"object_crops": object_crops}
+                    analyze = analyze_image_gpt_single_call if single_call else analyze_image_gpt
+                    analysis_result = analyze(
+                        result.image_base,
+                        image_bytes=self._gpt_image_bytes(result),
+                        retry_budget=budget,
+                        on_final_field=self._early_classification_hook(result) if self._early_executor and early_classify else None,
+                        label_rag=label_rag,
+                        rag_k=tier.rag_k,
+                        use_reranker=tier.use_reranker,
+                        image_detail=tier.image_detail,
+                        **extra
+                    )
+                except Exception as e:
+                    self.logger.error(f"심리 분석 단계 오류 (시도 {attempt + 1}/{max_retries}): {str(e)}")
+                    result.error_stage = "analysis"
+                    result.error_message = str(e)
+                    analysis_result = None
                 
-                # 분석 결과 직접 처리 (파일 확인 불필요)
                 if analysis_result:
                     result.analysis_success = True
                     result.psychological_analysis = analysis_result
@@ -274,31 +590,101 @@ class HTPAnalysisPipeline:
                     
                     # GPT 응답 검증
                     if self._validate_gpt_response(analysis_result):
+                        # 낮춘 품질 단계의 결과는 이후 요청이 재사용하지 않도록 캐시하지 않음
+                        if cache_key and tier.name == QUALITY_TIERS[0].name:
+                            self.stage_cache.set(cache_stage, cache_key, copy.deepcopy(analysis_result))
+                        return True
+                    
+                    self.logger.warning(f"GPT 응답이 불완전합니다. (시도 {attempt + 1}/{max_retries})")
+                    if attempt == max_retries - 1 or budget.remaining == 0:
+                        self.logger.error("모든 재시도가 실패했습니다. 기본 처리를 수행합니다.")
+                        # 마지막 시도에서도 실패하면 결과를 그대로 반환 (fallback 처리)
                         return True
-                    else:
-                        self.logger.warning(f"GPT 응답이 불완전합니다. (시도 {attempt + 1}/{max_retries})")
-                        if attempt == max_retries - 1:
-                            self.logger.error("모든 재시도가 실패했습니다. 기본 처리를 수행합니다.")
-                            # 마지막 시도에서도 실패하면 결과를 그대로 반환 (fallback 처리)
-                            return True
-                        continue
                 else:
                     self.logger.error(f"심리 분석 결과를 받지 못했습니다. (시도 {attempt + 1}/{max_retries})")
-                    if attempt == max_retries - 1:
-                        return False
-                    continue
-                    
-            except Exception as e:
-                self.logger.error(f"심리 분석 단계 오류 (시도 {attempt + 1}/{max_retries}): {str(e)}")
-                if attempt == max_retries - 1:
-                    result.error_stage = "analysis"
-                    result.error_message = str(e)
-                    return False
-                # 재시도 전 잠시 대기
-                import time
-                time.sleep(1)
+                    # 인증/요청 오류 등 재시도해도 같은 결과인 오류는 반복하지 않음
+                    if budget.last_error_retriable is False:
+                        self.logger.error("재시도할 수 없는 오류로 심리 분석을 중단합니다.")
+                        break
                 
-        return False
+                if attempt < max_retries - 1:
+                    budget.sleep_backoff(attempt + 1)
+            
+            if result.error_stage is None:
+                result.error_stage = "analysis"
+                result.error_message = "심리 분석 결과를 받지 못했습니다."
+            return False
+        finally:
+            result.gpt_attempts = budget.summary()
+            self.logger.info(f"📊 [RETRY] GPT 호출 {budget.used}/{self.retry_policy.job_budget}회 사용")
+    
+    def _object_crops(self, result: PipelineResult, tier: QualityTier) -> Optional[List[Tuple[str, bytes]]]:
+        """크롭 분석할 세부 요소 크롭 [(라벨, JPEG)] (사용 안 함, 낮춘 품질 단계면 None)"""
+        if self.config.crop_analysis_top_n <= 0 or result.detection is None:
+            return None
+        # 크롭마다 GPT 호출이 늘어나므로 부하로 품질 단계를 낮춘 분석에서는 생략
+        if tier.name != QUALITY_TIERS[0].name:
+            return None
+        crops = []
+        for detection in result.detection.select_crops(self.config.crop_analysis_top_n):
+            jpeg_bytes = result.detection.crop_jpeg(detection, max_size=self.config.crop_analysis_max_size)
+            if jpeg_bytes:
+                crops.append((detection.label, jpeg_bytes))
+        return crops or None
+    
+    def _early_classification_hook(self, result: PipelineResult):
+        """최종 분석 스트리밍 중 summary 가 완성되면 성격 분류를 미리 시작하는 콜백
+        
+        3단계는 최종 분석의 summary 로 분류하므로, 서술 부분이 생성되는 동안 같은 텍스트로 분류를 먼저 실행합니다.
+        콜백은 OpenAI 게이트웨이 이벤트 루프에서 호출되므로 분류는 별도 스레드에 맡깁니다.
+        """
+        def on_field(name: str, value: Any) -> None:
+            if name != "summary" or not isinstance(value, str) or not value:
+                return
+            if value in result.early_classifications:
+                return
+            result.early_classifications[value] = self._early_executor.submit(self._classify_text, value)
+            with self._early_stats_lock:
+                self._early_stats["started"] += 1
+            self.logger.info("⚡ [STREAM] 요약 완성, 서술 생성 중 성격 분류 시작")
+        return on_field
+    
+    def _classify_text(self, analysis_text: str) -> Dict[str, Any]:
+        """분석 텍스트로 성격 유형 예측 (사이드카 또는 프로세스 내 분류기)"""
+        if self.inference_client is not None:
+            return self.inference_client.classify_text(analysis_text)
+        from keyword_classifier import run_keyword_prediction_from_data
+        return run_keyword_prediction_from_data(analysis_text, quiet=False)
+    
+    def _take_early_classification(self, result: PipelineResult, analysis_text: str) -> Optional[Dict[str, Any]]:
+        """스트리밍 중 같은 텍스트로 미리 계산한 분류 결과 반환 (없거나 실패하면 None)"""
+        future = result.early_classifications.pop(analysis_text, None)
+        # 재시도 등으로 최종 텍스트와 달라진 분류는 버림
+        self._discard_early_classifications(result)
+        if future is None:
+            return None
+        try:
+            prediction_result = future.result()
+        except Exception as e:
+            self.logger.warning(f"미리 시작한 성격 분류 실패, 다시 실행: {e}")
+            return None
+        with self._early_stats_lock:
+            self._early_stats["used"] += 1
+        return prediction_result
+    
+    def _discard_early_classifications(self, result: PipelineResult) -> None:
+        """사용하지 않을 미리 시작한 분류 정리 (시작 전인 작업은 취소하여 분류기 슬롯을 차지하지 않게 함)"""
+        if not result.early_classifications:
+            return
+        for future in result.early_classifications.values():
+            future.cancel()
+        with self._early_stats_lock:
+            self._early_stats["discarded"] += len(result.early_classifications)
+        result.early_classifications.clear()
+    
+    def _get_early_stats(self) -> Dict[str, Any]:
+        with self._early_stats_lock:
+            return dict(self._early_stats, enabled=self._early_executor is not None)
     
     def _validate_gpt_response(self, analysis_data: Dict) -> bool:
         """GPT 응답 검증
@@ -344,11 +730,12 @@ class HTPAnalysisPipeline:
         
         return True
     
-    def _execute_stage_3(self, result: PipelineResult) -> bool:
+    def _execute_stage_3(self, result: PipelineResult, use_cache: bool = False) -> bool:
         """3단계: 키워드 기반 성격 유형 분류 (best_keyword_classifier.pth 사용)
         
         Args:
             result: 결과 저장 객체
+            use_cache: 분석 텍스트 해시 기반 캐시 사용 여부
             
         Returns:
             bool: 성공 여부
@@ -371,9 +758,22 @@ class HTPAnalysisPipeline:
                 
                 self.logger.info(f"키워드 분류용 텍스트 길이: {len(analysis_text)}자")
                 
-                # 키워드 기반 성격 유형 예측 실행 (직접 텍스트 사용)
-                from keyword_classifier import run_keyword_prediction_from_data
-                prediction_result = run_keyword_prediction_from_data(analysis_text, quiet=False)
+                # 같은 분석 텍스트의 분류 결과는 캐시에서 재사용
+                text_key = content_hash(analysis_text) if use_cache else None
+                prediction_result = self.stage_cache.get("classification", text_key) if text_key else None
+                if prediction_result is not None:
+                    result.cached_stages.append("classification")
+                    self.logger.info("⚡ 성격 유형 분류 캐시 적중")
+                else:
+                    # 최종 분석 스트리밍 중 같은 텍스트로 미리 시작한 분류가 있으면 사용
+                    prediction_result = self._take_early_classification(result, analysis_text)
+                    if prediction_result is not None:
+                        self.logger.info("⚡ [STREAM] 스트리밍 중 미리 계산한 성격 분류 사용")
+                    else:
+                        # 키워드 기반 성격 유형 예측 실행 (직접 텍스트 사용)
+                        prediction_result = self._classify_text(analysis_text)
+                    if text_key and prediction_result and prediction_result.get('personality_type'):
+                        self.stage_cache.set("classification", text_key, copy.deepcopy(prediction_result))
                 
                 if prediction_result and prediction_result.get('personality_type'):
                     result.classification_success = True
@@ -412,16 +812,147 @@ class HTPAnalysisPipeline:
     
 
     
-    def analyze_image(self, image_input: str, ui_wait: bool = False) -> PipelineResult:
+    def analyze_image(self, image_input: str, ui_wait: bool = False, use_cache: bool = True) -> PipelineResult:
         """이미지 분석 전체 파이프라인 실행
         
         Args:
             image_input: 이미지 파일명 또는 경로
             ui_wait: UI 표시를 위한 인위적인 대기 시간 사용 여부 (API 사용 시 False 권장)
+            use_cache: 단계 결과 캐시 사용 여부 (False면 모든 단계를 다시 실행)
             
         Returns:
             PipelineResult: 분석 결과
         """
+        # 진행 중인 분석으로 집계하고 현재 부하에 맞는 품질 단계 적용
+        with self.degradation.track() as tier:
+            return self._run_analysis(image_input, ui_wait, use_cache, tier)
+    
+    def set_load_probe(self, load_probe) -> None:
+        """품질 단계 조정에 쓸 대기열 길이 조회 함수 지정 (예: analysis_jobs 의 queued 수)"""
+        self.degradation.set_load_probe(load_probe)
+
+    def analyze_session(self, image_inputs: Dict[str, str], session_id: Optional[str] = None,
+                        use_cache: bool = True) -> HTPSessionResult:
+        """집/나무/사람 그림 묶음을 동시에 분석하고 성격 유형은 1회만 분류
+
+        그림마다 탐지 → GPT 분석 → RAG 검색을 별도 스레드에서 동시에 실행하므로 (YOLO 풀, OpenAI 게이트웨이,
+        RAG 클라이언트는 프로세스 내에서 공유) 전체 소요시간은 가장 느린 그림 1장 수준이 됩니다.
+        그림별 분석 텍스트와 감정 키워드를 합친 텍스트로 분류기를 1회 실행합니다.
+
+        Args:
+            image_inputs: 그림 이름 → 이미지 파일명 또는 경로 (예: {"house": "s1_house.jpg", ...})
+            session_id: 결과 식별자 (None이면 이미지 이름을 이어 붙여 생성)
+            use_cache: 단계 결과 캐시 사용 여부
+
+        Returns:
+            HTPSessionResult: 그림별 결과와 통합 분류 결과 (일부 그림이 실패하면 나머지 그림으로 분류)
+        """
+        import time
+        start_time = time.time()
+
+        if not image_inputs:
+            raise ValueError("분석할 그림이 없습니다.")
+        session_id = session_id or "+".join(Path(path).stem or str(path) for path in image_inputs.values())
+        session = HTPSessionResult(status=PipelineStatus.RUNNING, session_id=session_id, timestamp=datetime.now())
+        self.logger.info(f"🚀 [SESSION] 그림 {len(image_inputs)}장 동시 분석 시작: {session_id}")
+
+        # 검사 1회를 진행 중인 분석 1건으로 집계하고 세 그림에 같은 품질 단계 적용
+        with self.degradation.track() as tier:
+            with ThreadPoolExecutor(max_workers=len(image_inputs), thread_name_prefix="htp-session") as executor:
+                futures = {
+                    name: executor.submit(self._run_analysis, path, False, use_cache, tier, classify=False)
+                    for name, path in image_inputs.items()
+                }
+                for name, future in futures.items():
+                    session.drawings[name] = future.result()
+
+        sections = []
+        keywords = []
+        for name, drawing in session.drawings.items():
+            analysis = drawing.psychological_analysis or {}
+            text = analysis.get('result_text') or analysis.get('raw_text', '')
+            if drawing.status != PipelineStatus.SUCCESS or not text:
+                session.failed_drawings.append(name)
+                self.logger.warning(f"⚠️ [SESSION] {name} 그림 분석 실패: {drawing.error_message}")
+                continue
+            sections.append(f"[{name}]\n{text}")
+            for keyword in (analysis.get('parsed_result') or {}).get('keywords') or []:
+                if keyword not in keywords:
+                    keywords.append(keyword)
+
+        if not sections:
+            session.status = PipelineStatus.ERROR
+            session.error_message = "모든 그림의 분석이 실패했습니다."
+            session.duration_sec = round(time.time() - start_time, 3)
+            self.logger.error(f"❌ [SESSION] {session.error_message} ({session_id})")
+            return session
+
+        if keywords:
+            sections.append("주요 감정 키워드\n" + "\n".join(f"- {keyword}" for keyword in keywords))
+        session.merged_text = "\n\n".join(sections)
+
+        # 통합 분류 (같은 텍스트의 분류 결과는 캐시에서 재사용)
+        stage_start = time.time()
+        try:
+            text_key = content_hash(session.merged_text) if use_cache and self.stage_cache is not None else None
+            prediction_result = self.stage_cache.get("classification", text_key) if text_key else None
+            if prediction_result is None:
+                prediction_result = self._classify_text(session.merged_text)
+                if text_key and prediction_result and prediction_result.get('personality_type'):
+                    self.stage_cache.set("classification", text_key, copy.deepcopy(prediction_result))
+        except Exception as e:
+            self.logger.error(f"통합 성격 유형 분류 오류: {e}")
+            prediction_result = None
+            session.error_message = str(e)
+        self._record_stage_time("classification", time.time() - stage_start)
+
+        if not prediction_result or not prediction_result.get('personality_type'):
+            session.status = PipelineStatus.ERROR
+            session.error_message = session.error_message or "키워드 분류 결과를 받지 못했습니다."
+            for drawing in session.drawings.values():
+                if drawing.status == PipelineStatus.SUCCESS:
+                    drawing.status = PipelineStatus.ERROR
+                    drawing.error_stage = "classification"
+                    drawing.error_message = session.error_message
+                    self._record_failure(drawing)
+        else:
+            session.status = PipelineStatus.SUCCESS
+            session.personality_type = prediction_result.get('personality_type')
+            session.confidence_score = prediction_result.get('confidence', 0.0)
+            session.keyword_analysis = {
+                'predicted_personality': prediction_result.get('personality_type'),
+                'confidence': prediction_result.get('confidence', 0.0),
+                'probabilities': prediction_result.get('probabilities', {}),
+                'current_image_keywords': prediction_result.get('current_image_keywords', []),
+                'previous_stage_keywords': prediction_result.get('previous_stage_keywords', []),
+                'total_keywords_used': prediction_result.get('total_keywords_used', 0)
+            }
+            for drawing in session.drawings.values():
+                if drawing.status != PipelineStatus.SUCCESS:
+                    continue
+                drawing.personality_type = session.personality_type
+                drawing.confidence_score = session.confidence_score
+                drawing.keyword_analysis = session.keyword_analysis
+                drawing.classification_success = True
+                self._update_status(
+                    drawing.image_base,
+                    stage="done",
+                    classification_completed=True,
+                    status="completed",
+                    personality_type=session.personality_type,
+                    quality_tier=drawing.quality_tier
+                )
+
+        session.duration_sec = round(time.time() - start_time, 3)
+        self.logger.info(
+            f"✅ [SESSION] 묶음 분석 완료: {session_id} -> {session.personality_type} "
+            f"({session.duration_sec:.2f}초, 실패 그림: {', '.join(session.failed_drawings) or '없음'})"
+        )
+        return session
+
+    def _run_analysis(self, image_input: str, ui_wait: bool, use_cache: bool, tier: QualityTier,
+                      classify: bool = True) -> PipelineResult:
+        """analyze_image 본체 (tier: 이 분석에 적용할 품질 단계, classify=False 면 2단계까지만 실행)"""
         import time
         start_time = time.time()
         
@@ -434,18 +965,26 @@ class HTPAnalysisPipeline:
         result = PipelineResult(
             status=PipelineStatus.RUNNING,
             image_base=image_base,
-            timestamp=datetime.now()
+            timestamp=datetime.now(),
+            quality_tier=tier.name
         )
+        if tier.name != QUALITY_TIERS[0].name:
+            self.logger.warning(f"⚠️ [DEGRADE] 부하로 품질 단계 {tier.name} 적용: {tier}")
         
-        # 초기 상태 캐싱
-        self._status_cache[image_base] = {
-            "image_base": image_base,
-            "detection_completed": False,
-            "analysis_completed": False,
-            "classification_completed": False,
-            "final_result": None,
-            "status": "running"
-        }
+        # 초기 상태 기록 (저장소 오류가 분석을 중단시키지 않도록 처리)
+        try:
+            self.status_store.set(image_base, {
+                "image_base": image_base,
+                "stage": "detection",
+                "detection_completed": False,
+                "analysis_completed": False,
+                "classification_completed": False,
+                "status": "running",
+                "quality_tier": tier.name,
+                "updated_at": datetime.now().isoformat()
+            })
+        except Exception as e:
+            self.logger.warning(f"상태 저장 실패 ({image_base}): {e}")
         
         self.logger.info(f"🚀 [TIMING] 이미지 분석 시작: {image_base} - 시작시간: {datetime.now().strftime('%H:%M:%S')} ({start_time:.3f}초)")
         
@@ -457,16 +996,24 @@ class HTPAnalysisPipeline:
             if not self._validate_image_file(image_path):
                 result.status = PipelineStatus.FAILED
                 result.error_message = "유효하지 않은 이미지 파일"
+                self._record_failure(result)
                 return result
             
+            # 캐시 키: 정규화되어 저장된 입력 JPEG 의 내용 해시
+            cache_key = None
+            if use_cache and self.stage_cache is not None:
+                cache_key = file_content_hash(image_path)
+            
             # 1단계: 객체 탐지
             stage_start = time.time()
-            if not self._execute_stage_1(image_path, result):
+            if not self._execute_stage_1(image_path, result, cache_key=cache_key):
                 result.status = PipelineStatus.ERROR
+                self._record_failure(result)
                 return result
             stage_end = time.time()
             stage_time = stage_end - stage_start
             self.logger.info(f"✅ [TIMING] 1단계 (객체탐지) 완료: {stage_time:.2f}초")
+            self._record_stage_time("detection", stage_time)
             
             # UI 표시를 위한 최소 대기 시간 (1단계가 너무 빨리 끝났을 때)
             if ui_wait:
@@ -477,17 +1024,18 @@ class HTPAnalysisPipeline:
                     time.sleep(wait_time)
             
             # 상태 업데이트
-            if image_base in self._status_cache:
-                self._status_cache[image_base]["detection_completed"] = True
+            self._update_status(image_base, stage="analysis", detection_completed=True)
             
             # 2단계: 심리 분석 (재시도 로직 포함)
             stage_start = time.time()
-            if not self._execute_stage_2(result, max_retries=5):
+            if not self._execute_stage_2(result, cache_key=cache_key, tier=tier, early_classify=classify):
                 result.status = PipelineStatus.ERROR
+                self._record_failure(result)
                 return result
             stage_end = time.time()
             stage_time = stage_end - stage_start
             self.logger.info(f"✅ [TIMING] 2단계 (심리분석) 완료: {stage_time:.2f}초")
+            self._record_stage_time("analysis", stage_time)
             
             # UI 표시를 위한 최소 대기 시간 (2단계)
             if ui_wait and stage_time < min_display_time:
@@ -496,17 +1044,25 @@ class HTPAnalysisPipeline:
                 time.sleep(wait_time)
             
             # 상태 업데이트
-            if image_base in self._status_cache:
-                self._status_cache[image_base]["analysis_completed"] = True
+            self._update_status(image_base, stage="classification", analysis_completed=True)
+            
+            # 묶음 분석: 성격 분류는 세 그림의 분석을 합쳐 analyze_session 에서 1회 실행
+            if not classify:
+                result.status = PipelineStatus.SUCCESS
+                self._write_analyzed_image(result)
+                self.logger.info(f"✅ [TIMING] 그림 분석 완료 (분류 대기): {image_base} - {time.time() - start_time:.2f}초")
+                return result
             
             # 3단계: 성격 분류
             stage_start = time.time()
-            if not self._execute_stage_3(result):
+            if not self._execute_stage_3(result, use_cache=cache_key is not None):
                 result.status = PipelineStatus.ERROR
+                self._record_failure(result)
                 return result
             stage_end = time.time()
             stage_time = stage_end - stage_start
             self.logger.info(f"✅ [TIMING] 3단계 (성격분류) 완료: {stage_time:.2f}초")
+            self._record_stage_time("classification", stage_time)
             
             # 모든 단계 성공
             end_time = time.time()
@@ -516,11 +1072,21 @@ class HTPAnalysisPipeline:
             self.logger.info(f"🕐 [TIMING] 시작시간: {datetime.fromtimestamp(start_time).strftime('%H:%M:%S.%f')[:-3]}")
             self.logger.info(f"🕐 [TIMING] 완료시간: {datetime.fromtimestamp(end_time).strftime('%H:%M:%S.%f')[:-3]}")
             self.logger.info(f"⏱️  [TIMING] 총 소요시간: {total_time:.2f}초 ({total_time/60:.1f}분)")
+            if result.cached_stages:
+                self.logger.info(f"⚡ [CACHE] 캐시 사용 단계: {', '.join(result.cached_stages)}")
+            
+            # 메모리 전달 모드의 분석 이미지 저장
+            self._write_analyzed_image(result)
             
             # 상태 업데이트
-            if image_base in self._status_cache:
-                self._status_cache[image_base]["classification_completed"] = True
-                self._status_cache[image_base]["status"] = "completed"
+            self._update_status(
+                image_base,
+                stage="done",
+                classification_completed=True,
+                status="completed",
+                personality_type=result.personality_type,
+                quality_tier=result.quality_tier
+            )
             
         except Exception as e:
             end_time = time.time()
@@ -534,70 +1100,131 @@ class HTPAnalysisPipeline:
             result.traceback = traceback.format_exc()
             
             # 상태 업데이트 (에러)
-            if image_base in self._status_cache:
-                self._status_cache[image_base]["status"] = "error"
-                self._status_cache[image_base]["error"] = str(e)
+            self._record_failure(result)
+        finally:
+            # 2단계 검증 실패/3단계 오류 등으로 쓰이지 않은 미리 시작한 분류 정리
+            self._discard_early_classifications(result)
         
         return result
     
+    def _record_stage_time(self, stage: str, seconds: float) -> None:
+        with self._stage_timings_lock:
+            self._stage_timings[stage].append(seconds)
+    
+    def get_stage_timings(self) -> Dict[str, Any]:
+        """최근 분석의 단계별 처리 시간 (단계당 최근 50건, 예상 대기 시간 계산용)"""
+        with self._stage_timings_lock:
+            samples = {stage: list(times) for stage, times in self._stage_timings.items()}
+        timings = {}
+        for stage, times in samples.items():
+            ordered = sorted(times)
+            timings[stage] = {
+                "samples": len(times),
+                "avg_sec": round(sum(times) / len(times), 3) if times else None,
+                "p95_sec": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3) if times else None
+            }
+        return timings
+    
+    def _update_status(self, image_base: str, **fields) -> None:
+        """상태 저장소에 단계 전이 기록 (저장소 오류가 분석을 중단시키지 않도록 처리)"""
+        try:
+            self.status_store.update(image_base, updated_at=datetime.now().isoformat(), **fields)
+        except Exception as e:
+            self.logger.warning(f"상태 저장 실패 ({image_base}): {e}")
+    
+    def _record_failure(self, result: PipelineResult) -> None:
+        """실패 상태 기록"""
+        self._write_analyzed_image(result)
+        self._update_status(
+            result.image_base,
+            stage="error",
+            status="error",
+            error=result.error_message,
+            error_stage=result.error_stage
+        )
+    
+    def warmup(self) -> Dict[str, Any]:
+        """모든 모델을 로드하고 더미 추론을 1회씩 실행
+        
+        Returns:
+            Dict: 모델별 워밍업 결과 (성공 여부, 소요시간, 오류)
+        """
+        import time
+        
+        yolo_model_path = str(self.config.model_dir / self.config.yolo_model_path)
+        steps = [
+            ("yolo", lambda: warmup_yolo_model(yolo_model_path, self.config.yolo_backend)),
+            ("embedding", warmup_embedding_model),
+            ("reranker", warmup_reranker_model),
+            ("keyword_classifier", warmup_keyword_classifier),
+        ]
+        if self.inference_client is not None:
+            # 모델은 사이드카가 로드 (임베딩/리랭커 단계는 OpenSearch 연결과 사이드카 경로 확인용)
+            steps = [("inference_sidecar", self.inference_client.warmup)] + [
+                step for step in steps if step[0] in ("embedding", "reranker")
+            ]
+        
+        report = {}
+        for name, step in steps:
+            start_time = time.time()
+            try:
+                step()
+                report[name] = {"success": True}
+                self.logger.info(f"🔥 [WARMUP] {name} 워밍업 완료: {time.time() - start_time:.2f}초")
+            except Exception as e:
+                report[name] = {"success": False, "error": str(e)}
+                self.logger.warning(f"⚠️ [WARMUP] {name} 워밍업 실패: {e}")
+            report[name]["duration_sec"] = round(time.time() - start_time, 3)
+        
+        return report
+    
+    def get_model_stats(self) -> Dict[str, Any]:
+        """파이프라인이 사용하는 모델 레지스트리 상태 조회
+        
+        Returns:
+            Dict: 모델별 로드 시간 및 재사용 횟수
+        """
+        return {
+            "keyword_classifier": get_classifier_stats(),
+            "gpt_retry": get_retry_stats(),
+            "openai_gateway": get_openai_gateway().stats(),
+            "gpt_image_payload": get_image_payload_stats(),
+            "yolo_pool": self.yolo_pool.stats(),
+            "inference_scheduler": self.inference_scheduler.stats(),
+            "yolo_batcher": self.yolo_batcher.stats() if self.yolo_batcher else None,
+            "inference_sidecar": self.inference_client.stats() if self.inference_client else None,
+            "early_classification": self._get_early_stats(),
+            "degradation": self.degradation.stats(),
+            "process": {"pid": os.getpid(), "rss_mb": current_rss_mb()}
+        }
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """단계 결과 캐시 통계 (단계별 적중/미적중)"""
+        if self.stage_cache is None:
+            return {"enabled": False}
+        return dict(self.stage_cache.stats(), enabled=True)
+    
     def get_analysis_status(self, image_base: str) -> Dict[str, Any]:
-        """분석 상태 조회
+        """분석 상태 조회 (상태 저장소 1회 조회)
         
         Args:
             image_base: 이미지 기본명
             
         Returns:
-            Dict: 분석 상태 정보
+            Dict: 분석 상태 정보 (기록이 없으면 대기 상태)
         """
-        # 1. 메모리 캐시 확인
-        if image_base in self._status_cache:
-            return self._status_cache[image_base]
-            
-        # 2. 캐시에 없으면 파일 시스템 확인 (Fallback)
-        status = {
+        status = self.status_store.get(image_base)
+        if status is not None:
+            return status
+        
+        return {
             "image_base": image_base,
+            "stage": "pending",
             "detection_completed": False,
             "analysis_completed": False,
             "classification_completed": False,
-            "final_result": None
+            "status": "pending"
         }
-        
-        # 각 단계별 결과 파일 확인
-        detection_path = (
-            self.config.detection_results_dir / "images" / 
-            f"detection_result_{image_base}.jpg"
-        )
-        analysis_path = (
-            self.config.detection_results_dir / "results" / 
-            f"result_{image_base}.json"
-        )
-        
-        # KoBERT 결과 파일 확인 (result.json의 personality_analysis 존재 여부)
-        kobert_completed = False
-        if analysis_path.exists():
-            try:
-                with open(analysis_path, 'r', encoding='utf-8') as f:
-                    result_data = json.load(f)
-                    kobert_completed = 'personality_analysis' in result_data
-            except:
-                kobert_completed = False
-        
-        status["detection_completed"] = detection_path.exists()
-        status["analysis_completed"] = analysis_path.exists()
-        status["classification_completed"] = kobert_completed
-        
-        if analysis_path.exists():
-            try:
-                with open(analysis_path, 'r', encoding='utf-8') as f:
-                    analysis_data = json.load(f)
-                status["final_result"] = analysis_data
-            except Exception as e:
-                self.logger.error(f"분석 결과 파일 읽기 오류: {e}")
-        
-        # 캐시에 저장 (다음 조회를 위해)
-        self._status_cache[image_base] = status
-        
-        return status
 
 
 def _display_detailed_keyword_results(image_base: str, pipeline: HTPAnalysisPipeline):
@@ -683,15 +1310,23 @@ def main():
   python main.py --image test5.jpg
   python main.py --image test5 --verbose
   python main.py --image /path/to/image.png --config config.json
+  python main.py --session s1_house.jpg s1_tree.jpg s1_person.jpg
         """
     )
     
-    parser.add_argument(
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument(
         '--image', 
         type=str, 
-        required=True,
         help='분석할 이미지 파일명 (예: test5.jpg, test5)'
     )
+    target.add_argument(
+        '--session',
+        type=str,
+        nargs=3,
+        metavar=('HOUSE', 'TREE', 'PERSON'),
+        help='동시에 분석할 집/나무/사람 그림 파일명'
+    )
     parser.add_argument(
         '--verbose', 
         action='store_true',
@@ -712,6 +1347,23 @@ def main():
         if args.verbose:
             pipeline.logger.setLevel(logging.DEBUG)
         
+        if args.session:
+            session = pipeline.analyze_session(dict(zip(("house", "tree", "person"), args.session)))
+            print("\n" + "="*60)
+            print("HTP 심리검사 묶음 분석 결과")
+            print("="*60)
+            print(f"검사: {session.session_id}")
+            print(f"상태: {session.status.value} ({session.duration_sec:.1f}초)")
+            for name, drawing in session.drawings.items():
+                print(f"  - {name}: {drawing.image_base} ({drawing.status.value})")
+            if session.status == PipelineStatus.SUCCESS:
+                print(f"\n🎯 성격 유형: {session.personality_type}")
+                print(f"🔍 신뢰도: {session.confidence_score:.1%}")
+            else:
+                print(f"\n❌ 오류: {session.error_message}")
+            print("="*60)
+            sys.exit(0 if session.status == PipelineStatus.SUCCESS else 1)
+        
         # 분석 실행
         result = pipeline.analyze_image(args.image)
         
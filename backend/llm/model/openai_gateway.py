@@ -0,0 +1,340 @@
+"""
+공유 OpenAI 호출 게이트웨이
+
+분석 파이프라인(GPT-4o Vision), 상담 채팅, 개인화 인사가 각자 OpenAI 를 호출하면
+분당 요청/토큰 한도를 서로 모른 채 사용하여 트래픽이 몰릴 때 429 가 연쇄적으로 발생합니다.
+프로세스 전체의 OpenAI 호출을 이 게이트웨이 하나로 모아
+- 동시 호출 수 제한 (세마포어)
+- 분당 요청 수(RPM) / 분당 토큰 수(TPM) 토큰 버킷 (요청 전 추정치로 차감, 응답 후 실제 사용량으로 정산)
+- 429 응답 시 Retry-After 동안 모든 호출 일시 정지
+- HTTP 연결 재사용 (AsyncOpenAI 클라이언트 1개)
+- 대기열/지연 통계
+를 적용합니다.
+
+AsyncOpenAI 클라이언트와 제한 장치는 전용 이벤트 루프 스레드 하나에서 동작하므로
+동기 호출(파이프라인 스레드)과 비동기 호출(FastAPI 이벤트 루프)이 같은 한도를 공유합니다.
+"""
+
+import os
+import time
+import asyncio
+import threading
+import concurrent.futures
+from types import SimpleNamespace
+from typing import Dict, Any, List, Optional, Callable
+
+# 이미지 1장의 토큰 추정치 (1024px 이하 high detail 기준, low detail 은 크기와 무관하게 고정)
+IMAGE_TOKEN_ESTIMATE = 765
+LOW_DETAIL_IMAGE_TOKEN_ESTIMATE = 85
+
+
+def estimate_request_tokens(messages: List[Dict[str, Any]], max_tokens: Optional[int] = None) -> int:
+    """요청의 토큰 사용량 추정 (OpenAI 한도 계산과 같이 max_tokens 포함)
+
+    한국어는 글자당 토큰 수가 영어보다 많으므로 글자 수 / 2 로 보수적으로 계산합니다.
+    """
+    tokens = 0
+    for message in messages:
+        tokens += 4
+        content = message.get("content")
+        if isinstance(content, str):
+            tokens += len(content) // 2
+        elif isinstance(content, list):
+            for part in content:
+                if part.get("type") == "text":
+                    tokens += len(part.get("text", "")) // 2
+                elif part.get("type") == "image_url":
+                    low_detail = (part.get("image_url") or {}).get("detail") == "low"
+                    tokens += LOW_DETAIL_IMAGE_TOKEN_ESTIMATE if low_detail else IMAGE_TOKEN_ESTIMATE
+    return tokens + (max_tokens or 0)
+
+
+class TokenBucket:
+    """분당 한도 토큰 버킷 (게이트웨이 이벤트 루프에서만 사용, per_minute 가 0 이하면 제한 없음)"""
+
+    def __init__(self, per_minute: int):
+        self.unlimited = per_minute <= 0
+        self.capacity = max(1, per_minute)
+        self.rate = self.capacity / 60.0
+        self.available = float(self.capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay_for(self, amount: int) -> float:
+        """amount 를 차감할 수 있을 때까지 남은 시간 (초)"""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.available >= amount else (amount - self.available) / self.rate
+
+    def take(self, amount: int) -> None:
+        if self.unlimited:
+            return
+        self._refill()
+        self.available -= min(amount, self.capacity)
+
+    def refund(self, amount: int) -> None:
+        """추정치보다 실제 사용량이 적으면 차이만큼 반환 (많으면 추가 차감)"""
+        if self.unlimited:
+            return
+        self._refill()
+        self.available = min(self.capacity, self.available + amount)
+
+
+class OpenAIGateway:
+    """프로세스 전체 OpenAI 호출의 동시성/속도 제한 (RPM/TPM 이 0 이면 해당 한도 없음)"""
+
+    def __init__(self, max_concurrent: int = 8, requests_per_minute: int = 0, tokens_per_minute: int = 0,
+                 max_connections: int = 20, timeout: float = 120.0, api_key: Optional[str] = None,
+                 base_url: Optional[str] = None, client=None):
+        self.max_concurrent = max(1, max_concurrent)
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.api_key = api_key
+        self.base_url = base_url
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._start_lock = threading.Lock()
+        self._client = client  # AsyncOpenAI 호환 클라이언트 (로컬 대체 모델/벤치마크용, 없으면 생성)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._rate_lock: Optional[asyncio.Lock] = None
+        self._request_bucket = TokenBucket(requests_per_minute)
+        self._token_bucket = TokenBucket(tokens_per_minute)
+        self._paused_until = 0.0
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "streamed": 0,
+            "errors": 0,
+            "rate_limited": 0,
+            "queued": 0,
+            "in_flight": 0,
+            "max_queued": 0,
+            "queue_wait_sec": 0.0,
+            "max_queue_wait_sec": 0.0,
+            "rate_wait_sec": 0.0,
+            "estimated_tokens": 0,
+            "used_tokens": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+        }
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """전용 이벤트 루프 스레드 시작 (첫 호출 시 1회)"""
+        if self._loop is not None:
+            return self._loop
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="openai-gateway", daemon=True)
+                thread.start()
+                asyncio.run_coroutine_threadsafe(self._setup(), loop).result()
+                self._loop = loop
+        return self._loop
+
+    async def _setup(self) -> None:
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._rate_lock = asyncio.Lock()
+        if self._client is not None:
+            return
+
+        import httpx
+        from openai import AsyncOpenAI
+
+        self._client = AsyncOpenAI(
+            api_key=self.api_key or os.getenv("OPENAI_API_KEY"),
+            base_url=self.base_url or os.getenv("OPENAI_BASE_URL") or None,
+            timeout=self.timeout,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+                timeout=self.timeout
+            )
+        )
+
+    def _count(self, **changes) -> None:
+        with self._stats_lock:
+            for field, amount in changes.items():
+                self._stats[field] += amount
+            self._stats["max_queued"] = max(self._stats["max_queued"], self._stats["queued"])
+
+    async def _wait_for_rate(self, estimated_tokens: int) -> float:
+        """RPM/TPM 버킷과 429 일시 정지가 허용할 때까지 대기 (도착 순서대로)"""
+        waited = 0.0
+        async with self._rate_lock:
+            while True:
+                delay = max(
+                    self._paused_until - time.monotonic(),
+                    self._request_bucket.delay_for(1),
+                    self._token_bucket.delay_for(estimated_tokens)
+                )
+                if delay <= 0:
+                    self._request_bucket.take(1)
+                    self._token_bucket.take(estimated_tokens)
+                    return waited
+                await asyncio.sleep(delay)
+                waited += delay
+
+    def _pause_for_rate_limit(self, error: BaseException) -> None:
+        """429 응답의 Retry-After 동안 모든 호출 정지"""
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        retry_after = 1.0
+        try:
+            if headers.get("retry-after"):
+                retry_after = float(headers["retry-after"])
+            elif headers.get("retry-after-ms"):
+                retry_after = float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+        self._paused_until = max(self._paused_until, time.monotonic() + min(retry_after, 60.0))
+
+    async def _stream(self, request: Dict[str, Any], on_delta: Callable[[str], None]):
+        """스트리밍 호출: 텍스트 조각이 도착할 때마다 on_delta 호출 후 일반 응답과 같은 형태로 반환
+        
+        on_delta 는 게이트웨이 이벤트 루프에서 실행되므로 무거운 작업은 다른 스레드로 넘겨야 합니다.
+        """
+        stream = await self._client.chat.completions.create(
+            stream=True, stream_options={"include_usage": True}, **request
+        )
+        parts = []
+        usage = None
+        finish_reason = None
+        async for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+            for choice in chunk.choices:
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+                delta = choice.delta.content if choice.delta else None
+                if not delta:
+                    continue
+                parts.append(delta)
+                try:
+                    on_delta(delta)
+                except Exception as e:
+                    # 소비자 오류가 응답 수신을 중단시키지 않도록 처리
+                    print(f"⚠️ 스트리밍 콜백 오류: {e}")
+        message = SimpleNamespace(role="assistant", content="".join(parts))
+        return SimpleNamespace(
+            choices=[SimpleNamespace(index=0, message=message, finish_reason=finish_reason)],
+            usage=usage
+        )
+
+    async def _create(self, request: Dict[str, Any], on_delta: Optional[Callable[[str], None]] = None):
+        estimated_tokens = estimate_request_tokens(request.get("messages", []), request.get("max_tokens"))
+        queued_at = time.monotonic()
+        dequeued = False
+        self._count(queued=1, estimated_tokens=estimated_tokens)
+        try:
+            async with self._semaphore:
+                rate_wait = await self._wait_for_rate(estimated_tokens)
+                queue_wait = time.monotonic() - queued_at
+                with self._stats_lock:
+                    self._stats["queued"] -= 1
+                    self._stats["in_flight"] += 1
+                    self._stats["queue_wait_sec"] += queue_wait
+                    self._stats["rate_wait_sec"] += rate_wait
+                    self._stats["max_queue_wait_sec"] = max(self._stats["max_queue_wait_sec"], queue_wait)
+                dequeued = True
+                try:
+                    if on_delta is not None:
+                        self._count(streamed=1)
+                        response = await self._stream(request, on_delta)
+                    else:
+                        response = await self._client.chat.completions.create(**request)
+                except Exception as e:
+                    self._count(errors=1)
+                    if getattr(e, "status_code", None) == 429:
+                        self._count(rate_limited=1)
+                        self._pause_for_rate_limit(e)
+                    raise
+                finally:
+                    self._count(in_flight=-1, requests=1)
+        finally:
+            if not dequeued:
+                self._count(queued=-1)  # 대기 중 취소
+
+        usage = getattr(response, "usage", None)
+        used_tokens = getattr(usage, "total_tokens", None)
+        if used_tokens is not None:
+            self._token_bucket.refund(estimated_tokens - used_tokens)
+            self._count(used_tokens=used_tokens, prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+                        completion_tokens=getattr(usage, "completion_tokens", 0) or 0)
+        return response
+
+    def create_chat_completion(self, **request):
+        """동기 호출 (파이프라인 작업 스레드용, 응답이 올 때까지 현재 스레드 대기)"""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self._create(request), loop).result()
+
+    def stream_chat_completion(self, on_delta: Callable[[str], None], **request):
+        """동기 스트리밍 호출 (응답 조각마다 on_delta 호출, 완료 후 전체 응답 반환)"""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self._create(request, on_delta), loop).result()
+
+    def submit_chat_completion(self, **request) -> concurrent.futures.Future:
+        """호출을 시작만 하고 Future 반환 (여러 호출을 동시에 보낸 뒤 결과를 모을 때 사용)"""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self._create(request), loop)
+
+    async def acreate_chat_completion(self, **request):
+        """비동기 호출 (FastAPI 이벤트 루프용, 대기 중에도 이벤트 루프를 막지 않음)"""
+        loop = self._ensure_loop()
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._create(request), loop))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        completed = stats["requests"]
+        for field in ("queue_wait_sec", "max_queue_wait_sec", "rate_wait_sec"):
+            stats[field] = round(stats[field], 3)
+        stats["avg_queue_wait_ms"] = round(stats["queue_wait_sec"] / completed * 1000, 1) if completed else 0.0
+        stats["paused_sec"] = round(max(0.0, self._paused_until - time.monotonic()), 3)
+        stats["limits"] = {
+            "max_concurrent": self.max_concurrent,
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "max_connections": self.max_connections,
+        }
+        return stats
+
+
+# 프로세스 전역 게이트웨이 (첫 사용 시 환경변수 설정으로 생성, API 시작 시 설정값으로 구성)
+_GATEWAY: Optional[OpenAIGateway] = None
+_GATEWAY_LOCK = threading.Lock()
+
+
+def configure_openai_gateway(**options) -> OpenAIGateway:
+    """공유 게이트웨이 구성 (이미 호출이 시작된 뒤에는 기존 게이트웨이 유지)"""
+    global _GATEWAY
+
+    with _GATEWAY_LOCK:
+        if _GATEWAY is None or _GATEWAY._loop is None:
+            _GATEWAY = OpenAIGateway(**options)
+        return _GATEWAY
+
+
+def get_openai_gateway() -> OpenAIGateway:
+    """공유 게이트웨이 반환"""
+    global _GATEWAY
+
+    if _GATEWAY is not None:
+        return _GATEWAY
+    with _GATEWAY_LOCK:
+        if _GATEWAY is None:
+            _GATEWAY = OpenAIGateway(
+                max_concurrent=int(os.getenv("OPENAI_MAX_CONCURRENT", "8")),
+                requests_per_minute=int(os.getenv("OPENAI_RPM_LIMIT", "0")),
+                tokens_per_minute=int(os.getenv("OPENAI_TPM_LIMIT", "0")),
+                max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "20")),
+                timeout=float(os.getenv("OPENAI_TIMEOUT", "120"))
+            )
+        return _GATEWAY
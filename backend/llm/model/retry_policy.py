@@ -0,0 +1,175 @@
+"""
+GPT 호출 재시도 정책
+
+파이프라인 단계 재시도와 GPT 호출 재시도가 중첩되어 한 그림에 수십 번 호출되는 것을 막기 위해
+작업(그림 1장)마다 하나의 RetryBudget 을 만들어 모든 GPT 호출이 같은 예산을 사용합니다.
+- 작업당 전체 호출 수 제한 (job_budget)
+- 지수 백오프 + 전체 지터 (full jitter)
+- 재시도 가능한 오류(429, 5xx, 타임아웃, 연결 오류)만 재시도
+- 시도별 기록 및 프로세스 전체 통계
+"""
+
+import time
+import random
+import threading
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+
+# 재시도 가능한 HTTP 상태 코드
+RETRIABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# 상태 코드가 없는 예외 중 재시도 가능한 유형 (openai / httpx / 표준 라이브러리)
+RETRIABLE_EXCEPTION_NAMES = {
+    "APITimeoutError",
+    "APIConnectionError",
+    "RateLimitError",
+    "InternalServerError",
+    "Timeout",
+    "TimeoutError",
+    "TimeoutException",
+    "ConnectError",
+    "ConnectionError",
+    "ReadTimeout",
+}
+
+
+class RetryBudgetExceeded(Exception):
+    """작업의 GPT 호출 예산 소진"""
+
+
+def is_retriable_error(error: BaseException) -> bool:
+    """재시도하면 성공할 수 있는 오류인지 판단 (인증/요청 형식 오류 등은 재시도하지 않음)"""
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        response = getattr(error, "response", None)
+        status_code = getattr(response, "status_code", None)
+    if isinstance(status_code, int):
+        return status_code in RETRIABLE_STATUS_CODES or status_code >= 500
+
+    return any(cls.__name__ in RETRIABLE_EXCEPTION_NAMES for cls in type(error).__mro__)
+
+
+# 프로세스 전체 재시도 통계
+_RETRY_STATS = {
+    "jobs": 0,
+    "attempts": 0,
+    "successes": 0,
+    "rejections": 0,
+    "retriable_errors": 0,
+    "non_retriable_errors": 0,
+    "budget_exhausted": 0,
+    "backoff_sec": 0.0,
+}
+_RETRY_STATS_LOCK = threading.Lock()
+
+
+def _count(field: str, amount=1) -> None:
+    with _RETRY_STATS_LOCK:
+        _RETRY_STATS[field] += amount
+
+
+def get_retry_stats() -> Dict[str, Any]:
+    """프로세스 전체 GPT 재시도 통계"""
+    with _RETRY_STATS_LOCK:
+        stats = dict(_RETRY_STATS)
+    stats["backoff_sec"] = round(stats["backoff_sec"], 3)
+    return stats
+
+
+@dataclass
+class RetryPolicy:
+    """GPT 호출 재시도 정책
+
+    Attributes:
+        call_max_attempts: GPT 호출 1건의 최대 시도 횟수
+        stage_max_attempts: 분석 단계 전체(초기 분석 + RAG 보강)의 최대 반복 횟수
+        job_budget: 작업 1건이 사용할 수 있는 전체 GPT 호출 수
+        backoff_base: 첫 재시도 대기 상한 (초)
+        backoff_max: 재시도 대기 최대값 (초)
+    """
+    call_max_attempts: int = 3
+    stage_max_attempts: int = 2
+    job_budget: int = 8
+    backoff_base: float = 1.0
+    backoff_max: float = 20.0
+
+    def backoff_delay(self, attempt: int) -> float:
+        """attempt 번째 실패 후 대기 시간 (지수 백오프 + 전체 지터)"""
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** max(0, attempt - 1)))
+        return random.uniform(0, ceiling)
+
+    def new_budget(self) -> "RetryBudget":
+        """작업 1건의 호출 예산 생성"""
+        _count("jobs")
+        return RetryBudget(self)
+
+
+class RetryBudget:
+    """작업 1건의 GPT 호출 예산과 시도 기록"""
+
+    def __init__(self, policy: RetryPolicy):
+        self.policy = policy
+        self.used = 0
+        self.attempts: List[Dict[str, Any]] = []
+        self.last_error_retriable: Optional[bool] = None
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.policy.job_budget - self.used)
+
+    def acquire(self) -> None:
+        """호출 1회 예산 사용 (소진 시 RetryBudgetExceeded)"""
+        with self._lock:
+            if self.used >= self.policy.job_budget:
+                _count("budget_exhausted")
+                raise RetryBudgetExceeded(f"GPT 호출 예산 소진 ({self.policy.job_budget}회)")
+            self.used += 1
+
+    def record(self, call: str, attempt: int, outcome: str, duration_sec: float,
+               error: Optional[BaseException] = None) -> None:
+        """시도 결과 기록
+
+        Args:
+            call: 호출 구분 (예: "initial", "final")
+            attempt: 호출 내 시도 번호 (1부터)
+            outcome: "success", "rejected", "error"
+            duration_sec: 호출 소요 시간
+            error: 오류 (outcome 이 "error" 일 때)
+        """
+        entry = {"call": call, "attempt": attempt, "outcome": outcome, "duration_sec": round(duration_sec, 3)}
+        _count("attempts")
+        if outcome == "success":
+            _count("successes")
+        elif outcome == "rejected":
+            _count("rejections")
+        elif error is not None:
+            retriable = is_retriable_error(error)
+            entry["retriable"] = retriable
+            entry["error"] = f"{type(error).__name__}: {error}"[:300]
+            self.last_error_retriable = retriable
+            _count("retriable_errors" if retriable else "non_retriable_errors")
+        with self._lock:
+            self.attempts.append(entry)
+
+    def sleep_backoff(self, attempt: int) -> float:
+        """재시도 전 대기 (마지막 기록에 대기 시간 추가)"""
+        delay = self.policy.backoff_delay(attempt)
+        with self._lock:
+            if self.attempts:
+                self.attempts[-1]["backoff_sec"] = round(delay, 3)
+        _count("backoff_sec", delay)
+        time.sleep(delay)
+        return delay
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"used": self.used, "budget": self.policy.job_budget, "attempts": list(self.attempts)}
+
+
+# 파이프라인 밖에서 직접 호출할 때 사용하는 기본 정책
+_DEFAULT_POLICY = RetryPolicy()
+
+
+def get_default_retry_policy() -> RetryPolicy:
+    return _DEFAULT_POLICY
@@ -0,0 +1,106 @@
+"""
+파이프라인 단계 결과 캐시 (콘텐츠 해시 기반)
+
+같은 그림이 다시 제출되면(재업로드, QA 고정 이미지) YOLO → GPT-4o → 분류기를 다시 실행하지 않고
+이전 단계 결과를 재사용합니다.
+- 키: (단계명, 입력 내용의 SHA-256) - 탐지/분석은 정규화된 JPEG 바이트, 분류는 분석 텍스트
+- 프로세스 내 LRU + TTL, 단계별 적중/미적중 통계 제공
+"""
+
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+def content_hash(data) -> str:
+    """바이트 또는 문자열의 SHA-256 해시"""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_content_hash(path, chunk_size: int = 1024 * 1024) -> str:
+    """파일 내용의 SHA-256 해시"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class StageCache:
+    """단계별 결과 캐시 (최대 항목 수 + TTL 제한)"""
+
+    def __init__(self, ttl_seconds: int = 86400, max_entries: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, stage: str, field: str) -> None:
+        stage_stats = self._stats.setdefault(stage, {"hits": 0, "misses": 0, "stores": 0})
+        stage_stats[field] += 1
+
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        """캐시된 단계 결과 조회 (없거나 만료되면 None)"""
+        with self._lock:
+            entry = self._entries.get((stage, key))
+            if entry is not None and entry[0] < time.time():
+                del self._entries[(stage, key)]
+                entry = None
+            if entry is None:
+                self._count(stage, "misses")
+                return None
+            self._entries.move_to_end((stage, key))
+            self._count(stage, "hits")
+            return entry[1]
+
+    def set(self, stage: str, key: str, value: Any) -> None:
+        """단계 결과 저장 (값은 호출자가 더 이상 수정하지 않는 객체여야 함)"""
+        with self._lock:
+            self._entries[(stage, key)] = (time.time() + self.ttl_seconds, value)
+            self._entries.move_to_end((stage, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._count(stage, "stores")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {}
+            for stage, counts in self._stats.items():
+                lookups = counts["hits"] + counts["misses"]
+                stages[stage] = dict(counts, hit_rate=round(counts["hits"] / lookups, 3) if lookups else 0.0)
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "stages": stages
+            }
+
+
+# 프로세스 전역 캐시 (파이프라인 인스턴스가 다시 만들어져도 유지)
+_CACHES: Dict[tuple, StageCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_stage_cache(ttl_seconds: int = 86400, max_entries: int = 1000) -> StageCache:
+    """설정에 맞는 공유 단계 캐시 반환
+
+    Args:
+        ttl_seconds: 결과 보관 시간 (초)
+        max_entries: 최대 보관 항목 수 (모든 단계 합계)
+    """
+    cache_key = (ttl_seconds, max_entries)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(cache_key)
+        if cache is None:
+            cache = StageCache(ttl_seconds=ttl_seconds, max_entries=max_entries)
+            _CACHES[cache_key] = cache
+        return cache
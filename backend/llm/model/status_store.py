@@ -0,0 +1,198 @@
+"""
+분석 진행 상태 저장소
+
+파이프라인 각 단계의 상태 전이(detection → analysis → classification → done)를 기록합니다.
+- memory: 프로세스 내 LRU + TTL (단일 프로세스용)
+- postgres: analysis_status 테이블 (여러 uvicorn 워커/분석 워커가 공유)
+"""
+
+import json
+import time
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+class StatusStore(ABC):
+    """상태 저장소 인터페이스"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """상태 조회 (없거나 만료되었으면 None)"""
+
+    @abstractmethod
+    def set(self, key: str, status: Dict[str, Any]) -> None:
+        """상태 저장 (기존 상태 대체)"""
+
+    def update(self, key: str, **fields) -> Dict[str, Any]:
+        """기존 상태에 필드를 병합하여 저장"""
+        status = self.get(key) or {}
+        status.update(fields)
+        self.set(key, status)
+        return status
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class InMemoryStatusStore(StatusStore):
+    """프로세스 내 상태 저장소 (최대 항목 수 + TTL 제한)"""
+
+    def __init__(self, ttl_seconds: int = 3600, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, status = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            return dict(status)
+
+    def _put_locked(self, key: str, status: Dict[str, Any]) -> None:
+        self._entries[key] = (time.time() + self.ttl_seconds, status)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def set(self, key: str, status: Dict[str, Any]) -> None:
+        with self._lock:
+            self._put_locked(key, dict(status))
+
+    def update(self, key: str, **fields) -> Dict[str, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            status = dict(entry[1]) if entry and entry[0] >= time.time() else {}
+            status.update(fields)
+            self._put_locked(key, status)
+            return dict(status)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": "memory", "entries": len(self._entries), "max_entries": self.max_entries, "ttl_seconds": self.ttl_seconds}
+
+
+class PostgresStatusStore(StatusStore):
+    """PostgreSQL 기반 공유 상태 저장소 (analysis_status 테이블)"""
+
+    # 이 횟수만큼 쓸 때마다 만료된 행 정리
+    CLEANUP_EVERY = 200
+
+    UPSERT_SQL = (
+        'INSERT INTO "analysis_status" ("status_key", "data", "expires_at") '
+        'VALUES (:key, :data, now() + make_interval(secs => :ttl)) '
+        'ON CONFLICT ("status_key") DO UPDATE SET "data" = EXCLUDED."data", "expires_at" = EXCLUDED."expires_at"'
+    )
+
+    def __init__(self, database_url: str, ttl_seconds: int = 3600, max_entries: int = 10000):
+        from sqlalchemy import create_engine
+
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.engine = create_engine(database_url, pool_pre_ping=True, pool_size=5, max_overflow=5)
+        self._write_count = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        from sqlalchemy import text
+
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                text('SELECT "data" FROM "analysis_status" WHERE "status_key" = :key AND "expires_at" > now()'),
+                {"key": key}
+            ).first()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, status: Dict[str, Any]) -> None:
+        from sqlalchemy import text
+
+        with self.engine.begin() as conn:
+            conn.execute(
+                text(self.UPSERT_SQL),
+                {"key": key, "data": json.dumps(status, ensure_ascii=False, default=str), "ttl": self.ttl_seconds}
+            )
+        self._maybe_cleanup()
+
+    def update(self, key: str, **fields) -> Dict[str, Any]:
+        from sqlalchemy import text
+
+        # 행 잠금으로 읽기-병합-쓰기를 원자적으로 수행
+        with self.engine.begin() as conn:
+            row = conn.execute(
+                text('SELECT "data" FROM "analysis_status" WHERE "status_key" = :key AND "expires_at" > now() FOR UPDATE'),
+                {"key": key}
+            ).first()
+            status = json.loads(row[0]) if row else {}
+            status.update(fields)
+            conn.execute(
+                text(self.UPSERT_SQL),
+                {"key": key, "data": json.dumps(status, ensure_ascii=False, default=str), "ttl": self.ttl_seconds}
+            )
+        self._maybe_cleanup()
+        return status
+
+    def _maybe_cleanup(self) -> None:
+        from sqlalchemy import text
+
+        with self._lock:
+            self._write_count += 1
+            if self._write_count % self.CLEANUP_EVERY:
+                return
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(text('DELETE FROM "analysis_status" WHERE "expires_at" < now()'))
+                # 최대 항목 수 초과분은 만료가 가까운 순으로 삭제
+                conn.execute(
+                    text(
+                        'DELETE FROM "analysis_status" WHERE "status_key" IN ('
+                        'SELECT "status_key" FROM "analysis_status" ORDER BY "expires_at" DESC OFFSET :limit)'
+                    ),
+                    {"limit": self.max_entries}
+                )
+        except Exception as e:
+            print(f"상태 저장소 정리 실패: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        from sqlalchemy import text
+
+        with self.engine.connect() as conn:
+            count = conn.execute(text('SELECT count(*) FROM "analysis_status" WHERE "expires_at" > now()')).scalar()
+        return {"backend": "postgres", "entries": count, "max_entries": self.max_entries, "ttl_seconds": self.ttl_seconds}
+
+
+# 프로세스 전역 저장소 (파이프라인과 API 서비스가 같은 인스턴스를 공유)
+_STORES: Dict[tuple, StatusStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_status_store(backend: str = "memory", database_url: Optional[str] = None,
+                     ttl_seconds: int = 3600, max_entries: int = 10000) -> StatusStore:
+    """설정에 맞는 공유 상태 저장소 반환
+
+    Args:
+        backend: "memory" 또는 "postgres"
+        database_url: postgres 백엔드 접속 URL
+        ttl_seconds: 상태 보관 시간 (초)
+        max_entries: 최대 보관 항목 수
+    """
+    store_key = (backend, database_url)
+    with _STORES_LOCK:
+        store = _STORES.get(store_key)
+        if store is None:
+            if backend == "postgres":
+                if not database_url:
+                    raise ValueError("postgres 상태 저장소에는 database_url 이 필요합니다.")
+                store = PostgresStatusStore(database_url, ttl_seconds=ttl_seconds, max_entries=max_entries)
+            elif backend == "memory":
+                store = InMemoryStatusStore(ttl_seconds=ttl_seconds, max_entries=max_entries)
+            else:
+                raise ValueError(f"지원하지 않는 상태 저장소: {backend}")
+            _STORES[store_key] = store
+        return store
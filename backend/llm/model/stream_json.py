@@ -0,0 +1,87 @@
+"""
+스트리밍 JSON 응답의 점진적 파서
+
+GPT 가 JSON 객체를 조각 단위로 보내는 동안 최상위 필드 값이 닫히는 즉시
+(필드명, 값) 으로 알려 줍니다. 응답 전체를 기다리지 않고 먼저 완성된 필드
+(예: keywords, summary)로 다음 단계를 시작할 수 있습니다.
+
+중첩 객체/배열 안의 필드는 알리지 않고, 최상위 필드의 값 전체를 한 번에 전달합니다.
+"""
+
+import json
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+class IncrementalJSONFieldParser:
+    """최상위 JSON 필드가 완성될 때마다 on_field(name, value) 호출"""
+
+    def __init__(self, on_field: Callable[[str, Any], None], fields: Optional[Iterable[str]] = None):
+        self.on_field = on_field
+        self.fields = set(fields) if fields else None
+        self.completed: Dict[str, Any] = {}
+
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = None  # "key" | "colon" | "value"
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+
+    @property
+    def text(self) -> str:
+        """지금까지 받은 전체 텍스트"""
+        return self._text
+
+    def feed(self, chunk: str) -> None:
+        """응답 조각 추가"""
+        self._text += chunk
+        text = self._text
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._key_start is not None:
+                        self._key = json.loads(text[self._key_start:i + 1])
+                        self._key_start = None
+                        self._expect = "colon"
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect == "key":
+                    self._key_start = i
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect = "key"
+            elif ch in "}]":
+                if self._depth == 1 and self._expect == "value":
+                    self._finish_value(text[self._value_start:i])
+                self._depth = max(0, self._depth - 1)
+            elif self._depth == 1:
+                if ch == ":" and self._expect == "colon":
+                    self._expect = "value"
+                    self._value_start = i + 1
+                elif ch == "," and self._expect == "value":
+                    self._finish_value(text[self._value_start:i])
+                    self._expect = "key"
+        self._pos = len(text)
+
+    def _finish_value(self, raw: str) -> None:
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return
+        key = self._key
+        self._key = None
+        self.completed[key] = value
+        if self.fields is None or key in self.fields:
+            self.on_field(key, value)
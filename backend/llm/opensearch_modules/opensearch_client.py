@@ -8,16 +8,22 @@ import glob
 import numpy as np
 from opensearchpy import OpenSearch
 from opensearchpy.helpers import bulk
-from sentence_transformers import SentenceTransformer, CrossEncoder
 from sklearn.metrics.pairwise import cosine_similarity
 from typing import List, Dict, Any, Optional, Tuple
 import re
 from collections import defaultdict
+from contextlib import nullcontext
 from tqdm import tqdm
 import logging
 
 from opensearch_config import OpenSearchConfig, EmbeddingConfig
 
+# 파이프라인(llm/model)에서 사용할 때는 모델 추론 스케줄러로 CPU 스레드/동시 실행 수를 제한
+try:
+    from inference_scheduler import get_inference_scheduler
+except ImportError:
+    get_inference_scheduler = None
+
 logger = logging.getLogger(__name__)
 
 
@@ -87,7 +93,8 @@ class OpenSearchEmbeddingClient:
     def __init__(self, host: str = None, port: int = None, 
                  username: str = None, password: str = None, 
                  model_name: str = None,
-                 reranker_model: str = None):
+                 reranker_model: str = None,
+                 inference_client=None):
         """
         OpenSearch 임베딩 클라이언트 초기화 (KURE-v1 기반 + Reranker)
         
@@ -98,6 +105,7 @@ class OpenSearchEmbeddingClient:
             password: 인증 비밀번호 (None일 경우 환경변수 사용)
             model_name: KURE-v1 임베딩 모델 (None일 경우 환경변수 사용)
             reranker_model: 리랭킹 모델 (None일 경우 환경변수 사용)
+            inference_client: 추론 사이드카 클라이언트 (지정하면 임베딩/리랭킹 모델을 로드하지 않고 사이드카 사용)
         """
         # 환경 변수 설정 로드
         os_config = OpenSearchConfig.from_env()
@@ -131,6 +139,17 @@ class OpenSearchEmbeddingClient:
             print(f"OpenSearch 연결 실패: {e}")
             raise
         
+        if inference_client is not None:
+            # 모델은 사이드카 프로세스가 1회만 로드 (워커별 메모리 절약)
+            self.model = inference_client.sentence_encoder()
+            self.reranker = inference_client.cross_encoder()
+            self.reranker_available = True
+            print(f"임베딩/Reranker 모델: 추론 사이드카 사용 ({inference_client.socket_path})")
+            return
+        
+        # sentence_transformers 는 임포트 비용이 크므로 모델을 실제로 로드할 때 임포트
+        from sentence_transformers import SentenceTransformer, CrossEncoder
+        
         # KURE-v1 모델 로드 
         try:
             print(f"임베딩 모델 로드 시작: {self.model_name} (다운로드 필요 시 시간이 소요될 수 있습니다)")
@@ -152,6 +171,17 @@ class OpenSearchEmbeddingClient:
             self.reranker = None 
             self.reranker_available = False
     
+    def _inference_slot(self, model: str):
+        """추론 스케줄러 슬롯 (스케줄러가 없는 단독 실행 시에는 제한 없음)"""
+        if get_inference_scheduler is None:
+            return nullcontext()
+        return get_inference_scheduler().slot(model)
+    
+    def encode_query(self, query_text: str) -> List[float]:
+        """KURE-v1 쿼리 임베딩"""
+        with self._inference_slot("embedding"):
+            return self.model.encode(query_text).tolist()
+    
     def create_embedding_index(self, index_name: str, embedding_dimension: int = None):
         """
         심리 분석용 임베딩 인덱스 생성 (KURE-v1 기반)
@@ -295,7 +325,7 @@ class OpenSearchEmbeddingClient:
         """
         try:
             # KURE-v1로 쿼리 임베딩 생성 
-            query_embedding = self.model.encode(query_text).tolist()
+            query_embedding = self.encode_query(query_text)
         except Exception as e:
             print(f"쿼리 임베딩 생성 실패: {e}")
             return []
@@ -363,7 +393,8 @@ class OpenSearchEmbeddingClient:
         query_doc_pairs = [[query, result['text']] for result in results]
         
         # Reranker로 점수 계산
-        scores = self.reranker.predict(query_doc_pairs)
+        with self._inference_slot("reranker"):
+            scores = self.reranker.predict(query_doc_pairs)
         
         # 점수와 결과를 함께 정렬
         scored_results = list(zip(scores, results))
@@ -481,7 +512,7 @@ class OpenSearchEmbeddingClient:
         """
         하이브리드 검색 (벡터 + 텍스트 매칭 + Reranker)
         """
-        query_embedding = self.model.encode(query_text).tolist()
+        query_embedding = self.encode_query(query_text)
         
         # Reranker를 사용할 경우 더 많은 후보 검색
         search_k = k * 3 if use_reranker and self.reranker_available else k
@@ -0,0 +1,40 @@
+"""
+근접 중복 검색용 이미지 해시 인덱스 재구축
+
+result/images/original 의 모든 원본 이미지의 dHash 를 다시 계산하여
+IMAGE_HASH_INDEX_PATH 파일을 새로 만듭니다. (기존 파일은 원자적으로 교체)
+실행 중인 API 프로세스는 재시작해야 새 인덱스를 처음부터 다시 읽습니다.
+
+사용 예:
+  python rebuild_image_hash_index.py
+  python rebuild_image_hash_index.py --original-dir result/images/original --output result/image_hashes.tsv
+"""
+
+import time
+import argparse
+from pathlib import Path
+
+from app.config import settings
+from app.services.image_hash_index import rebuild_index_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이미지 해시 인덱스 재구축")
+    parser.add_argument('--original-dir', type=str, default=str(Path(settings.RESULT_DIR) / "images" / "original"),
+                        help='원본 이미지 디렉토리')
+    parser.add_argument('--output', type=str, default=settings.IMAGE_HASH_INDEX_PATH,
+                        help='인덱스 파일 경로')
+    args = parser.parse_args()
+
+    if not Path(args.original_dir).exists():
+        print(f"❌ 원본 이미지 디렉토리를 찾을 수 없습니다: {args.original_dir}")
+        return
+
+    start_time = time.time()
+    count = rebuild_index_file(args.original_dir, args.output)
+    print(f"✅ 이미지 해시 인덱스 재구축 완료: {count}개 ({time.time() - start_time:.1f}초)")
+    print(f"   파일: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+모델 추론 사이드카 실행
+
+YOLO / KURE-v1 / bge 리랭커 / BERT 분류기를 이 프로세스에서 1회만 로드하고
+Unix 소켓으로 모든 API 워커에 추론을 제공합니다.
+API 워커에는 같은 소켓 경로를 INFERENCE_SIDECAR_SOCKET 으로 지정합니다.
+
+사용 예:
+  python run_inference_sidecar.py --socket /tmp/htp-inference.sock
+  python run_inference_sidecar.py --socket /tmp/htp-inference.sock --yolo-backend onnx --yolo-batch-size 8
+"""
+
+import os
+import sys
+import signal
+import argparse
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.path.join(BASE_DIR, "llm", "model")
+sys.path.insert(0, MODEL_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, "llm", "opensearch_modules"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모델 추론 사이드카 (Unix 소켓)")
+    parser.add_argument('--socket', type=str, default=os.getenv("INFERENCE_SIDECAR_SOCKET", "/tmp/htp-inference.sock"), help='Unix 소켓 경로')
+    parser.add_argument('--model', type=str, default=os.path.join(MODEL_DIR, os.getenv("YOLO_MODEL_PATH", "best.pt")), help='YOLO 모델 경로')
+    parser.add_argument('--yolo-backend', type=str, default=os.getenv("YOLO_BACKEND", "pytorch"), help='탐지기 백엔드')
+    parser.add_argument('--yolo-pool-size', type=int, default=int(os.getenv("YOLO_POOL_SIZE", "2")), help='YOLO 모델 풀 크기')
+    parser.add_argument('--yolo-batch-size', type=int, default=int(os.getenv("YOLO_BATCH_SIZE", "1")), help='YOLO 마이크로 배치 크기 (1이면 사용 안 함)')
+    parser.add_argument('--yolo-batch-wait-ms', type=float, default=float(os.getenv("YOLO_BATCH_WAIT_MS", "5")), help='마이크로 배치 최대 대기 (ms)')
+    parser.add_argument('--threads', type=int, default=int(os.getenv("INFERENCE_THREADS", "0")), help='추론 전체 스레드 수 (0 이면 코어 수)')
+    parser.add_argument('--max-concurrent', type=int, default=int(os.getenv("INFERENCE_MAX_CONCURRENT", "2")), help='동시에 실행할 무거운 추론 수')
+    parser.add_argument('--no-warmup', action='store_true', help='시작 시 모델 워밍업 생략')
+    args = parser.parse_args()
+
+    from inference_scheduler import configure_inference_scheduler, DEFAULT_MODEL_LIMITS
+    from crop_by_labels import get_yolo_model_pool
+    from inference_sidecar import InferenceSidecarServer, LocalInferenceBackend, current_rss_mb
+
+    configure_inference_scheduler(
+        total_threads=args.threads or None,
+        max_concurrent=args.max_concurrent,
+        model_limits=dict(DEFAULT_MODEL_LIMITS, yolo=args.yolo_pool_size)
+    )
+    get_yolo_model_pool(args.model, args.yolo_backend, size=args.yolo_pool_size)
+    backend = LocalInferenceBackend(
+        model_path=args.model,
+        yolo_backend=args.yolo_backend,
+        yolo_batch_size=args.yolo_batch_size,
+        yolo_batch_wait_ms=args.yolo_batch_wait_ms
+    )
+
+    if not args.no_warmup:
+        for name, step in backend.warmup().items():
+            print(f"{'✅' if step['success'] else '❌'} {name} 워밍업: {step['duration_sec']}초 {step.get('error', '')}")
+
+    server = InferenceSidecarServer(args.socket, backend)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"추론 사이드카 시작: {args.socket} (pid={os.getpid()}, RSS {current_rss_mb()}MB)")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
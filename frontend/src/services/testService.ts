@@ -1,4 +1,4 @@
-import { apiClient } from './apiClient';
+import { apiClient, API_BASE_URL } from './apiClient';
 import { DrawingTest, PipelineAnalysisResponse, PipelineStatusResponse } from '../types';
 
 class TestService {
@@ -92,9 +92,90 @@ class TestService {
   }
 
   /**
-   * 분석 완료까지 폴링
+   * 분석 진행 상태 스트림 구독 (Server-Sent Events)
+   * 인증 헤더 전달을 위해 EventSource 대신 fetch 스트림을 사용
+   * 최종 상태를 받지 못하고 스트림이 끝나면 null 반환
+   */
+  async streamAnalysisStatus(testId: string, onProgress?: (status: PipelineStatusResponse) => void, abortSignal?: AbortSignal): Promise<PipelineStatusResponse | null> {
+    const token = localStorage.getItem('access_token');
+    const response = await fetch(`${API_BASE_URL}${this.PIPELINE_PATH}/analysis-events/${testId}`, {
+      headers: {
+        Accept: 'text/event-stream',
+        ...(token ? { Authorization: `Bearer ${token}` } : {}),
+      },
+      signal: abortSignal,
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error(`Analysis event stream unavailable: ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    try {
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) {
+          return null;
+        }
+        buffer += decoder.decode(value, { stream: true });
+
+        // 이벤트는 빈 줄로 구분
+        let boundary = buffer.indexOf('\n\n');
+        while (boundary !== -1) {
+          const rawEvent = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+          boundary = buffer.indexOf('\n\n');
+
+          let eventName = 'message';
+          let data = '';
+          for (const line of rawEvent.split('\n')) {
+            if (line.startsWith('event:')) {
+              eventName = line.slice(6).trim();
+            } else if (line.startsWith('data:')) {
+              data += line.slice(5).trim();
+            }
+          }
+          if (!data) {
+            continue; // keepalive
+          }
+
+          if (eventName === 'timeout') {
+            return null;
+          }
+
+          const status = JSON.parse(data) as PipelineStatusResponse;
+          if (onProgress) {
+            onProgress(status);
+          }
+          if (status.status === 'completed' || status.status === 'failed') {
+            return status;
+          }
+        }
+      }
+    } finally {
+      reader.cancel().catch(() => undefined);
+    }
+  }
+
+  /**
+   * 분석 완료까지 대기 (SSE 스트림 우선, 실패 시 폴링)
    */
   async pollAnalysisStatus(testId: string, onProgress?: (status: PipelineStatusResponse) => void, abortSignal?: AbortSignal): Promise<PipelineStatusResponse> {
+    try {
+      const streamed = await this.streamAnalysisStatus(testId, onProgress, abortSignal);
+      if (streamed) {
+        return streamed;
+      }
+    } catch (error) {
+      if (abortSignal?.aborted) {
+        return { status: 'cancelled', message: 'Analysis cancelled by user' } as PipelineStatusResponse;
+      }
+      console.warn('Analysis event stream failed, falling back to polling:', error);
+    }
+
     const poll = async (): Promise<PipelineStatusResponse> => {
       // 중단 신호가 있으면 폴링 중단
       if (abortSignal?.aborted) {
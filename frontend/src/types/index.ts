@@ -175,6 +175,14 @@ export interface PipelineAnalysisResponse {
   test_id: string;
   status: 'pending' | 'processing' | 'completed' | 'failed' | 'cancelled';
   message: string;
+  duplicate_of?: DuplicateDrawingInfo; // 이전에 올린 그림과 근접 중복인 경우
+}
+
+// Pipeline API - 근접 중복 그림 정보
+export interface DuplicateDrawingInfo {
+  test_id: number;
+  distance: number;
+  submitted_at: string | null;
 }
 
 // Pipeline API - 분석 단계 정보